@@ -3,100 +3,12 @@
 # ==========================================================
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
 import datetime
+import importlib.util
 import os
-from sklearn.linear_model import LinearRegression
-from sqlalchemy import create_engine, text
 
 st.set_page_config(layout="wide")
 
-# ==========================================================
-# DATABASE ENGINE (POSTGRESQL + SQLITE FALLBACK)
-# ==========================================================
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-if DATABASE_URL:
-    engine = create_engine(DATABASE_URL)
-else:
-    engine = create_engine("sqlite:///supplysense.db")
-
-def run_query(query, params=None):
-    with engine.begin() as conn:
-        conn.execute(text(query), params or {})
-
-def get_table(name):
-    try:
-        return pd.read_sql(f"SELECT * FROM {name}", engine)
-    except:
-        return pd.DataFrame()
-
-# ==========================================================
-# TABLE CREATION
-# ==========================================================
-
-tables_sql = [
-
-"""
-CREATE TABLE IF NOT EXISTS orders(
-order_id TEXT,date TEXT,customer TEXT,city TEXT,channel TEXT,
-item TEXT,category TEXT,qty INT,unit_price FLOAT,priority TEXT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS inventory(
-item TEXT,warehouse TEXT,category TEXT,supplier TEXT,
-on_hand INT,wip INT,safety INT,reorder_point INT,unit_cost FLOAT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS suppliers(
-supplier TEXT,item TEXT,lead_time INT,moq INT,
-reliability FLOAT,cost_per_unit FLOAT,
-phone TEXT,whatsapp TEXT,email TEXT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS capacity(
-warehouse TEXT,machine TEXT,daily_capacity INT,
-shift_hours INT,utilization FLOAT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS supply_pool(
-source TEXT,item TEXT,available_qty INT,
-contact TEXT,whatsapp TEXT,email TEXT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS planning_params(
-persona TEXT,safety_stock INT,lead_time INT,moq INT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS action_log(
-action TEXT,item TEXT,decision TEXT,timestamp TEXT)
-""",
-
-"""
-CREATE TABLE IF NOT EXISTS tasks(
-task TEXT,assignee TEXT,status TEXT)
-"""
-]
-
-
-for sql in tables_sql:
-    run_query(sql)
-
-# Add country column safely (only if not exists)
-try:
-    run_query("ALTER TABLE suppliers ADD COLUMN country TEXT")
-except:
-    pass
-
 # ==========================================================
 # LOGIN SYSTEM
 # ==========================================================
@@ -129,89 +41,204 @@ if not st.session_state.logged_in:
     st.stop()
 
 # ==========================================================
-# LOAD DATA
+# DEFERRED IMPORTS
 # ==========================================================
+# Only streamlit is needed to draw the login screen, so everything
+# else loads after it. plotly, sklearn and openai load on the page or
+# action that uses them.
 
-orders = get_table("orders")
-inventory = get_table("inventory")
-suppliers = get_table("suppliers")
-capacity_df = get_table("capacity")
-supply_pool = get_table("supply_pool")
+import pandas as pd
+
+from app.action_queue import (
+    SEVERITY, SEVERITY_DTYPE, decided_keys, filter_queue, pending_actions,
+    queue_summary, record_decisions
+)
+from app.alerts import TwilioTransport, get_dispatcher
+from app.allocation import RANK_KEYS, supply_index
+from app.assistant import OpenAIModel, StubModel, get_assistant, planning_summary
+from app.balancing import EXPEDITE, balancing_engine as balance_inventory
+from app.cache import table_cache
+from app.capacity import CAPACITY_HORIZON_DAYS, capacity_plan, warehouse_load
+from app.database import engine, pool_stats, run_query
+from app.demand import (
+    DEMAND_TABLES, ensure_demand, rebuild_demand, record_orders
+)
+from app.event_bus import RESEED_SECONDS, InMemoryBroker, get_bus, get_state
+from app.forecasting import HORIZON_DAYS, WINDOW_DAYS, forecast_cache
+from app.graph import graph
+from app.ingest import ingest_csv, normalize_columns
+from app.migrations import migrate_once, migration_history
+from app.planning import kpis, planning_demand, trend_forecast
+from app.queries import (
+    daily_demand, demand_mix, distinct_values, inventory_rollup, kpi_totals, revenue_by_item,
+    stock_levels
+)
+from app.rebalancing import WAREHOUSE_COORDS, demand_shares, plan_rebalancing, warehouse_demand
+from app.risk import stockout_risk
+from app.schema import create_tables
+from app.snapshots import get_snapshot_store
+from app.scenarios import Scenario, ScenarioBase, diff_against_baseline, evaluate
+from app.table_view import count_rows, table_view
+from app.tracing import SessionTrace, serve_metrics, tracer
+from app.transfers import apply_transfers
 
 # ==========================================================
-# CORE ENGINES
+# TRACING (OFF UNLESS ENABLED, SEE app/tracing.py)
 # ==========================================================
 
-def balancing_engine():
+if "trace" not in st.session_state:
+    st.session_state.trace = SessionTrace()
 
-    if inventory.empty:
-        return pd.DataFrame(), []
+tracer.start_rerun(st.session_state.trace)
+tracer.section("startup")
+
+if os.getenv("SUPPLYSENSE_METRICS_PORT"):
+    try:
+        serve_metrics(int(os.getenv("SUPPLYSENSE_METRICS_PORT")))
+    except OSError:
+        pass
 
-    df = inventory.copy()
+# ==========================================================
+# DATABASE ENGINE (SHARED, SEE app/database.py)
+# ==========================================================
 
-    if not orders.empty:
-        demand = orders.groupby("item")["qty"].sum().reset_index()
-        demand.rename(columns={"qty":"forecast_demand"}, inplace=True)
-        df = df.merge(demand, on="item", how="left")
-    else:
-        df["forecast_demand"] = 0
+def insert_orders(df):
+    # Orders and their demand aggregates commit together.
+    with engine.begin() as conn:
+        df.to_sql("orders", conn, if_exists="append", index=False)
+        record_orders(conn, df)
+    table_cache.bump("orders", *DEMAND_TABLES)
+    get_bus().publish_frame("order", df[["item", "date", "qty"]])
 
-    df["forecast_demand"] = df["forecast_demand"].fillna(0)
-    df["available_stock"] = df["on_hand"] + df["wip"]
-    df["projected_stock"] = df["available_stock"] - df["forecast_demand"]
+# ==========================================================
+# TABLE CREATION
+# ==========================================================
 
-    actions = []
+with engine.begin() as conn:
+    create_tables(conn)
 
-    for _, r in df.iterrows():
+# Versioned schema changes (columns, keys, lookup indexes)
+if migrate_once(engine):
+    table_cache.bump("suppliers", "inventory")
 
-        if r["projected_stock"] < 0:
-            actions.append(("🚨 Expedite Supplier", r["item"]))
-        elif r["projected_stock"] < r["safety"]:
-            actions.append(("⚠️ Increase Production", r["item"]))
-        elif r["projected_stock"] > r["safety"] * 5:
-            actions.append(("🛑 Reduce Batch Size", r["item"]))
-        elif r["projected_stock"] > r["safety"] * 3:
-            actions.append(("📦 Run Promotion", r["item"]))
-        else:
-            actions.append(("✅ Balanced", r["item"]))
+with engine.begin() as conn:
+    if ensure_demand(conn):
+        table_cache.bump(*DEMAND_TABLES)
+
+# ==========================================================
+# COMPUTATION GRAPH
+# ==========================================================
+# Tables and engines are lazy nodes: a page pulls only what it
+# renders, and a node recomputes only when a table it reads has been
+# written since.
+
+graph.table(
+    "orders", "inventory", "suppliers", "capacity", "supply_pool",
+    "warehouse_regions", "action_log",
+    "demand_by_item", "demand_by_date", "demand_by_item_date"
+)
 
-    return df, actions
+@graph.node("sku_forecast", ["demand_by_item_date", "demand_by_item"])
+def sku_forecast(demand_by_item_date, demand_by_item):
+    return forecast_cache.forecast(demand_by_item_date, demand_by_item)
 
-def capacity_engine():
-    if capacity_df.empty or orders.empty:
-        return 0
-    return round((orders["qty"].sum() /
-                  (capacity_df["daily_capacity"].sum()+1))*100,2)
+graph.node("planning_demand", ["sku_forecast", "demand_by_item"])(planning_demand)
 
-def calc_kpis():
+@graph.node("demand_mix", tables=["orders"])
+def order_mix():
+    return demand_mix(engine)
 
-    revenue = (orders["qty"] * orders["unit_price"]).sum() if not orders.empty else 0
-    inv_value = (inventory["on_hand"] * inventory["unit_cost"]).sum() if not inventory.empty else 0
-    return revenue, inv_value, 96, capacity_engine()
+graph.node("demand_shares", ["inventory", "demand_mix", "warehouse_regions"])(demand_shares)
 
-def advanced_forecast():
+# Each site is charged its own share of the item's demand, the same
+# split the rebalancing plan and capacity plan use.
+@graph.node("balance", ["inventory", "planning_demand", "demand_shares"])
+def balancing_engine(inventory, sku_demand, shares):
+    return balance_inventory(inventory, warehouse_demand(sku_demand, shares))
 
-    if orders.empty:
-        return pd.DataFrame()
+graph.node(
+    "rebalance", ["inventory", "planning_demand", "demand_mix", "warehouse_regions"]
+)(plan_rebalancing)
 
-    daily = orders.groupby("date")["qty"].sum().reset_index()
-    if len(daily) < 5:
+@graph.node("capacity_forecast", ["sku_forecast"])
+def capacity_forecast(sku_daily):
+    # The SKU forecast's cached fit, predicted over the longer
+    # capacity horizon; no second solve.
+    if sku_daily.empty:
         return pd.DataFrame()
+    return forecast_cache.extend(CAPACITY_HORIZON_DAYS)
+
+graph.node("warehouse_load", ["capacity_forecast", "demand_shares"])(warehouse_load)
+graph.node("capacity_plan", ["warehouse_load", "capacity"])(capacity_plan)
+
+@graph.node("utilization", ["capacity_plan"])
+def utilization(plan):
+    return plan[2]["utilization"]
+
+@graph.node("risk", ["inventory", "demand_by_item_date", "suppliers"])
+def risk_engine(inventory, demand_by_item_date, suppliers):
+    return stockout_risk(
+        inventory, demand_by_item_date, suppliers,
+        version=graph.version("risk"),
+        workers=int(os.getenv("SUPPLYSENSE_RISK_WORKERS", "1"))
+    )
 
-    daily["index"] = np.arange(len(daily))
-    model = LinearRegression()
-    model.fit(daily[["index"]], daily["qty"])
+# Aggregates computed in SQL; versioned on their tables, never loaded.
+graph.node("kpi_totals", tables=["orders", "inventory"])(lambda: kpi_totals(engine))
+graph.node("inventory_rollup", tables=["inventory"])(lambda: inventory_rollup(engine))
+graph.node("revenue_by_item", tables=["orders"])(lambda: revenue_by_item(engine))
+graph.node("stock_levels", tables=["inventory"])(lambda: stock_levels(engine))
+graph.node("warehouse_names", tables=["inventory"])(
+    lambda: distinct_values(engine, "inventory", "warehouse")
+)
+graph.node("supplier_names", tables=["inventory"])(
+    lambda: distinct_values(engine, "inventory", "supplier")
+)
+graph.node("category_demand", tables=["orders"])(
+    lambda: daily_demand(engine, by="category", days=WINDOW_DAYS)
+)
 
-    future_index = np.arange(len(daily), len(daily)+7)
-    preds = model.predict(future_index.reshape(-1,1))
+graph.node("kpis", ["kpi_totals", "risk", "utilization"])(kpis)
+graph.node("decided_keys", tables=["action_log"])(lambda: decided_keys(engine))
+graph.node("forecast", ["demand_by_date"])(trend_forecast)
+graph.node("assistant_context", ["inventory", "balance", "sku_forecast"])(planning_summary)
 
-    return pd.DataFrame({
-        "future_day":future_index,
-        "predicted_demand":preds
-    })
+# ==========================================================
+# LIVE EVENT STATE
+# ==========================================================
+# Seeded from aggregates of the tables above and moved by order,
+# stock and transfer events between reseeds. It is reseeded after any
+# write this process sees and every SUPPLYSENSE_LIVE_RESEED_SECONDS,
+# so changes made outside the event stream (other replicas, batch
+# jobs) show up within that interval. Only the pages with live
+# panels build it.
+
+LIVE_TABLES = ("demand_by_item", "demand_by_date", "inventory")
+
+def get_live_state():
+    state = get_state(
+        lambda consumer: consumer.seed(
+            graph.get("demand_by_item"),
+            graph.get("demand_by_date"),
+            graph.get("stock_levels")
+        ),
+        version=tuple(table_cache.version(t) for t in LIVE_TABLES)
+    )
+    if isinstance(get_bus().backend, InMemoryBroker):
+        state.poll(get_bus().backend)
+    return state
 
-balanced, actions = balancing_engine()
-forecast_df = advanced_forecast()
+# ==========================================================
+# SUPPLIER ALERT DISPATCHER (ONE PER PROCESS)
+# ==========================================================
+
+def alert_transport():
+    return TwilioTransport(st.secrets["TWILIO_SID"], st.secrets["TWILIO_TOKEN"])
+
+try:
+    alerts = get_dispatcher(alert_transport)
+except:
+    alerts = None
 
 # ==========================================================
 # STABLE NAVIGATION
@@ -238,6 +265,9 @@ selected_page = st.sidebar.selectbox(
 
 st.session_state.menu = selected_page
 menu = selected_page
+
+tracer.section(f"page.{menu}")
+
 # ==========================================================
 # CONTROL TOWER PAGE
 # ==========================================================
@@ -246,7 +276,8 @@ if menu == "Control Tower":
 
     st.title("🏭 Enterprise Control Tower")
 
-    revenue, inv_value, service, util = calc_kpis()
+    revenue, inv_value, service, util = graph.get("kpis")
+    balanced, actions = graph.get("balance")
 
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("💵 Sales Generated", f"₹{int(revenue):,}")
@@ -254,80 +285,181 @@ if menu == "Control Tower":
     c3.metric("🚚 Service Level", f"{service}%")
     c4.metric("🏭 Factory Utilization", f"{util}%")
 
+    st.subheader("📡 Live Stock by Warehouse")
+    st.caption(
+        "Moved by order, stock and transfer events; re-synced from the tables "
+        f"after writes and at least every {RESEED_SECONDS}s."
+    )
+    live_stock = get_live_state().warehouse_stock()
+    if not live_stock.empty:
+        st.bar_chart(live_stock)
+
     st.divider()
     st.subheader("⚠️ Recommended Actions")
 
-    for i, (action, item) in enumerate(actions):
-
-        col1, col2, col3 = st.columns([4,1,1])
-        col1.write(f"{action} → {item}")
+    # Shown after the rerun that follows a decision.
+    notice = st.session_state.pop("queue_notice", None)
+    if notice:
+        st.success(notice)
 
-        if col2.button("Approve", key=f"approve_{i}"):
+    queue = pending_actions(actions, graph.get("decided_keys"))
 
-            run_query(
-                "INSERT INTO action_log VALUES (?,?,?,?)",
-                (action, item, "Approved",
-                 str(datetime.datetime.now()))
-            )
+    f1, f2, f3, f4 = st.columns(4)
+    action_filter = f1.multiselect("Action", list(SEVERITY))
+    severity_filter = f2.multiselect("Severity", list(SEVERITY_DTYPE.categories))
+    warehouse_filter = f3.multiselect(
+        "Warehouse", sorted(queue["warehouse"].dropna().unique())
+    )
+    item_search = f4.text_input("Item Search")
 
-            st.success("Action Approved")
+    filtered = filter_queue(
+        queue, action_filter, severity_filter, warehouse_filter, item_search
+    )
 
-        if col3.button("Reject", key=f"reject_{i}"):
+    st.dataframe(queue_summary(filtered), hide_index=True)
+
+    page_size = 50
+    pages = max(1, -(-len(filtered) // page_size))
+    page = st.number_input("Page", 1, pages, 1, key="queue_page")
+    page_rows = filtered.iloc[(page - 1) * page_size: page * page_size]
+
+    # The editor keeps ticks by row position, so its key follows the
+    # rows on the page: once a decision or filter moves the rows, the
+    # old ticks must not land on SKUs nobody picked.
+    rows_key = pd.util.hash_pandas_object(
+        page_rows[["action", "item", "warehouse"]].astype(str), index=False
+    ).sum()
+    editor_key = f"queue_editor_{page}_{rows_key}"
+
+    picked = st.data_editor(
+        page_rows.assign(select=False),
+        column_config={"select": st.column_config.CheckboxColumn("✔")},
+        disabled=list(page_rows.columns),
+        hide_index=True,
+        key=editor_key
+    )
+    selected = picked[picked["select"]]
 
-            run_query(
-                "INSERT INTO action_log VALUES (?,?,?,?)",
-                (action, item, "Rejected",
-                 str(datetime.datetime.now()))
-            )
+    st.caption(
+        f"{len(filtered):,} pending · {len(selected)} selected · page {page} of {pages}"
+    )
 
-            st.error("Action Rejected")
+    # Labels and keys stay fixed: a label carrying the pending count
+    # would give the button a new identity whenever the count moves,
+    # and a click made across that change would be lost.
+    b1, b2, b3, b4 = st.columns(4)
+
+    decided = 0
+    if b1.button("Approve Selected", key="queue_approve_selected"):
+        decided = record_decisions(engine, selected, "Approved")
+    if b2.button("Reject Selected", key="queue_reject_selected"):
+        decided = record_decisions(engine, selected, "Rejected")
+    if b3.button("Approve All Filtered", key="queue_approve_filtered"):
+        decided = record_decisions(engine, filtered, "Approved")
+    if b4.button("Reject All Filtered", key="queue_reject_filtered"):
+        decided = record_decisions(engine, filtered, "Rejected")
+
+    if decided:
+        st.session_state.pop(editor_key, None)
+        table_cache.bump("action_log")
+        st.session_state.queue_notice = f"{decided:,} actions recorded"
+        st.rerun()
 
     st.divider()
     st.subheader("📦 Projected Stock Overview")
     st.dataframe(balanced)
 
+    st.divider()
+    st.subheader("🎲 Stockout Risk (Monte Carlo)")
+    risk = graph.get("risk")
+    if not risk.empty:
+        st.dataframe(
+            risk.sort_values("stockout_prob", ascending=False).head(50),
+            hide_index=True
+        )
+
+    st.divider()
+    st.subheader("🔀 Network Rebalancing")
+    st.caption(
+        "Demand is split across warehouses by order city/channel "
+        "(warehouse_regions), then stock is moved from sites above "
+        "safety to sites below it at the lowest lane cost."
+    )
+
+    position, moves, plan = graph.get("rebalance")
+
+    r1, r2, r3, r4 = st.columns(4)
+    r1.metric("Shortfall", f"{plan['shortfall_before']:,}")
+    r2.metric("Units to Move", f"{plan['units']:,}")
+    r3.metric("Moves", f"{plan['moves']:,}")
+    r4.metric("Lane Cost", f"{plan['cost']:,.0f}")
+
+    if moves.empty:
+        st.info("No transfers would reduce a shortfall")
+    else:
+        st.dataframe(moves.head(200), hide_index=True)
+
+        if st.button(f"Execute Rebalancing ({len(moves):,} moves)"):
+            try:
+                report = apply_transfers(engine, moves)
+            except Exception as e:
+                st.error(f"Rebalancing failed, nothing was moved: {e}")
+            else:
+                table_cache.bump("inventory", "tasks")
+                get_bus().publish_frame("transfer", report["accepted"])
+                st.success(f"{len(report['accepted']):,} moves executed")
+                for reason, count in report["rejected"]["reason"].value_counts().items():
+                    st.error(f"{count:,} rejected: {reason}")
+
+    with st.expander("Per-warehouse position"):
+        st.dataframe(
+            position[(position["excess"] > 0) | (position["need"] > 0)],
+            hide_index=True
+        )
+
     st.divider()
     st.subheader("⚡ Instant Order Fulfilment Simulator")
 
     item_req = st.text_input("Product Needed")
     qty_req = st.number_input("Required Quantity", 0, 100000)
+    basket_file = st.file_uploader(
+        "Or quote a basket (CSV with item, qty)", type=["csv"], key="basket"
+    )
+    rank_by = st.selectbox("Rank Supply Sources By", list(RANK_KEYS), index=1)
 
     if st.button("Find Supply Plan"):
 
-        plan = []
-        remaining = qty_req
-
-        own_stock_df = inventory[inventory["item"] == item_req]
-
-        if not own_stock_df.empty:
-            own_qty = int(own_stock_df["on_hand"].sum())
-            allocate = min(own_qty, remaining)
-            if allocate > 0:
-                plan.append(("🏭 Own Warehouse", allocate, "Internal Stock"))
-                remaining -= allocate
-
-        pool = supply_pool[supply_pool["item"] == item_req]
-
-        for _, row in pool.iterrows():
-            if remaining <= 0:
-                break
-            allocate = min(int(row["available_qty"]), remaining)
-            if allocate > 0:
-                plan.append((
-                    row["source"],
-                    allocate,
-                    f"{row['contact']} | {row['whatsapp']} | {row['email']}"
-                ))
-                remaining -= allocate
-
-        if not plan:
-            st.error("No supply found")
+        if basket_file:
+            requests = normalize_columns(pd.read_csv(basket_file))
         else:
-            df_plan = pd.DataFrame(
-                plan,
-                columns=["Source","Allocated Qty","Contact"]
+            requests = [(item_req, qty_req)]
+
+        index = supply_index(
+            graph.get("inventory"), graph.get("supply_pool"),
+            graph.get("suppliers"), rank_by,
+            version=tuple(
+                table_cache.version(t)
+                for t in ("inventory", "supply_pool", "suppliers")
             )
-            st.dataframe(df_plan)
+        )
+        plans, lines = index.allocate(requests)
+
+        if plans.empty:
+            st.error("No supply found")
+        else:
+            df_plan = plans.rename(columns={
+                "source": "Source",
+                "allocated": "Allocated Qty",
+                "contact": "Contact"
+            })
+
+            if basket_file:
+                st.dataframe(df_plan)
+                st.dataframe(lines)
+            else:
+                st.dataframe(df_plan[["Source","Allocated Qty","Contact"]])
+
+            remaining = int(lines["shortage"].sum())
 
             if remaining > 0:
                 st.error(f"Shortage: {remaining}")
@@ -343,16 +475,45 @@ elif menu == "Analytics":
 
     st.title("📊 Analytics Dashboard")
 
-    if not inventory.empty:
+    import plotly.express as px
+
+    rollup = graph.get("inventory_rollup")
+    forecast_df = graph.get("forecast")
+
+    if not rollup.empty:
         fig = px.bar(
-            inventory,
+            rollup,
             x="warehouse",
             y="on_hand",
             color="category",
+            hover_data=["skus", "value"],
             title="Inventory by Warehouse"
         )
         st.plotly_chart(fig, use_container_width=True)
 
+    live_demand = get_live_state().daily_demand().tail(WINDOW_DAYS)
+
+    if not live_demand.empty:
+        fig_live = px.line(
+            live_demand.rename_axis("date").reset_index(),
+            x="date",
+            y="qty",
+            title="Daily Demand (live from order events)"
+        )
+        st.plotly_chart(fig_live, use_container_width=True)
+
+    category_demand = graph.get("category_demand")
+
+    if not category_demand.empty:
+        fig_demand = px.line(
+            category_demand,
+            x="date",
+            y="qty",
+            color="category",
+            title=f"Daily Demand by Category (last {WINDOW_DAYS} days)"
+        )
+        st.plotly_chart(fig_demand, use_container_width=True)
+
     if not forecast_df.empty:
         fig2 = px.line(
             forecast_df,
@@ -362,6 +523,50 @@ elif menu == "Analytics":
         )
         st.plotly_chart(fig2, use_container_width=True)
 
+    util_matrix, overloads, plan = graph.get("capacity_plan")
+
+    if not util_matrix.empty:
+        st.subheader(f"🏭 {plan['days']}-Day Capacity Plan")
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("Average Load", f"{plan['utilization']}%")
+        k2.metric("Peak Load", f"{plan['peak']}%")
+        k3.metric("Overloaded Machine-Days", f"{plan['overloaded_buckets']:,}")
+        k4.metric("Levelled by Building Ahead", f"{plan['levelled']:,.0f} / {plan['excess']:,.0f}")
+
+        heatmap = (util_matrix.T * 100).round(1)
+        heatmap.columns = heatmap.columns.strftime("%Y-%m-%d")
+        fig3 = px.imshow(
+            heatmap,
+            aspect="auto",
+            color_continuous_scale="RdYlGn_r",
+            zmin=0,
+            zmax=max(150, float(heatmap.to_numpy().max())),
+            labels={"x": "Date", "y": "Machine", "color": "Load %"},
+            title="Machine Load vs Effective Capacity"
+        )
+        st.plotly_chart(fig3, use_container_width=True)
+
+        if plan["unplanned"]:
+            st.warning(
+                f"{plan['unplanned']:,.0f} units fall on warehouses with no capacity rows"
+            )
+        if not overloads.empty:
+            st.caption(
+                "Overloaded days: build_ahead is excess that spare capacity on "
+                "earlier days can absorb; overtime_hours covers the rest."
+            )
+            st.dataframe(overloads, hide_index=True)
+
+    sku_daily = graph.get("sku_forecast")
+
+    if not sku_daily.empty:
+        st.subheader(f"📈 {HORIZON_DAYS}-Day SKU Forecast")
+        sku_table = sku_daily.T
+        sku_table.columns = sku_table.columns.strftime("%Y-%m-%d")
+        sku_table["total"] = sku_table.sum(axis=1)
+        st.dataframe(sku_table.sort_values("total", ascending=False).round(1))
+
 
 # ==========================================================
 # UPLOAD DATA PAGE
@@ -376,20 +581,43 @@ elif menu == "Upload Data":
         ["orders","inventory","suppliers","capacity","supply_pool"]
     )
 
+    if table == "inventory":
+        st.caption(
+            "Rows for an item and warehouse already in inventory replace "
+            "its stock levels; new pairs are added."
+        )
+
     file = st.file_uploader("Upload CSV", type=["csv"])
 
-    if file:
+    # The uploader keeps its file across reruns, so loading is an
+    # explicit action rather than happening on every rerun.
+    if file and st.button("Load Into Database"):
 
-        try:
-            df = pd.read_csv(file)
-            df.columns = df.columns.str.lower().str.replace(" ","_")
+        status = st.empty()
 
-            df.to_sql(table, engine, if_exists="append", index=False)
+        def show_progress(rows, rate):
+            status.info(f"Loaded {rows:,} rows ({rate:,.0f} rows/s)")
 
-            st.success(f"{table} uploaded successfully!")
+        try:
+            report = ingest_csv(engine, table, file, progress=show_progress)
+            get_bus().publish_frame("order", report["order_deltas"])
+            get_bus().publish_frame("inventory", report["stock_levels"])
+            get_bus().publish_frame("stock", report["stock_deltas"])
+
+            st.success(
+                f"{table} uploaded successfully! "
+                f"{report['rows']:,} rows in {report['seconds']}s "
+                f"({report['rows_per_sec']:,.0f} rows/s)"
+            )
 
         except Exception as e:
-            st.error(f"Upload failed: {e}")
+            st.error(f"Upload failed, nothing was loaded: {e}")
+
+        finally:
+            if table == "orders":
+                table_cache.bump(table, *DEMAND_TABLES)
+            else:
+                table_cache.bump(table)
 
 
 # ==========================================================
@@ -405,23 +633,18 @@ elif menu == "Manual Entry":
 
     if st.button("Add Order"):
 
-        run_query(
-            """
-            INSERT INTO orders VALUES (?,?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                "NEW",
-                str(datetime.date.today()),
-                "Retail",
-                "Chennai",
-                "Retail",
-                item,
-                "General",
-                qty,
-                40,
-                "Normal"
-            )
-        )
+        insert_orders(pd.DataFrame([{
+            "order_id": "NEW",
+            "date": str(datetime.date.today()),
+            "customer": "Retail",
+            "city": "Chennai",
+            "channel": "Retail",
+            "item": item,
+            "category": "General",
+            "qty": qty,
+            "unit_price": 40,
+            "priority": "Normal"
+        }]))
 
         st.success("Order Added Successfully")
 
@@ -434,20 +657,15 @@ elif menu == "Admin Dashboard":
 
     st.title("👑 Admin Dashboard")
 
-    st.subheader("Orders")
-    st.dataframe(orders)
-
-    st.subheader("Inventory")
-    st.dataframe(inventory)
-
-    st.subheader("Suppliers")
-    st.dataframe(suppliers)
-
-    st.subheader("Supply Pool")
-    st.dataframe(supply_pool)
-
-    st.subheader("Action Logs")
-    st.dataframe(get_table("action_log"))
+    for label, table in [
+        ("Orders", "orders"),
+        ("Inventory", "inventory"),
+        ("Suppliers", "suppliers"),
+        ("Supply Pool", "supply_pool"),
+        ("Action Logs", "action_log")
+    ]:
+        st.subheader(label)
+        table_view(engine, table, version=table_cache.version(table))
 
 
 # ==========================================================
@@ -488,13 +706,91 @@ elif menu == "System Settings":
     if st.button("Backup Database"):
         st.success("Database Backup Simulated")
 
-    if st.button("View Logs"):
-        st.dataframe(get_table("action_log"))
+    # A toggle, not a button, so paging through the logs keeps them open.
+    if st.toggle("View Logs"):
+        table_view(
+            engine, "action_log", version=table_cache.version("action_log"),
+            key="settings_action_log"
+        )
+
+    if st.button("Rebuild Demand Aggregates"):
+        with engine.begin() as conn:
+            rebuild_demand(conn)
+        table_cache.bump(*DEMAND_TABLES)
+        st.success("Demand aggregates rebuilt from orders")
+
+    st.subheader("🧱 Schema Migrations")
+    st.dataframe(migration_history(engine))
+
+    st.subheader("📡 Event Stream")
+    e1, e2, e3 = st.columns(3)
+    live_state = get_live_state()
+    e1.metric("Events Applied", f"{live_state.applied:,}")
+    e2.metric("Items With Demand", f"{len(live_state.demand_by_item):,}")
+    e3.metric("Stock Positions", f"{len(live_state.stock):,}")
+
+    if alerts is not None:
+        st.subheader("📨 Supplier Alerts")
+        st.json(alerts.stats)
+
+    st.subheader("🔌 Connection Pool")
+    st.json(pool_stats())
+
+    st.subheader("🗄️ Table Cache")
+    cache_stats = table_cache.stats()
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Cached Tables", cache_stats["tables"])
+    k2.metric("Cache Size", f"{cache_stats['bytes'] / 1e6:.1f} MB")
+    k3.metric("Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+    k4.metric("Evictions", cache_stats["evictions"])
+
+    snapshot_store = get_snapshot_store(engine)
+    if snapshot_store is not None:
+        st.caption("Columnar snapshots: " + ", ".join(sorted(snapshot_store.tables)))
+        st.json(snapshot_store.stats)
+
+    st.subheader("🕸️ Computation Graph")
+    graph_stats = graph.stats()
+    g1, g2 = st.columns(2)
+    g1.metric("Node Hit Rate", f"{graph_stats['hit_rate'] * 100:.1f}%")
+    g2.metric("Computed Nodes", len(graph_stats["computed"]))
+    st.caption(", ".join(graph_stats["computed"]) or "Nothing computed yet")
+
+    st.subheader("⏱️ Tracing")
+    tracer.enabled = st.toggle("Trace Reruns (all sessions)", value=tracer.enabled)
+
+    if tracer.enabled:
+        last_rerun = pd.DataFrame(
+            st.session_state.trace.last_rerun, columns=["span", "seconds"]
+        )
+        if not last_rerun.empty:
+            st.caption("Previous rerun in this session")
+            st.bar_chart(
+                last_rerun.groupby("span", sort=False)["seconds"].sum() * 1000,
+                horizontal=True
+            )
+
+        scope = st.radio("Histograms", ["This Session", "Process"], horizontal=True)
+        spans = tracer.summary(
+            st.session_state.trace if scope == "This Session" else None
+        )
+        if spans:
+            st.dataframe(pd.DataFrame.from_dict(spans, orient="index"))
+
+        t1, t2 = st.columns(2)
+        t1.download_button(
+            "Export Prometheus Metrics", tracer.prometheus_text(),
+            file_name="supplysense_metrics.prom", mime="text/plain"
+        )
+        if t2.button("Reset Process Histograms"):
+            tracer.reset()
 
 # ==========================================================
 # ENTERPRISE SIDEBAR EXTENSIONS (SCOPED SAFELY)
 # ==========================================================
 
+tracer.section("sidebar.tools")
+
 st.sidebar.divider()
 st.sidebar.subheader("🚀 Enterprise Tools")
 
@@ -506,19 +802,12 @@ if menu == "Control Tower":
 
     if st.sidebar.button("🌍 Show Warehouse Map"):
 
-        geo_map = {
-            "Chennai WH": (13.08,80.27),
-            "Cold Storage": (13.10,80.25),
-            "Grain Warehouse": (11.01,76.96),
-            "Grocery WH": (9.92,78.12)
-        }
-
         map_data = []
 
-        for _, row in inventory.iterrows():
+        for _, row in graph.get("inventory").iterrows():
             wh = row["warehouse"]
-            if wh in geo_map:
-                lat, lon = geo_map[wh]
+            if wh in WAREHOUSE_COORDS:
+                lat, lon = WAREHOUSE_COORDS[wh]
                 map_data.append({
                     "lat": lat,
                     "lon": lon,
@@ -544,34 +833,32 @@ if menu == "Control Tower":
     from_wh = st.sidebar.text_input("From Warehouse")
     to_wh = st.sidebar.text_input("To Warehouse")
 
-    if st.sidebar.button("Execute Transfer"):
+    transfer_file = st.sidebar.file_uploader(
+        "Batch Moves CSV (item, qty, from_wh, to_wh)", type=["csv"], key="transfers"
+    )
 
-        run_query(
-            """
-            UPDATE inventory
-            SET on_hand = on_hand - ?
-            WHERE item=? AND warehouse=?
-            """,
-            (transfer_qty, transfer_item, from_wh)
-        )
+    if st.sidebar.button("Execute Transfer"):
 
-        run_query(
-            """
-            UPDATE inventory
-            SET on_hand = on_hand + ?
-            WHERE item=? AND warehouse=?
-            """,
-            (transfer_qty, transfer_item, to_wh)
-        )
+        if transfer_file:
+            moves = normalize_columns(pd.read_csv(transfer_file))
+        else:
+            moves = [(transfer_item, transfer_qty, from_wh, to_wh)]
 
-        run_query(
-            "INSERT INTO tasks VALUES (?,?,?)",
-            (f"Transferred {transfer_qty} {transfer_item}",
-             "Warehouse",
-             "Completed")
-        )
+        try:
+            report = apply_transfers(engine, moves)
+        except Exception as e:
+            st.sidebar.error(f"Transfer failed, nothing was moved: {e}")
+        else:
+            table_cache.bump("inventory", "tasks")
+            get_bus().publish_frame("transfer", report["accepted"])
 
-        st.sidebar.success("Transfer Completed")
+            if len(report["accepted"]):
+                st.sidebar.success(
+                    f"Transfer Completed: {len(report['accepted']):,} moves "
+                    f"({report['moves_per_sec']:,.0f} moves/s)"
+                )
+            for reason, count in report["rejected"]["reason"].value_counts().items():
+                st.sidebar.error(f"{count:,} rejected: {reason}")
 
 
 # ==========================================================
@@ -593,13 +880,26 @@ if st.sidebar.button("Upgrade Plan"):
 # AI PLANNING ASSISTANT
 # ==========================================================
 
+tracer.section("sidebar.assistant")
+
 st.sidebar.subheader("🧠 AI Planning Assistant")
 
-AI_AVAILABLE = False
+# SUPPLYSENSE_ASSISTANT_MODEL=stub answers offline from the snapshot.
+# Otherwise openai is checked for without importing it, and the
+# client is only built once a question is asked.
+ASSISTANT_MODEL = os.getenv("SUPPLYSENSE_ASSISTANT_MODEL", "openai")
+
+def assistant_model():
+    if ASSISTANT_MODEL == "stub":
+        return StubModel()
+    return OpenAIModel(st.secrets["OPENAI_API_KEY"])
+
+AI_AVAILABLE = ASSISTANT_MODEL == "stub"
 try:
-    from openai import OpenAI
-    client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
-    AI_AVAILABLE = True
+    AI_AVAILABLE = AI_AVAILABLE or (
+        importlib.util.find_spec("openai") is not None
+        and "OPENAI_API_KEY" in st.secrets
+    )
 except:
     pass
 
@@ -610,90 +910,95 @@ if AI_AVAILABLE:
     if ai_question:
 
         try:
-            context = f"""
-            Inventory Snapshot:
-            {inventory.head().to_string()}
-
-            Orders Snapshot:
-            {orders.head().to_string()}
-            """
-
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role":"system","content":"You are a supply chain strategist."},
-                    {"role":"user","content":context + "\nQuestion: " + ai_question}
-                ]
-            )
-
-            st.sidebar.success(response.choices[0].message.content)
+            # Answers are cached per (question, snapshot), so reruns
+            # with the same question don't call the model again.
+            assistant = get_assistant(assistant_model)
+            with st.sidebar:
+                st.write_stream(
+                    assistant.ask(ai_question, graph.get("assistant_context"))
+                )
 
         except:
             st.sidebar.warning("AI temporarily unavailable")
 
 
 # ==========================================================
-# DEMAND SPIKE SIMULATOR
+# WHAT-IF SCENARIO SIMULATOR
 # ==========================================================
 
-st.sidebar.subheader("📈 Demand Spike Simulator")
-
-if st.sidebar.button("Simulate 200% Demand Spike"):
-
-    if not orders.empty:
-
-        run_query("UPDATE orders SET qty = qty * 2")
-        st.sidebar.success("Demand Spike Simulated")
-
-    else:
-        st.sidebar.warning("No orders to modify")
+tracer.section("sidebar.scenarios")
 
+st.sidebar.subheader("📈 What-If Scenarios")
 
-# ==========================================================
-# SUPPLIER WHATSAPP AUTO ALERT
-# ==========================================================
+# Scenarios are overlays on the loaded tables; nothing is written back.
+# The options come from DISTINCT queries; inventory itself is only
+# loaded when the scenarios run.
+spike = st.sidebar.slider("Demand Multiplier", 0.5, 3.0, 2.0, 0.1)
+outages = st.sidebar.multiselect("Warehouse Outage", graph.get("warehouse_names"))
+delayed = st.sidebar.multiselect("Delayed Suppliers", graph.get("supplier_names"))
+delay_days = st.sidebar.slider("Supplier Delay (days)", 1, 14, 7)
 
-def send_supplier_alert(supplier_name, message):
+if st.sidebar.button("Run Scenarios"):
 
-    supplier_row = suppliers[suppliers["supplier"] == supplier_name]
+    inventory = graph.get("inventory")
 
-    if supplier_row.empty:
-        return
+    if inventory.empty:
+        st.sidebar.warning("No inventory to simulate")
 
-    try:
-        from twilio.rest import Client
-        client_twilio = Client(
-            st.secrets["TWILIO_SID"],
-            st.secrets["TWILIO_TOKEN"]
+    else:
+        base = ScenarioBase(
+            inventory, graph.get("planning_demand"), graph.get("revenue_by_item"),
+            graph.get("capacity"), graph.get("demand_shares"),
+            graph.get("capacity_forecast")
         )
 
-        whatsapp_number = supplier_row.iloc[0]["whatsapp"]
-
-        client_twilio.messages.create(
-            from_='whatsapp:+14155238886',
-            body=message,
-            to=f'whatsapp:{whatsapp_number}'
+        scenario_set = [Scenario(f"{round(spike * 100)}% Demand", spike)]
+        if outages:
+            scenario_set.append(Scenario("Warehouse Outage", warehouse_outages=outages))
+        if delayed:
+            scenario_set.append(Scenario(
+                f"Suppliers {delay_days}d Late",
+                supplier_delays={s: delay_days for s in delayed}
+            ))
+        if len(scenario_set) > 1:
+            scenario_set.append(Scenario(
+                "Combined", spike,
+                supplier_delays={s: delay_days for s in delayed},
+                warehouse_outages=outages
+            ))
+
+        st.session_state.scenario_results = diff_against_baseline(
+            *evaluate(base, scenario_set)
         )
+        st.sidebar.success("Scenarios Evaluated")
 
-    except:
-        pass
-
-
-if menu == "Control Tower":
 
-    for action, item in actions:
-        if "🚨" in action:
+# ==========================================================
+# SUPPLIER WHATSAPP AUTO ALERT
+# ==========================================================
 
-            supplier_match = inventory[inventory["item"] == item]
+tracer.section("alerts")
 
-            if not supplier_match.empty:
+if menu == "Control Tower" and alerts is not None and not graph.get("suppliers").empty:
 
-                supplier_name = supplier_match.iloc[0]["supplier"]
+    # Queued, deduplicated per supplier and sent in the background;
+    # reruns with the same critical items do not message again.
+    suppliers = graph.get("suppliers")
+    _, actions = graph.get("balance")
+    critical = graph.get("inventory").drop_duplicates("item").merge(
+        actions.loc[actions["action"] == EXPEDITE, ["item"]].drop_duplicates(),
+        on="item"
+    )[["item", "supplier"]].merge(
+        suppliers.drop_duplicates("supplier")[["supplier", "whatsapp"]],
+        on="supplier"
+    )
 
-                send_supplier_alert(
-                    supplier_name,
-                    f"URGENT: Immediate replenishment required for {item}"
-                )
+    for item, supplier_name, whatsapp_number in critical.itertuples(index=False):
+        alerts.submit(
+            supplier_name,
+            whatsapp_number,
+            f"URGENT: Immediate replenishment required for {item}"
+        )
 
 
 # ==========================================================
@@ -721,10 +1026,16 @@ else:
 # REAL-TIME CRITICAL ALERT BANNER
 # ==========================================================
 
-critical_items = [
-    item for action, item in actions
-    if "🚨" in action
-]
+tracer.section("banner")
+
+# The Control Tower computes the balance anyway. Other pages show the
+# banner only while a current balance is memoized, so pages built on
+# aggregates never load inventory for it.
+balance = graph.get("balance") if menu == "Control Tower" else graph.cached("balance")
+
+critical_items = [] if balance is None else list(
+    balance[1].loc[balance[1]["action"] == EXPEDITE, "item"]
+)
 
 if critical_items:
 
@@ -733,15 +1044,40 @@ if critical_items:
     )
 
 
+# ==========================================================
+# SCENARIO COMPARISON
+# ==========================================================
+
+if "scenario_results" in st.session_state:
+
+    with st.expander("🧪 Scenario Comparison", expanded=True):
+
+        scenario_deltas, scenario_changes = st.session_state.scenario_results
+
+        st.caption("Change versus baseline")
+        st.dataframe(scenario_deltas, hide_index=True)
+
+        st.caption("Rows whose recommended action changed")
+        st.dataframe(scenario_changes.head(1000), hide_index=True)
+
+
 # ==========================================================
 # ENTERPRISE ACTION HISTORY
 # ==========================================================
 
-with st.expander("📜 Enterprise Action History"):
+tracer.section("history")
 
-    logs = get_table("action_log")
+with st.expander("📜 Enterprise Action History"):
 
-    if not logs.empty:
-        st.dataframe(logs)
+    if count_rows(engine, "action_log", version=table_cache.version("action_log")):
+        table_view(
+            engine, "action_log", version=table_cache.version("action_log"),
+            key="history_action_log"
+        )
     else:
         st.info("No actions logged yet")
+
+tracer.end_rerun()
+
+if tracer.enabled and os.getenv("SUPPLYSENSE_METRICS_FILE"):
+    tracer.write_metrics(os.getenv("SUPPLYSENSE_METRICS_FILE"))
@@ -0,0 +1,116 @@
+import datetime
+import os
+
+import pandas as pd
+from sqlalchemy import text
+
+from app.balancing import BALANCED, EXPEDITE, INCREASE, PROMOTE, REDUCE
+
+# ==========================================================
+# ACTION REVIEW QUEUE
+# ==========================================================
+# Pending actions are the balancing engine's actions minus those
+# decided in action_log within the last DECISION_DAYS; older
+# decisions lapse so a SKU that goes critical again comes back.
+# Decisions are written in one batched insert per click.
+
+DECISION_DAYS = int(os.getenv("SUPPLYSENSE_DECISION_DAYS", "7"))
+
+SEVERITY = {
+    EXPEDITE: "Critical",
+    INCREASE: "High",
+    REDUCE: "Medium",
+    PROMOTE: "Low",
+    BALANCED: "None"
+}
+
+SEVERITY_DTYPE = pd.CategoricalDtype(
+    ["Critical", "High", "Medium", "Low", "None"], ordered=True
+)
+
+QUEUE_KEYS = ["action", "item", "warehouse"]
+
+def decided_keys(engine):
+    # Latest decision per key, grouped along ix_action_log_item_action.
+    try:
+        return pd.read_sql(
+            "SELECT item, action, warehouse, MAX(timestamp) AS decided_at "
+            "FROM action_log GROUP BY item, action, warehouse", engine
+        )[QUEUE_KEYS + ["decided_at"]]
+    except Exception:
+        return pd.DataFrame(columns=QUEUE_KEYS + ["decided_at"])
+
+def pending_actions(actions, decided, include_balanced=False, days=DECISION_DAYS):
+
+    queue = actions[["action", "item", "warehouse", "projected_stock", "safety"]].copy()
+    queue["severity"] = queue["action"].map(SEVERITY).astype(SEVERITY_DTYPE)
+
+    if not include_balanced:
+        queue = queue[queue["action"] != BALANCED]
+
+    if not decided.empty:
+        # Timestamps are str(datetime), so they compare as strings.
+        since = str(datetime.datetime.now() - datetime.timedelta(days=days))
+        decided = decided[decided["decided_at"].fillna("").astype(str) >= since]
+        decided = decided.astype({"action": str, "item": str})
+        keys = queue[QUEUE_KEYS].astype({"action": str, "item": str})
+        exact = pd.MultiIndex.from_frame(keys).isin(
+            pd.MultiIndex.from_frame(decided[QUEUE_KEYS])
+        )
+        # Log rows from before warehouses were recorded cover every site.
+        legacy = decided[decided["warehouse"].isna()]
+        any_site = pd.MultiIndex.from_frame(keys[["action", "item"]]).isin(
+            pd.MultiIndex.from_frame(legacy[["action", "item"]])
+        )
+        queue = queue[~(exact | any_site)]
+
+    return queue.sort_values(["severity", "item"], kind="mergesort").reset_index(drop=True)
+
+def filter_queue(queue, actions=None, severities=None, warehouses=None, search=None):
+    mask = pd.Series(True, index=queue.index)
+    if actions:
+        mask &= queue["action"].isin(actions)
+    if severities:
+        mask &= queue["severity"].isin(severities)
+    if warehouses:
+        mask &= queue["warehouse"].isin(warehouses)
+    if search:
+        mask &= queue["item"].astype(str).str.contains(search, case=False, regex=False)
+    return queue[mask]
+
+def queue_summary(queue):
+    return (
+        queue.groupby(["action", "severity", "warehouse"], observed=True, dropna=False)
+        .size()
+        .rename("pending")
+        .reset_index()
+        .sort_values(["severity", "pending"], ascending=[True, False])
+    )
+
+def record_decisions(engine, rows, decision):
+    # One transaction and one executemany for the whole selection.
+    if rows.empty:
+        return 0
+
+    stamp = str(datetime.datetime.now())
+    records = [
+        {
+            "action": str(r.action),
+            "item": r.item,
+            "decision": decision,
+            "timestamp": stamp,
+            "warehouse": r.warehouse
+        }
+        for r in rows[QUEUE_KEYS].itertuples(index=False)
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO action_log(action, item, decision, timestamp, warehouse) "
+                "VALUES (:action, :item, :decision, :timestamp, :warehouse)"
+            ),
+            records
+        )
+
+    return len(records)
@@ -0,0 +1,221 @@
+import queue
+import random
+import threading
+import time
+
+import pandas as pd
+
+from app.tracing import tracer
+
+# ==========================================================
+# ASYNCHRONOUS SUPPLIER ALERT DISPATCHER
+# ==========================================================
+# Page renders only enqueue alerts. A background thread dedups them
+# per supplier, batches what arrives within a short window into one
+# message per supplier, rate-limits sends and retries failures with
+# exponential backoff. The transport is pluggable so tests and
+# offline runs can use FakeTransport.
+
+DEDUP_SECONDS = 6 * 60 * 60
+BATCH_SECONDS = 2.0
+MAX_PER_SECOND = 5.0
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 1.0
+
+WHATSAPP_FROM = "whatsapp:+14155238886"
+
+# ==========================================================
+# TRANSPORTS
+# ==========================================================
+
+class TwilioTransport:
+
+    def __init__(self, sid, token, sender=WHATSAPP_FROM):
+        self.sid = sid
+        self.token = token
+        self.sender = sender
+        self._client = None
+
+    def send(self, to, body):
+        # One client (and its HTTP session) for the life of the process.
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(self.sid, self.token)
+        self._client.messages.create(from_=self.sender, body=body, to=f"whatsapp:{to}")
+
+class FakeTransport:
+
+    def __init__(self, failures=0):
+        # The first `failures` sends raise, to exercise retries.
+        self.failures = failures
+        self.sent = []
+        self.attempts = 0
+
+    def send(self, to, body):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("fake transport failure")
+        self.sent.append((to, body))
+
+# ==========================================================
+# DISPATCHER
+# ==========================================================
+
+class AlertDispatcher:
+
+    def __init__(self, transport, dedup_seconds=DEDUP_SECONDS,
+                 batch_seconds=BATCH_SECONDS, max_per_second=MAX_PER_SECOND,
+                 max_attempts=MAX_ATTEMPTS, backoff_seconds=BACKOFF_SECONDS):
+        self.transport = transport
+        self.dedup_seconds = dedup_seconds
+        self.batch_seconds = batch_seconds
+        self.min_interval = 1.0 / max_per_second if max_per_second else 0.0
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+        self._queue = queue.Queue()
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._last_send = 0.0
+        self._thread = None
+        self._stopping = threading.Event()
+
+        self.stats = {"queued": 0, "deduped": 0, "sent": 0, "retries": 0, "failed": 0}
+
+    def submit(self, supplier, to, message):
+        # Returns False when the same alert went to this supplier
+        # within the dedup window, or there is no number to send to.
+        if pd.isna(to) or not str(to).strip():
+            return False
+
+        now = time.monotonic()
+        key = (supplier, message)
+
+        with self._lock:
+            self._prune(now)
+            last = self._seen.get(key)
+            if last is not None and now - last < self.dedup_seconds:
+                self.stats["deduped"] += 1
+                return False
+            # Re-inserted so the dict stays in send-time order.
+            self._seen.pop(key, None)
+            self._seen[key] = now
+            self.stats["queued"] += 1
+
+        self._ensure_started()
+        self._queue.put((supplier, to, message))
+        return True
+
+    def _prune(self, now):
+        # Oldest first; stops at the first entry still in the window.
+        while self._seen:
+            key = next(iter(self._seen))
+            if now - self._seen[key] < self.dedup_seconds:
+                break
+            del self._seen[key]
+
+    def flush(self, timeout=None):
+        # Blocks until everything queued so far has been handled.
+        if timeout is None:
+            self._queue.join()
+        else:
+            self._join(timeout)
+
+    def stop(self):
+        self._stopping.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join()
+
+    def _join(self, timeout):
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="supplier-alerts", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+
+        while not self._stopping.is_set():
+
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                break
+
+            # Collect everything that arrives within the batch window.
+            items = [first]
+            deadline = time.monotonic() + self.batch_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._stopping.set()
+                    self._queue.task_done()
+                    break
+                items.append(entry)
+
+            batches = {}
+            for supplier, to, message in items:
+                batches.setdefault((supplier, to), []).append(message)
+
+            for (supplier, to), messages in batches.items():
+                if not self._deliver(to, "\n".join(messages)):
+                    # Let the next render queue these again.
+                    with self._lock:
+                        for message in messages:
+                            self._seen.pop((supplier, message), None)
+
+            for _ in items:
+                self._queue.task_done()
+
+    def _deliver(self, to, body):
+
+        for attempt in range(self.max_attempts):
+
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_send = time.monotonic()
+
+            try:
+                with tracer.span("alerts.send"):
+                    self.transport.send(to, body)
+                self.stats["sent"] += 1
+                return True
+            except Exception:
+                if attempt + 1 == self.max_attempts:
+                    break
+                self.stats["retries"] += 1
+                delay = self.backoff_seconds * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
+
+        self.stats["failed"] += 1
+        return False
+
+# ==========================================================
+# PROCESS-WIDE DISPATCHER
+# ==========================================================
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher(transport_factory):
+    # `transport_factory` is only called the first time.
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher(transport_factory())
+        return _dispatcher
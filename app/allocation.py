@@ -0,0 +1,169 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# INDEXED FULFILMENT ALLOCATOR
+# ==========================================================
+# Own stock and supply_pool sources are flattened once into one
+# frame sorted by (item, rank), with a running total of available
+# qty per item. Each source then covers a fixed slice of the item's
+# cumulative supply, and each request line covers a slice of the
+# item's cumulative demand, so a whole basket is allocated by
+# intersecting those intervals.
+
+OWN_SOURCE = "🏭 Own Warehouse"
+OWN_CONTACT = "Internal Stock"
+
+# rank key -> (suppliers column, ascending)
+RANK_KEYS = {
+    "pool": (None, True),
+    "cost": ("cost_per_unit", True),
+    "reliability": ("reliability", False),
+    "lead_time": ("lead_time", True)
+}
+
+PLAN_COLUMNS = ["line", "item", "source", "allocated", "contact"]
+LINE_COLUMNS = ["line", "item", "requested", "allocated", "shortage"]
+
+def contact_label(pool):
+    return (
+        pool["contact"].astype(str) + " | "
+        + pool["whatsapp"].astype(str) + " | "
+        + pool["email"].astype(str)
+    )
+
+class SupplyIndex:
+
+    def __init__(self, inventory, supply_pool, suppliers=None, rank_by="cost"):
+
+        if rank_by not in RANK_KEYS:
+            raise ValueError(f"Unknown rank key: {rank_by}")
+
+        frames = []
+
+        if not inventory.empty:
+            own = inventory.groupby("item", sort=False)["on_hand"].sum().reset_index()
+            frames.append(pd.DataFrame({
+                "item": own["item"],
+                "source": OWN_SOURCE,
+                "available": own["on_hand"],
+                "contact": OWN_CONTACT,
+                # Own stock is always drawn first, as on the Control Tower.
+                "tier": 0,
+                "rank": 0.0
+            }))
+
+        if not supply_pool.empty:
+            pool = supply_pool.reset_index(drop=True)
+            column, ascending = RANK_KEYS[rank_by]
+            rank = pd.Series(np.arange(len(pool), dtype="float64"))
+
+            if column and suppliers is not None and column in suppliers:
+                # First supplier row per (supplier, item) decides the rank.
+                terms = suppliers.drop_duplicates(["supplier", "item"])[
+                    ["supplier", "item", column]
+                ]
+                matched = pool[["source", "item"]].merge(
+                    terms, left_on=["source", "item"],
+                    right_on=["supplier", "item"], how="left"
+                )[column]
+                values = pd.to_numeric(matched, errors="coerce").to_numpy()
+                # Unranked sources go last, keeping pool order among them.
+                rank = pd.Series(np.where(
+                    np.isnan(values), np.inf, values if ascending else -values
+                ))
+
+            frames.append(pd.DataFrame({
+                "item": pool["item"],
+                "source": pool["source"],
+                "available": pool["available_qty"],
+                "contact": contact_label(pool),
+                "tier": 1,
+                "rank": rank.to_numpy()
+            }))
+
+        sources = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=["item", "source", "available", "contact", "tier", "rank"]
+        )
+
+        sources["available"] = (
+            pd.to_numeric(sources["available"], errors="coerce").fillna(0).clip(lower=0)
+        ).astype("int64")
+        sources = sources[sources["available"] > 0]
+        sources = sources.sort_values(["item", "tier", "rank"], kind="mergesort")
+
+        sources["cum_end"] = sources.groupby("item")["available"].cumsum()
+        sources["cum_start"] = sources["cum_end"] - sources["available"]
+
+        self.rank_by = rank_by
+        self.sources = sources.reset_index(drop=True)
+
+        # item -> (first row, row after last) in the sorted sources.
+        bounds = self.sources.groupby("item").indices
+        self.slices = {item: (rows[0], rows[-1] + 1) for item, rows in bounds.items()}
+        self.totals = self.sources.groupby("item")["available"].sum()
+
+    def rows_for(self, items):
+        spans = [self.slices[i] for i in items if i in self.slices]
+        if not spans:
+            return self.sources.iloc[0:0]
+        return self.sources.iloc[np.concatenate([np.arange(a, b) for a, b in spans])]
+
+    def available(self, item):
+        return int(self.totals.get(item, 0))
+
+    def allocate(self, requests):
+        # requests: frame (or iterable of pairs) with item and qty.
+        # Returns (plans, lines): one row per source used by each
+        # line, and one row per line with its shortage.
+
+        if not isinstance(requests, pd.DataFrame):
+            requests = pd.DataFrame(list(requests), columns=["item", "qty"])
+
+        lines = pd.DataFrame({
+            "line": np.arange(len(requests)),
+            "item": requests["item"].to_numpy(),
+            "requested": pd.to_numeric(requests["qty"], errors="coerce")
+                .fillna(0).clip(lower=0).astype("int64").to_numpy()
+        })
+
+        # Earlier lines for the same item take stock first.
+        lines["need_end"] = lines.groupby("item")["requested"].cumsum()
+        lines["need_start"] = lines["need_end"] - lines["requested"]
+
+        candidates = self.rows_for(pd.unique(lines["item"]))
+        pairs = lines.merge(candidates, on="item", how="inner")
+        pairs["allocated"] = (
+            np.minimum(pairs["need_end"], pairs["cum_end"])
+            - np.maximum(pairs["need_start"], pairs["cum_start"])
+        ).clip(lower=0)
+
+        plans = pairs[pairs["allocated"] > 0].sort_values(
+            ["line", "tier", "rank"], kind="mergesort"
+        )[PLAN_COLUMNS].reset_index(drop=True)
+
+        allocated = plans.groupby("line")["allocated"].sum()
+        lines["allocated"] = lines["line"].map(allocated).fillna(0).astype("int64")
+        lines["shortage"] = lines["requested"] - lines["allocated"]
+
+        return plans, lines[LINE_COLUMNS]
+
+# ==========================================================
+# INDEX CACHE
+# ==========================================================
+
+_indexes = {}
+_lock = threading.Lock()
+
+def supply_index(inventory, supply_pool, suppliers, rank_by="cost", version=None):
+    # `version` identifies the table snapshot, e.g. cache version numbers.
+    key = (rank_by, version)
+    with _lock:
+        index = _indexes.get(key)
+        if index is None or version is None:
+            index = SupplyIndex(inventory, supply_pool, suppliers, rank_by)
+            _indexes.clear()
+            _indexes[key] = index
+        return index
@@ -1,14 +1,7 @@
-from kafka import KafkaProducer
-import json
-import os
+from app.event_bus import TOPIC, get_bus
 
-producer = KafkaProducer(
-    bootstrap_servers=os.getenv("KAFKA_SERVER"),
-    value_serializer=lambda v: json.dumps(v).encode('utf-8')
-)
+# The producer is created lazily by the shared event bus instead of at
+# import time.
 
 def send_event(event_type, data):
-    producer.send("supply_events", {
-        "type": event_type,
-        "data": data
-    })
+    get_bus().publish(event_type, data, topic=TOPIC)
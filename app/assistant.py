@@ -0,0 +1,218 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from app.balancing import ACTION_LABELS, EXPEDITE, INCREASE
+
+# ==========================================================
+# AI PLANNING ASSISTANT BACKEND
+# ==========================================================
+# The prompt carries a compact summary of the balance and forecast
+# (per warehouse, per category, and the most exposed SKUs) rather
+# than a few raw rows. The summary is a graph node, so it is rebuilt
+# only when its tables change. Answers are cached by (question,
+# summary hash) with a TTL, so reruns with the same question cost
+# nothing, and new data gets a fresh answer. Models are pluggable:
+# OpenAIModel for real use, StubModel to run offline.
+
+SYSTEM_PROMPT = (
+    "You are a supply chain strategist. Answer from the planning "
+    "snapshot provided; say so when it does not contain the answer."
+)
+
+CACHE_TTL_SECONDS = int(os.getenv("SUPPLYSENSE_ASSISTANT_TTL", "900"))
+CACHE_MAX_ENTRIES = 256
+MAX_GROUPS = 20
+TOP_ITEMS = 15
+
+# ==========================================================
+# PLANNING SNAPSHOT
+# ==========================================================
+
+def action_counts(actions, by):
+    counts = pd.crosstab(actions[by].fillna("-"), actions["action"].astype(str))
+    return counts.reindex(columns=ACTION_LABELS, fill_value=0)
+
+def planning_summary(inventory, balance, sku_daily):
+    """Compact text snapshot of stock, actions and forecast demand."""
+
+    if inventory.empty:
+        return "No inventory loaded."
+
+    _, actions = balance
+    lines = []
+
+    stock = inventory.groupby(inventory["warehouse"].fillna("-"))["on_hand"].sum()
+    counts = action_counts(actions, "warehouse").reindex(stock.index, fill_value=0)
+    by_wh = counts.assign(on_hand=stock).sort_values(
+        [EXPEDITE, INCREASE], ascending=False
+    ).head(MAX_GROUPS)
+
+    lines.append("Warehouses (on_hand | " + " | ".join(ACTION_LABELS) + "):")
+    for wh, row in by_wh.iterrows():
+        lines.append(f"- {wh}: {int(row['on_hand'])} | " +
+                     " | ".join(str(int(row[a])) for a in ACTION_LABELS))
+
+    if "category" in inventory:
+        category = inventory.drop_duplicates("item").set_index("item")["category"].fillna("-")
+        demand = sku_daily.sum(axis=0) if not sku_daily.empty else pd.Series(dtype="float64")
+        by_cat = pd.DataFrame({
+            "on_hand": inventory.groupby(inventory["category"].fillna("-"))["on_hand"].sum(),
+            "forecast": demand.groupby(category.reindex(demand.index).fillna("-")).sum(),
+            "expedite": actions.loc[actions["action"] == EXPEDITE, "item"]
+                .map(category).value_counts()
+        }).fillna(0).sort_values("expedite", ascending=False).head(MAX_GROUPS)
+
+        horizon = f"{len(sku_daily)}-day forecast" if not sku_daily.empty else "no forecast yet"
+        lines.append(f"Categories (on_hand | {horizon} | expedite rows):")
+        for cat, row in by_cat.iterrows():
+            lines.append(f"- {cat}: {int(row['on_hand'])} | "
+                         f"{row['forecast']:.0f} | {int(row['expedite'])}")
+
+    exposed = actions.assign(gap=actions["projected_stock"] - actions["safety"]) \
+        .nsmallest(TOP_ITEMS, "gap")
+    lines.append("Most exposed SKUs (item @ warehouse: projected vs safety, action):")
+    for row in exposed.itertuples(index=False):
+        lines.append(f"- {row.item} @ {row.warehouse}: {row.projected_stock:.0f} "
+                     f"vs {row.safety:.0f}, {row.action}")
+
+    return "\n".join(lines)
+
+def snapshot_hash(summary):
+    return hashlib.sha1(summary.encode()).hexdigest()[:16]
+
+# ==========================================================
+# MODELS
+# ==========================================================
+
+class OpenAIModel:
+
+    def __init__(self, api_key, model="gpt-4.1-mini"):
+        self.api_key = api_key
+        self.model = model
+        self._client = None
+
+    def stream(self, system, prompt):
+        # One client (and its HTTP session) for the life of the process.
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        response = self._client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+class StubModel:
+    # Offline stand-in: answers with the snapshot lines that share a
+    # word with the question, streamed word by word.
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def stream(self, system, prompt):
+        self.calls += 1
+        snapshot, _, question = prompt.rpartition("\nQuestion: ")
+        words = {w for w in re.findall(r"\w+", question.lower()) if len(w) > 2}
+        hits = [
+            line for line in snapshot.splitlines()
+            if line.startswith("- ") and words & set(re.findall(r"\w+", line.lower()))
+        ]
+        answer = "\n".join(hits[:10]) or "Nothing in the snapshot matches that question."
+        for word in re.split(r"(\s+)", answer):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word
+
+# ==========================================================
+# ANSWER CACHE
+# ==========================================================
+
+class AnswerCache:
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key, answer):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), answer)
+            self._entries.move_to_end(key)
+            now = time.monotonic()
+            for old in [k for k, (at, _) in self._entries.items() if now - at >= self.ttl]:
+                del self._entries[old]
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+# ==========================================================
+# ASSISTANT
+# ==========================================================
+
+def normalize_question(question):
+    return " ".join(question.lower().split()).rstrip("?")
+
+class Assistant:
+
+    def __init__(self, model, cache=None):
+        self.model = model
+        self.cache = cache or AnswerCache()
+
+    def ask(self, question, summary):
+        """Yield the answer in chunks; cached answers come back whole."""
+
+        key = (normalize_question(question), snapshot_hash(summary))
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        prompt = f"Planning snapshot:\n{summary}\nQuestion: {question}"
+        for chunk in self.model.stream(SYSTEM_PROMPT, prompt):
+            parts.append(chunk)
+            yield chunk
+
+        # Only complete answers are cached; a failed stream raises above.
+        self.cache.put(key, "".join(parts))
+
+_assistant = None
+_assistant_lock = threading.Lock()
+
+def get_assistant(model_factory):
+    # `model_factory` is only called the first time.
+    global _assistant
+    with _assistant_lock:
+        if _assistant is None:
+            _assistant = Assistant(model_factory())
+        return _assistant
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# ACTION LABELS (ORDERED BY SEVERITY)
+# ==========================================================
+
+EXPEDITE = "🚨 Expedite Supplier"
+INCREASE = "⚠️ Increase Production"
+REDUCE = "🛑 Reduce Batch Size"
+PROMOTE = "📦 Run Promotion"
+BALANCED = "✅ Balanced"
+
+ACTION_LABELS = [EXPEDITE, INCREASE, REDUCE, PROMOTE, BALANCED]
+
+ACTION_DTYPE = pd.CategoricalDtype(ACTION_LABELS, ordered=True)
+
+ACTION_COLUMNS = ["action", "item", "warehouse", "projected_stock", "safety"]
+
+# ==========================================================
+# VECTORIZED CLASSIFICATION
+# ==========================================================
+
+def classify_actions(projected, safety):
+    # Same precedence as the original if/elif chain; rows where every
+    # comparison is False (including NaN projections) fall to Balanced.
+    projected = np.asarray(projected, dtype="float64")
+    safety = np.asarray(safety, dtype="float64")
+
+    codes = np.select(
+        [
+            projected < 0,
+            projected < safety,
+            projected > safety * 5,
+            projected > safety * 3,
+        ],
+        [0, 1, 2, 3],
+        default=4
+    )
+
+    return pd.Categorical.from_codes(codes, dtype=ACTION_DTYPE)
+
+def empty_actions():
+    return pd.DataFrame({
+        "action": pd.Categorical([], dtype=ACTION_DTYPE),
+        "item": pd.Series([], dtype="object"),
+        "warehouse": pd.Series([], dtype="object"),
+        "projected_stock": pd.Series([], dtype="float64"),
+        "safety": pd.Series([], dtype="float64")
+    })
+
+# ==========================================================
+# BALANCING ENGINE
+# ==========================================================
+
+def balancing_engine(inventory, demand):
+    # `demand` is one row per (item, warehouse) with its `qty`, from
+    # rebalancing.warehouse_demand. Without a warehouse column it is
+    # one row per item and every row of the item is charged it all.
+
+    if inventory.empty:
+        return pd.DataFrame(), empty_actions()
+
+    df = inventory.copy()
+
+    if not demand.empty:
+        keys = ["item", "warehouse"] if "warehouse" in demand and "warehouse" in df else ["item"]
+        demand = demand[keys + ["qty"]].rename(columns={"qty":"forecast_demand"})
+        df = df.merge(demand, on=keys, how="left")
+    else:
+        df["forecast_demand"] = 0
+
+    df["forecast_demand"] = df["forecast_demand"].fillna(0)
+    df["available_stock"] = df["on_hand"] + df["wip"]
+    df["projected_stock"] = df["available_stock"] - df["forecast_demand"]
+
+    actions = pd.DataFrame({
+        "action": classify_actions(df["projected_stock"], df["safety"]),
+        "item": df["item"].to_numpy(),
+        "warehouse": (
+            df["warehouse"].to_numpy() if "warehouse" in df
+            else np.full(len(df), None, dtype="object")
+        ),
+        "projected_stock": df["projected_stock"].to_numpy(dtype="float64"),
+        "safety": df["safety"].to_numpy(dtype="float64")
+    })
+
+    return df, actions
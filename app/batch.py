@@ -0,0 +1,228 @@
+import argparse
+import datetime
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.balancing import ACTION_COLUMNS, balancing_engine
+from app.capacity import CAPACITY_HORIZON_DAYS
+from app.forecasting import forecast_skus
+from app.ingest import copy_chunk, executemany_chunk
+from app.planning import (
+    capacity_utilization, forecast_window, frame_totals, kpis, plan_partition,
+    planning_demand
+)
+from app.rebalancing import demand_shares, order_mix, warehouse_demand
+from app.risk import stockout_risk
+from app.schema import create_tables
+
+# ==========================================================
+# HEADLESS PLANNING RUN
+# python -m app.batch [--by warehouse|category] [--workers N] [--verify]
+# ==========================================================
+# Runs the same engines as the Control Tower without Streamlit.
+# Inventory is split by warehouse or category and each slice is
+# forecast and balanced in a worker process. Slices get the
+# catalogue-wide forecast window, so their actions match a single
+# full run row for row. Results go back to the database in bulk,
+# tagged with a run id.
+
+PARTITION_KEYS = ("warehouse", "category")
+
+plan_tables_sql = [
+
+"""
+CREATE TABLE IF NOT EXISTS plan_runs(
+run_id TEXT,created TEXT,partition_by TEXT,partitions INT,
+revenue FLOAT,inventory_value FLOAT,service_level FLOAT,
+utilization FLOAT,actions INT,seconds FLOAT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS plan_actions(
+run_id TEXT,partition_key TEXT,action TEXT,item TEXT,warehouse TEXT,
+projected_stock FLOAT,safety FLOAT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS plan_forecast(
+run_id TEXT,item TEXT,date TEXT,qty FLOAT)
+"""
+]
+
+def create_plan_tables(conn):
+    for sql in plan_tables_sql:
+        conn.execute(text(sql))
+
+def partitions(inventory, item_date, demand_by_item, shares, by):
+    # Each slice carries only the demand rows for the items it holds.
+    # Shares are split over the whole network before slicing, so an
+    # item stocked in several slices is charged the same everywhere.
+    keys = inventory[by].fillna("")
+    for key, part in inventory.groupby(keys, sort=True):
+        items = part["item"].unique()
+        yield (
+            key,
+            part,
+            item_date[item_date["item"].isin(items)],
+            demand_by_item[demand_by_item["item"].isin(items)],
+            shares[shares["item"].isin(items)]
+        )
+
+def run_partitions(slices, bounds, workers):
+    keys, inventories, item_dates, by_items, shares = zip(*slices) if slices else ((),) * 5
+    args = (inventories, item_dates, by_items, shares, [bounds] * len(keys))
+
+    if workers <= 1 or len(keys) < 2:
+        results = list(map(plan_partition, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(plan_partition, *args))
+
+    return keys, results
+
+def long_forecast(sku_daily):
+    if sku_daily.empty:
+        return pd.DataFrame(columns=["item", "date", "qty"])
+    frame = sku_daily.rename_axis("date").reset_index().melt(
+        id_vars="date", var_name="item", value_name="qty"
+    )
+    frame["date"] = frame["date"].dt.strftime("%Y-%m-%d")
+    return frame[["item", "date", "qty"]]
+
+def write_results(engine, run, actions, forecast):
+    load = copy_chunk if engine.dialect.name == "postgresql" else executemany_chunk
+    with engine.begin() as conn:
+        create_plan_tables(conn)
+        load(conn, "plan_runs", pd.DataFrame([run]))
+        if not actions.empty:
+            load(conn, "plan_actions", actions)
+        if not forecast.empty:
+            load(conn, "plan_forecast", forecast)
+
+def run_plan(loader, by="warehouse", workers=1):
+    """Plan the whole catalogue; returns (run row, actions, forecast)."""
+
+    if by not in PARTITION_KEYS:
+        raise ValueError(f"Partition by one of {', '.join(PARTITION_KEYS)}")
+
+    start = time.perf_counter()
+    run_id = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+    inventory = loader("inventory")
+    orders = loader("orders")
+    item_date = loader("demand_by_item_date")
+    demand_by_item = loader("demand_by_item")
+    bounds = forecast_window(item_date)
+    # Same per-warehouse split as the Control Tower's actions.
+    shares = demand_shares(inventory, order_mix(orders), loader("warehouse_regions"))
+
+    slices = list(partitions(inventory, item_date, demand_by_item, shares, by)) \
+        if not inventory.empty else []
+    keys, results = run_partitions(slices, bounds, workers)
+
+    actions = pd.concat(
+        [r[1].assign(partition_key=k) for k, r in zip(keys, results)],
+        ignore_index=True
+    ) if results else pd.DataFrame(columns=ACTION_COLUMNS + ["partition_key"])
+    actions["action"] = actions["action"].astype(str)
+
+    # A SKU stocked in several slices is forecast in each of them,
+    # always to the same numbers.
+    forecast = pd.concat(
+        [long_forecast(r[0]) for r in results], ignore_index=True
+    ).drop_duplicates(["item", "date"]) if results else long_forecast(pd.DataFrame())
+
+    risk = stockout_risk(
+        inventory, item_date, loader("suppliers"), workers=workers
+    )
+    # Same capacity plan as the Control Tower's Factory Utilization.
+    capacity_daily = forecast_skus(item_date, horizon=CAPACITY_HORIZON_DAYS, bounds=bounds) \
+        if bounds is not None else pd.DataFrame()
+    util = capacity_utilization(capacity_daily, shares, loader("capacity"))
+    revenue, inv_value, service, util = kpis(frame_totals(orders, inventory), risk, util)
+
+    run = {
+        "run_id": run_id,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "partition_by": by,
+        "partitions": len(keys),
+        "revenue": float(revenue),
+        "inventory_value": float(inv_value),
+        "service_level": float(service),
+        "utilization": float(util),
+        "actions": len(actions),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+    actions = actions.assign(run_id=run_id)[
+        ["run_id", "partition_key"] + ACTION_COLUMNS
+    ]
+    forecast = forecast.assign(run_id=run_id)[["run_id", "item", "date", "qty"]]
+
+    return run, actions, forecast
+
+def verify_plan(loader, actions):
+    # Same engines, one process, no partitioning: what the UI shows.
+    item_date = loader("demand_by_item_date")
+    inventory = loader("inventory")
+    sku_daily = pd.DataFrame()
+    if forecast_window(item_date) is not None:
+        sku_daily = forecast_skus(item_date)
+    shares = demand_shares(inventory, order_mix(loader("orders")), loader("warehouse_regions"))
+    _, expected = balancing_engine(inventory, warehouse_demand(
+        planning_demand(sku_daily, loader("demand_by_item")), shares
+    ))
+
+    # A slice's least-squares solve has fewer columns than the full
+    # one, so projections agree to rounding rather than bit for bit.
+    key = ["item", "warehouse", "action"]
+    got = actions[ACTION_COLUMNS].astype({"action": str}).sort_values(key, ignore_index=True)
+    want = expected.astype({"action": str}).sort_values(key, ignore_index=True)
+    return len(got) == len(want) and got[key].equals(want[key]) and np.allclose(
+        got[["projected_stock", "safety"]].to_numpy(dtype="float64"),
+        want[["projected_stock", "safety"]].to_numpy(dtype="float64"),
+        equal_nan=True
+    )
+
+def main(argv):
+
+    from app.database import engine, get_table
+
+    parser = argparse.ArgumentParser(prog="python -m app.batch")
+    parser.add_argument("--by", choices=PARTITION_KEYS, default="warehouse")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--verify", action="store_true",
+                        help="compare the actions with a single unpartitioned run")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="plan without writing results")
+    args = parser.parse_args(argv)
+
+    with engine.begin() as conn:
+        create_tables(conn)
+
+    run, actions, forecast = run_plan(get_table, args.by, args.workers)
+
+    if not args.dry_run:
+        write_results(engine, run, actions, forecast)
+
+    print(
+        f"run {run['run_id']}: {run['partitions']} {args.by} partitions, "
+        f"{run['actions']:,} actions, {len(forecast):,} forecast rows "
+        f"in {run['seconds']}s"
+    )
+
+    if args.verify:
+        if not verify_plan(get_table, actions):
+            print("Partitioned actions differ from a full run")
+            return 1
+        print("Partitioned actions match a full run")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
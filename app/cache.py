@@ -0,0 +1,126 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# ==========================================================
+# PROCESS-WIDE TABLE CACHE
+# ==========================================================
+# Frames are shared by every Streamlit session in the process,
+# so callers must treat returned frames as read-only.
+
+CACHE_MAX_TABLES = int(os.getenv("SUPPLYSENSE_CACHE_TABLES", "16"))
+CACHE_MAX_MB = int(os.getenv("SUPPLYSENSE_CACHE_MB", "512"))
+
+WRITE_PATTERN = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|ALTER\s+TABLE|"
+    r"DROP\s+TABLE(?:\s+IF\s+EXISTS)?|TRUNCATE(?:\s+TABLE)?)"
+    r"\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE
+)
+
+# CREATE TABLE is deliberately absent: the schema bootstrap runs on
+# every rerun, and a table that did not exist was never cached.
+
+def written_tables(query):
+    return {m.lower() for m in WRITE_PATTERN.findall(query)}
+
+# Writes that change or remove existing rows, as opposed to appends.
+REWRITE_PATTERN = re.compile(
+    r"\b(?:UPDATE|DELETE\s+FROM|ALTER\s+TABLE|"
+    r"DROP\s+TABLE(?:\s+IF\s+EXISTS)?|TRUNCATE(?:\s+TABLE)?)"
+    r"\s+([A-Za-z_][A-Za-z0-9_]*)",
+    re.IGNORECASE
+)
+
+def rewritten_tables(query):
+    return {m.lower() for m in REWRITE_PATTERN.findall(query)}
+
+def frame_bytes(df):
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+class TableCache:
+
+    def __init__(self, max_tables=CACHE_MAX_TABLES, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.max_tables = max_tables
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, name):
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def bump(self, *names):
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+                self._drop(name)
+
+    def get(self, name, loader):
+
+        with self._lock:
+            version = self._versions.get(name, 0)
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        df = loader(name)
+
+        with self._lock:
+            # A write that landed while we were loading makes this
+            # frame stale; hand it back but don't keep it.
+            if self._versions.get(name, 0) == version:
+                self._drop(name)
+                size = frame_bytes(df)
+                self._entries[name] = (version, df, size)
+                self._bytes += size
+                self._evict()
+
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tables": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "versions": dict(self._versions)
+            }
+
+    def _drop(self, name):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self):
+        # Keep the most recently used table even if it alone
+        # exceeds the byte budget.
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_tables or self._bytes > self.max_bytes
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+table_cache = TableCache()
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# TIME-PHASED CAPACITY PLANNING
+# ==========================================================
+# Forecast SKU demand is bucketed by day and warehouse (using the
+# same per-warehouse split as network rebalancing) and loaded onto
+# every machine in the warehouse in proportion to its effective
+# capacity: daily_capacity scaled by shift_hours against a reference
+# shift, times utilization. Load and capacity are day x machine
+# matrices, so a 90-day horizon over hundreds of machines is a few
+# array operations.
+#
+# Overloaded buckets get two levelling suggestions: build ahead on
+# earlier days that have spare capacity in the same warehouse, and
+# overtime hours for whatever is still left.
+
+CAPACITY_HORIZON_DAYS = int(os.getenv("SUPPLYSENSE_CAPACITY_HORIZON", "28"))
+
+# daily_capacity is rated for one shift of this length.
+REFERENCE_SHIFT_HOURS = 8
+
+OVERLOAD_COLUMNS = [
+    "date", "warehouse", "machines", "load", "capacity", "excess",
+    "build_ahead", "overtime_hours"
+]
+
+def effective_capacity(capacity):
+    """One row per machine with its effective units/day and units/hour."""
+
+    machines = capacity[["warehouse", "machine"]].copy()
+    rated = pd.to_numeric(capacity["daily_capacity"], errors="coerce").fillna(0).clip(lower=0)
+    shift = pd.to_numeric(capacity["shift_hours"], errors="coerce").fillna(REFERENCE_SHIFT_HOURS)
+    util = pd.to_numeric(capacity["utilization"], errors="coerce").fillna(1.0)
+    # Accept both 0.8 and 80 for 80%.
+    util = util.where(util <= 1, util / 100).clip(0, 1)
+
+    machines["effective"] = rated * shift.clip(lower=0) / REFERENCE_SHIFT_HOURS * util
+    machines["per_hour"] = machines["effective"] / shift.where(shift > 0)
+    return machines.reset_index(drop=True)
+
+def warehouse_load(sku_daily, shares):
+    """Date x warehouse demand from a date x item forecast.
+
+    `shares` has one row per (item, warehouse) with the fraction of
+    the item's demand that warehouse serves.
+    """
+    if sku_daily.empty or shares.empty:
+        return pd.DataFrame(index=sku_daily.index)
+
+    rows = pd.Index(sku_daily.columns).get_indexer(shares["item"])
+    cols, warehouses = pd.factorize(shares["warehouse"])
+    keep = (rows >= 0) & (cols >= 0)
+
+    # Item x warehouse share matrix; one product buckets every day.
+    split = np.zeros((len(sku_daily.columns), len(warehouses)))
+    np.add.at(split, (rows[keep], cols[keep]), shares["share"].to_numpy()[keep])
+
+    return pd.DataFrame(sku_daily.to_numpy() @ split, index=sku_daily.index, columns=warehouses)
+
+def level_load(excess, slack):
+    # Build-ahead per bucket: spare capacity on earlier days of the
+    # same column absorbs later overload. Vectorized across columns,
+    # one step per day.
+    pulled = np.zeros_like(excess)
+    pool = np.zeros(excess.shape[1])
+    for day in range(excess.shape[0]):
+        pulled[day] = np.minimum(excess[day], pool)
+        pool += slack[day] - pulled[day]
+    return pulled
+
+def capacity_plan(load, capacity):
+    """Returns (utilization, overloads, summary).
+
+    `utilization` is the date x machine load/capacity matrix,
+    `overloads` one row per overloaded (date, warehouse) with its
+    levelling suggestions.
+    """
+    machines = effective_capacity(capacity)
+    days = load.index
+
+    wh_capacity = machines.groupby("warehouse")["effective"].sum()
+    wh_per_hour = machines.groupby("warehouse")["per_hour"].sum()
+    planned = [wh for wh in load.columns if wh_capacity.get(wh, 0) > 0]
+    unplanned = load.drop(columns=planned).sum().sum() if len(load.columns) else 0.0
+
+    # Day x warehouse buckets.
+    L = load.reindex(columns=planned).to_numpy(dtype="float64") if planned \
+        else np.zeros((len(days), 0))
+    C = wh_capacity.reindex(planned).to_numpy(dtype="float64")
+
+    # Day x machine: each machine carries its share of the warehouse load.
+    wh_index = pd.Index(planned).get_indexer(machines["warehouse"])
+    live = (wh_index >= 0) & (machines["effective"].to_numpy() > 0)
+    machines = machines[live].reset_index(drop=True)
+    wh_index = wh_index[live]
+    eff = machines["effective"].to_numpy()
+
+    machine_load = L[:, wh_index] * (eff / C[wh_index])
+    utilization = pd.DataFrame(
+        machine_load / eff,
+        index=days,
+        columns=machines["warehouse"].astype(str) + " / " + machines["machine"].astype(str)
+    )
+
+    excess = np.clip(L - C, 0, None)
+    slack = np.clip(C - L, 0, None)
+    build_ahead = level_load(excess, slack)
+    remaining = excess - build_ahead
+
+    hit = np.nonzero(excess > 0)
+    per_hour = wh_per_hour.reindex(planned).to_numpy(dtype="float64")
+    machine_count = machines.groupby("warehouse").size().reindex(planned).to_numpy()
+    overloads = pd.DataFrame({
+        "date": days[hit[0]],
+        "warehouse": np.asarray(planned, dtype=object)[hit[1]],
+        "machines": machine_count[hit[1]],
+        "load": L[hit],
+        "capacity": C[hit[1]],
+        "excess": excess[hit],
+        "build_ahead": build_ahead[hit],
+        "overtime_hours": remaining[hit] / per_hour[hit[1]]
+    }, columns=OVERLOAD_COLUMNS).round({
+        "load": 1, "capacity": 1, "excess": 1, "build_ahead": 1, "overtime_hours": 1
+    })
+
+    total_capacity = C.sum() * len(days)
+    return utilization, overloads, {
+        "days": len(days),
+        "machines": len(machines),
+        "utilization": round(float(L.sum() / total_capacity) * 100, 2) if total_capacity else 0,
+        "peak": round(float((L / C).max()) * 100, 2) if L.size else 0,
+        "overloaded_buckets": int((machine_load > eff * (1 + 1e-9)).sum()),
+        "excess": round(float(excess.sum()), 1),
+        "levelled": round(float(build_ahead.sum()), 1),
+        "unplanned": round(float(unplanned), 1)
+    }
@@ -0,0 +1,186 @@
+import sys
+
+import pandas as pd
+from sqlalchemy import text
+
+# ==========================================================
+# DEMAND AGGREGATE STORE
+# ==========================================================
+# Summary tables kept in step with `orders` inside the same
+# transaction as every write, so engines read O(items) rows
+# instead of grouping the full order history.
+
+DEMAND_TABLES = ("demand_by_item", "demand_by_date", "demand_by_item_date")
+
+DEMAND_KEYS = {
+    "demand_by_item": ("item",),
+    "demand_by_date": ("date",),
+    "demand_by_item_date": ("item", "date")
+}
+
+demand_tables_sql = [
+
+"""
+CREATE TABLE IF NOT EXISTS demand_by_item(
+item TEXT PRIMARY KEY,qty BIGINT,order_count BIGINT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS demand_by_date(
+date TEXT PRIMARY KEY,qty BIGINT,order_count BIGINT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS demand_by_item_date(
+item TEXT,date TEXT,qty BIGINT,order_count BIGINT,
+PRIMARY KEY(item, date))
+"""
+]
+
+def create_demand_tables(conn):
+    for sql in demand_tables_sql:
+        conn.execute(text(sql))
+
+# ==========================================================
+# AGGREGATION FROM RAW ORDERS
+# ==========================================================
+
+def aggregate_orders(orders, key):
+
+    keys = [key] if isinstance(key, str) else list(key)
+
+    if orders.empty or "qty" not in orders or any(k not in orders for k in keys):
+        return pd.DataFrame(columns=keys + ["qty", "order_count"])
+
+    grouped = orders.groupby(keys)["qty"]
+
+    return pd.DataFrame({
+        "qty": grouped.sum(),
+        "order_count": grouped.size()
+    }).reset_index()
+
+# ==========================================================
+# INCREMENTAL MAINTENANCE
+# ==========================================================
+
+def record_orders(conn, orders):
+    # Upsert the per-item and per-date deltas of newly inserted orders.
+    for table, keys in DEMAND_KEYS.items():
+
+        delta = aggregate_orders(orders, keys)
+        if delta.empty:
+            continue
+
+        for k in keys:
+            delta[k] = delta[k].astype(str)
+        delta["qty"] = delta["qty"].astype("int64")
+
+        cols = ", ".join(keys)
+        marks = ", ".join(f":{k}" for k in keys)
+
+        conn.execute(
+            text(f"""
+            INSERT INTO {table}({cols}, qty, order_count)
+            VALUES ({marks}, :qty, :order_count)
+            ON CONFLICT({cols}) DO UPDATE SET
+            qty = {table}.qty + excluded.qty,
+            order_count = {table}.order_count + excluded.order_count
+            """),
+            delta.to_dict("records")
+        )
+
+# ==========================================================
+# REBUILD / CONSISTENCY CHECK
+# ==========================================================
+
+def rebuild_demand(conn):
+
+    create_demand_tables(conn)
+
+    for table, keys in DEMAND_KEYS.items():
+        cols = ", ".join(keys)
+        not_null = " AND ".join(f"{k} IS NOT NULL" for k in keys)
+        conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(text(f"""
+            INSERT INTO {table}({cols}, qty, order_count)
+            SELECT {cols}, COALESCE(SUM(qty), 0), COUNT(*)
+            FROM orders
+            WHERE {not_null}
+            GROUP BY {cols}
+        """))
+
+def ensure_demand(conn):
+    # Backfill once for databases that predate the summary tables.
+    create_demand_tables(conn)
+
+    has_orders = conn.execute(text("SELECT 1 FROM orders LIMIT 1")).first()
+    has_demand = all(
+        conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first()
+        for table in DEMAND_TABLES
+    )
+
+    if has_orders and not has_demand:
+        rebuild_demand(conn)
+        return True
+
+    return False
+
+def check_demand(engine):
+    # Returns rows where the stored aggregate differs from a fresh scan.
+    orders = pd.read_sql("SELECT item, date, qty FROM orders", engine)
+    mismatches = []
+
+    for table, keys in DEMAND_KEYS.items():
+
+        stored = pd.read_sql(f"SELECT * FROM {table}", engine)
+        fresh = aggregate_orders(orders, keys)
+        for k in keys:
+            fresh[k] = fresh[k].astype(str)
+            stored[k] = stored[k].astype(str)
+
+        diff = fresh.merge(
+            stored, on=list(keys), how="outer",
+            suffixes=("_orders", "_stored"), indicator=True
+        )
+        diff = diff[
+            (diff["_merge"] != "both")
+            | (diff["qty_orders"] != diff["qty_stored"])
+            | (diff["order_count_orders"] != diff["order_count_stored"])
+        ]
+
+        if not diff.empty:
+            mismatches.append(diff.drop(columns="_merge").assign(table=table))
+
+    if not mismatches:
+        return pd.DataFrame()
+
+    return pd.concat(mismatches, ignore_index=True)
+
+# ==========================================================
+# CLI: python -m app.demand [rebuild|check]
+# ==========================================================
+
+def main(argv):
+
+    from app.database import engine
+    command = argv[0] if argv else "check"
+
+    if command == "rebuild":
+        with engine.begin() as conn:
+            rebuild_demand(conn)
+        print("Demand aggregates rebuilt")
+    elif command == "check":
+        diff = check_demand(engine)
+        if diff.empty:
+            print("Demand aggregates consistent")
+        else:
+            print(diff.to_string())
+            return 1
+    else:
+        print("usage: python -m app.demand [rebuild|check]")
+        return 2
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,290 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+# ==========================================================
+# SUPPLY EVENT BUS
+# ==========================================================
+# One publish API over Kafka or an in-process broker. Kafka sends are
+# asynchronous and batched by the producer (linger + batch size);
+# nothing flushes per message. Without KAFKA_SERVER, or without the
+# kafka package, events go to the in-process broker, which tests and
+# offline runs also use.
+
+TOPIC = "supply_events"
+
+LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "50"))
+BATCH_BYTES = int(os.getenv("KAFKA_BATCH_BYTES", str(64 * 1024)))
+RETENTION = 100_000
+
+# Events only carry this process's view (and, on Kafka, what other
+# replicas publish); writes made any other way reach the live state
+# when it is reseeded from the tables, at least this often.
+RESEED_SECONDS = int(os.getenv("SUPPLYSENSE_LIVE_RESEED_SECONDS", "300"))
+
+def encode(value):
+    def default(o):
+        return o.item() if hasattr(o, "item") else str(o)
+    return json.dumps(value, default=default).encode("utf-8")
+
+def decode(raw):
+    return json.loads(raw.decode("utf-8"))
+
+# ==========================================================
+# BACKENDS
+# ==========================================================
+
+class InMemoryBroker:
+    # Append-only log per topic; consumers keep their own offsets.
+    # Only the newest `retention` events are kept, like a size-bounded
+    # Kafka topic; a consumer that falls behind resumes at the oldest.
+
+    def __init__(self, retention=RETENTION):
+        self.retention = retention
+        self._logs = defaultdict(list)
+        self._base = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def send(self, topic, value):
+        with self._lock:
+            log = self._logs[topic]
+            log.append(encode(value))
+            if len(log) > self.retention * 2:
+                dropped = len(log) - self.retention
+                del log[:dropped]
+                self._base[topic] += dropped
+
+    def flush(self):
+        pass
+
+    def read(self, topic, offset, limit=None):
+        with self._lock:
+            base = self._base[topic]
+            log = self._logs[topic]
+            start = max(offset, base) - base
+            end = len(log) if limit is None else min(len(log), start + limit)
+            return [decode(raw) for raw in log[start:end]], base + end
+
+    def end_offset(self, topic):
+        with self._lock:
+            return self._base[topic] + len(self._logs[topic])
+
+    def close(self):
+        pass
+
+class KafkaBackend:
+
+    def __init__(self, servers, linger_ms=LINGER_MS, batch_bytes=BATCH_BYTES):
+        from kafka import KafkaProducer
+        self.servers = servers
+        self.producer = KafkaProducer(
+            bootstrap_servers=servers,
+            value_serializer=encode,
+            linger_ms=linger_ms,
+            batch_size=batch_bytes,
+            acks=1
+        )
+
+    def send(self, topic, value):
+        self.producer.send(topic, value)
+
+    def flush(self):
+        self.producer.flush()
+
+    def close(self):
+        self.producer.close()
+
+class EventBus:
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def publish(self, event_type, data, topic=TOPIC):
+        self.backend.send(topic, {"type": event_type, "data": data})
+
+    def publish_many(self, event_type, records, topic=TOPIC):
+        for data in records:
+            self.backend.send(topic, {"type": event_type, "data": data})
+
+    def publish_frame(self, event_type, frame, topic=TOPIC):
+        if not frame.empty:
+            records = frame.astype(object).where(frame.notna(), None).to_dict("records")
+            self.publish_many(event_type, records, topic)
+
+    def flush(self):
+        self.backend.flush()
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_bus():
+    # Created on first use, never at import time.
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            servers = os.getenv("KAFKA_SERVER")
+            backend = None
+            if servers:
+                try:
+                    backend = KafkaBackend(servers)
+                except Exception:
+                    backend = None
+            _bus = EventBus(backend or InMemoryBroker())
+        return _bus
+
+# ==========================================================
+# INCREMENTAL STATE CONSUMER
+# ==========================================================
+
+class StateConsumer:
+    # Folds order, inventory and transfer events into running demand
+    # and stock totals, so views can be refreshed from deltas.
+    #   order:     {item, date, qty}
+    #   inventory: {item, warehouse, on_hand}         (absolute level)
+    #   stock:     {item, warehouse, on_hand}         (added units)
+    #   transfer:  {item, qty, from_wh, to_wh}
+
+    def __init__(self):
+        self.demand_by_item = defaultdict(float)
+        self.demand_by_date = defaultdict(float)
+        self.stock = defaultdict(float)
+        self.stock_by_warehouse = defaultdict(float)
+        self.applied = 0
+        self.offset = 0
+        self.version = None
+        self.seeded_at = None
+        self._lock = threading.Lock()
+
+    def seed(self, demand_by_item=None, demand_by_date=None, inventory=None):
+        # Start (or start over) from table snapshots; events after that
+        # are deltas. `inventory` only needs item, warehouse, on_hand.
+        with self._lock:
+            self.demand_by_item.clear()
+            self.demand_by_date.clear()
+            self.stock.clear()
+            self.stock_by_warehouse.clear()
+            self.seeded_at = time.monotonic()
+            if demand_by_item is not None and not demand_by_item.empty:
+                self.demand_by_item.update(zip(demand_by_item["item"], demand_by_item["qty"].astype(float)))
+            if demand_by_date is not None and not demand_by_date.empty:
+                self.demand_by_date.update(zip(demand_by_date["date"], demand_by_date["qty"].astype(float)))
+            if inventory is not None and not inventory.empty:
+                levels = inventory.groupby(["item", "warehouse"])["on_hand"].sum()
+                self.stock.update(levels.astype(float).to_dict())
+                by_wh = inventory.groupby("warehouse")["on_hand"].sum()
+                self.stock_by_warehouse.update(by_wh.astype(float).to_dict())
+
+    def _move(self, item, warehouse, qty):
+        self.stock[(item, warehouse)] += qty
+        self.stock_by_warehouse[warehouse] += qty
+
+    def apply(self, event):
+
+        kind = event.get("type")
+        data = event.get("data") or {}
+
+        with self._lock:
+
+            if kind == "order":
+                qty = float(data.get("qty") or 0)
+                self.demand_by_item[data.get("item")] += qty
+                self.demand_by_date[data.get("date")] += qty
+
+            elif kind == "inventory":
+                key = (data.get("item"), data.get("warehouse"))
+                self._move(*key, float(data.get("on_hand") or 0) - self.stock.get(key, 0.0))
+
+            elif kind == "stock":
+                self._move(data.get("item"), data.get("warehouse"), float(data.get("on_hand") or 0))
+
+            elif kind == "transfer":
+                qty = float(data.get("qty") or 0)
+                self._move(data.get("item"), data.get("from_wh"), -qty)
+                self._move(data.get("item"), data.get("to_wh"), qty)
+
+            else:
+                return False
+
+            self.applied += 1
+            return True
+
+    def poll(self, broker, topic=TOPIC, limit=None):
+        # Pull new events from an InMemoryBroker.
+        events, self.offset = broker.read(topic, self.offset, limit)
+        for event in events:
+            self.apply(event)
+        return len(events)
+
+    def consume_kafka(self, servers, topic=TOPIC, group_id=None):
+        # Blocking loop, run on a daemon thread by get_state(). Without
+        # a group every process reads every event from the end of the
+        # topic, like the in-memory consumer starting at end_offset().
+        from kafka import KafkaConsumer
+        consumer = KafkaConsumer(
+            topic,
+            bootstrap_servers=servers,
+            group_id=group_id,
+            auto_offset_reset="latest",
+            value_deserializer=decode
+        )
+        for message in consumer:
+            self.apply(message.value)
+
+    def demand_frame(self):
+        with self._lock:
+            return pd.DataFrame(list(self.demand_by_item.items()), columns=["item", "qty"])
+
+    def warehouse_stock(self):
+        with self._lock:
+            totals = dict(self.stock_by_warehouse)
+        return pd.Series(totals, name="on_hand", dtype="float64").sort_index()
+
+    def daily_demand(self):
+        with self._lock:
+            totals = dict(self.demand_by_date)
+        return pd.Series(totals, name="qty", dtype="float64").sort_index()
+
+    def stock_frame(self):
+        with self._lock:
+            return pd.DataFrame(
+                [(i, w, q) for (i, w), q in self.stock.items()],
+                columns=["item", "warehouse", "on_hand"]
+            )
+
+_state = None
+_state_lock = threading.Lock()
+
+def get_state(seed, version=None, max_age=RESEED_SECONDS):
+    """Process-wide consumer, reseeded by `seed(consumer)` when needed.
+
+    It is reseeded the first time, whenever `version` (the versions of
+    the tables it is seeded from) moves, and once it is `max_age`
+    seconds old. An event racing a reseed can be counted twice or
+    missed; the next reseed corrects it.
+    """
+    global _state
+    with _state_lock:
+        backend = get_bus().backend
+        if _state is None:
+            _state = StateConsumer()
+            if isinstance(backend, KafkaBackend):
+                threading.Thread(
+                    target=_state.consume_kafka, args=(backend.servers,),
+                    name="supplysense-state", daemon=True
+                ).start()
+
+        state = _state
+        if (
+            state.seeded_at is None or state.version != version
+            or time.monotonic() - state.seeded_at >= max_age
+        ):
+            seed(state)
+            state.version = version
+            # Events already in the log are in the tables just read.
+            if isinstance(backend, InMemoryBroker):
+                state.offset = backend.end_offset(TOPIC)
+        return state
@@ -1,11 +1,7 @@
-from kafka import KafkaProducer
-import json
+from app.event_bus import get_bus
 
-producer = KafkaProducer(
-    bootstrap_servers="localhost:9092",
-    value_serializer=lambda v: json.dumps(v).encode("utf-8")
-)
+# Kept for existing callers; publishes are batched by the bus rather
+# than flushed one message at a time.
 
 def publish_event(topic, data):
-    producer.send(topic, data)
-    producer.flush()
+    get_bus().backend.send(topic, data)
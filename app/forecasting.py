@@ -0,0 +1,170 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# BATCHED PER-SKU DEMAND FORECASTING
+# ==========================================================
+# Every SKU's trend (and optional day-of-week profile) is fitted in
+# a single least-squares solve over a date x item matrix: all SKUs
+# share one design matrix, so np.linalg.lstsq solves every column
+# of the demand matrix at once.
+
+HORIZON_DAYS = 7
+WINDOW_DAYS = 90
+MIN_HISTORY_DAYS = 5
+SEASONAL_MIN_DAYS = 14
+
+def date_bounds(item_date, window=WINDOW_DAYS):
+    dates = pd.to_datetime(pd.Series(item_date["date"].unique()), errors="coerce").dropna()
+    if dates.empty:
+        return None
+    end = dates.max().normalize()
+    start = max(dates.min().normalize(), end - pd.Timedelta(days=window - 1))
+    return start, end
+
+def demand_matrix(item_date, window=WINDOW_DAYS, bounds=None):
+    # item_date: one row per (item, date) with total qty, e.g. the
+    # demand_by_item_date table. Missing days are zero demand.
+    bounds = bounds or date_bounds(item_date, window)
+    if bounds is None:
+        return pd.DataFrame()
+
+    start, end = bounds
+    df = item_date[["item", "date", "qty"]].copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df[(df["date"] >= start) & (df["date"] <= end)]
+
+    matrix = df.pivot_table(
+        index="date", columns="item", values="qty",
+        aggfunc="sum", fill_value=0
+    )
+
+    return matrix.reindex(pd.date_range(start, end), fill_value=0).astype("float64")
+
+def design_matrix(dates, origin, seasonal):
+    t = ((dates - origin).days).to_numpy(dtype="float64")
+    cols = [np.ones_like(t), t]
+    if seasonal:
+        dow = dates.dayofweek.to_numpy()
+        # Monday is the baseline; six dummies for the other weekdays.
+        cols += [(dow == d).astype("float64") for d in range(1, 7)]
+    return np.column_stack(cols)
+
+def fit_coefficients(matrix, seasonal=True):
+    seasonal = seasonal and len(matrix) >= SEASONAL_MIN_DAYS
+    X = design_matrix(matrix.index, matrix.index[0], seasonal)
+    coefs, *_ = np.linalg.lstsq(X, matrix.to_numpy(), rcond=None)
+    return pd.DataFrame(coefs.T, index=matrix.columns), seasonal
+
+def predict(coefs, origin, last_date, seasonal, horizon=HORIZON_DAYS):
+    future = pd.date_range(last_date + pd.Timedelta(days=1), periods=horizon)
+    X = design_matrix(future, origin, seasonal)
+    preds = np.clip(X @ coefs.to_numpy().T, 0, None)
+    return pd.DataFrame(preds, index=future, columns=coefs.index)
+
+def forecast_skus(item_date, horizon=HORIZON_DAYS, seasonal=True, window=WINDOW_DAYS,
+                  bounds=None):
+    # Returns a date x item frame of predicted daily demand. Pass the
+    # catalogue's `bounds` when forecasting a subset of SKUs so each one
+    # is fitted over the same window as in a full run.
+    matrix = demand_matrix(item_date, window, bounds)
+    if len(matrix) < MIN_HISTORY_DAYS or matrix.columns.empty:
+        return pd.DataFrame()
+    coefs, seasonal = fit_coefficients(matrix, seasonal)
+    return predict(coefs, matrix.index[0], matrix.index[-1], seasonal, horizon)
+
+def forecast_totals(daily_forecast):
+    # Shape expected by balancing_engine: one row per item.
+    if daily_forecast.empty:
+        return pd.DataFrame(columns=["item", "qty"])
+    totals = daily_forecast.sum(axis=0)
+    return pd.DataFrame({"item": totals.index, "qty": totals.to_numpy()})
+
+# ==========================================================
+# COEFFICIENT CACHE
+# ==========================================================
+
+class ForecastCache:
+    # Keeps fitted coefficients between reruns. SKUs whose
+    # (qty, order_count) fingerprint is unchanged keep their fit; only
+    # SKUs with new orders go through the solve. A new last order date
+    # moves every SKU's window, so that refits the whole catalogue.
+
+    def __init__(self, horizon=HORIZON_DAYS, seasonal=True, window=WINDOW_DAYS):
+        self.horizon = horizon
+        self.seasonal = seasonal
+        self.window = window
+        self._lock = threading.Lock()
+        self._anchor = None
+        self._fingerprint = pd.DataFrame()
+        self._coefs = pd.DataFrame()
+        self._forecast = pd.DataFrame()
+        self.refits = 0
+        self.last_refit_items = 0
+
+    def forecast(self, item_date, by_item):
+
+        fingerprint = pd.DataFrame()
+        if not by_item.empty:
+            fingerprint = by_item.set_index("item")[["qty", "order_count"]]
+
+        with self._lock:
+
+            if item_date.empty:
+                return pd.DataFrame()
+
+            bounds = date_bounds(item_date, self.window)
+            if bounds is None or (bounds[1] - bounds[0]).days + 1 < MIN_HISTORY_DAYS:
+                return pd.DataFrame()
+
+            if self._anchor is not None and self._anchor[:2] == bounds:
+                changed = self._changed_items(fingerprint)
+                if changed.empty:
+                    return self._forecast
+                # Only pivot the SKUs that need a new fit.
+                subset = item_date[item_date["item"].isin(changed)]
+                matrix = demand_matrix(subset, self.window, bounds)
+                kept = self._coefs.drop(index=changed, errors="ignore")
+                kept = kept[kept.index.isin(fingerprint.index)]
+            else:
+                matrix = demand_matrix(item_date, self.window, bounds)
+                kept = pd.DataFrame()
+
+            if matrix.empty:
+                coefs = pd.DataFrame(columns=kept.columns)
+                seasonal = self._anchor[2]
+            else:
+                coefs, seasonal = fit_coefficients(matrix, self.seasonal)
+
+            self._coefs = pd.concat([kept, coefs]) if not kept.empty else coefs
+            self._anchor = (bounds[0], bounds[1], seasonal)
+            self._fingerprint = fingerprint
+            self._forecast = predict(
+                self._coefs, bounds[0], bounds[1], seasonal, self.horizon
+            )
+            self.refits += 1
+            self.last_refit_items = matrix.shape[1]
+
+            return self._forecast
+
+    def extend(self, horizon):
+        # The current fit predicted further out, e.g. for capacity
+        # planning; call after forecast() so the fit is up to date.
+        with self._lock:
+            if self._anchor is None or self._coefs.empty:
+                return pd.DataFrame()
+            start, end, seasonal = self._anchor
+            return predict(self._coefs, start, end, seasonal, horizon)
+
+    def _changed_items(self, fingerprint):
+        if self._fingerprint.empty:
+            return fingerprint.index
+        joined = fingerprint.join(self._fingerprint, rsuffix="_old", how="outer")
+        moved = (joined["qty"] != joined["qty_old"]) | (
+            joined["order_count"] != joined["order_count_old"]
+        )
+        return joined.index[moved.to_numpy()]
+
+forecast_cache = ForecastCache()
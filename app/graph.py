@@ -0,0 +1,113 @@
+import threading
+
+from app.cache import table_cache
+from app.database import get_table
+from app.tracing import tracer
+
+# ==========================================================
+# LAZY COMPUTATION GRAPH
+# ==========================================================
+# Tables and the engines built on them are declared as nodes with
+# explicit inputs. Nothing runs until a page asks for a node, and a
+# derived node is recomputed only when the version of a table it
+# (transitively) reads has moved. Values are shared by every session
+# in the process, so callers must treat them as read-only.
+
+class ComputeGraph:
+
+    def __init__(self, cache=table_cache, loader=get_table):
+        self.cache = cache
+        self.loader = loader
+        self._nodes = {}
+        self._tables = {}
+        self._memo = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def table(self, *names):
+        # Table nodes read straight through the table cache, which
+        # already keeps one frame per version.
+        for name in names:
+            self._nodes[name] = None
+            self._tables[name] = (name,)
+
+    def node(self, name, inputs=(), tables=()):
+        """Register `func(*input_values)` as node `name`.
+
+        `tables` declares tables the node reads itself (e.g. with an
+        aggregate query) without loading them as inputs.
+        """
+
+        def register(func):
+            missing = [i for i in inputs if i not in self._nodes]
+            missing += [t for t in tables if self._tables.get(t) != (t,)]
+            if missing:
+                raise KeyError(f"{name}: unknown inputs {missing}")
+            self._nodes[name] = (func, tuple(inputs))
+            self._tables[name] = tuple(sorted({
+                table for i in inputs for table in self._tables[i]
+            } | set(tables)))
+            return func
+
+        return register
+
+    def tables(self, name):
+        return self._tables[name]
+
+    def version(self, name):
+        return tuple(self.cache.version(t) for t in self._tables[name])
+
+    def get(self, name):
+
+        spec = self._nodes[name]
+        if spec is None:
+            return self.loader(name)
+
+        version = self.version(name)
+        with self._lock:
+            entry = self._memo.get(name)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        func, inputs = spec
+        args = [self.get(i) for i in inputs]
+        with tracer.span(f"node.{name}"):
+            value = func(*args)
+
+        with self._lock:
+            # Same rule as the table cache: a write during the compute
+            # means the value may already be stale, so don't keep it.
+            if self.version(name) == version:
+                self._memo[name] = (version, value)
+
+        return value
+
+    def cached(self, name):
+        # The node's value if it is already computed and current, else
+        # None; never computes or loads anything.
+        with self._lock:
+            entry = self._memo.get(name)
+            if entry is not None and entry[0] == self.version(name):
+                return entry[1]
+        return None
+
+    def invalidate(self, *names):
+        with self._lock:
+            for name in names or list(self._memo):
+                self._memo.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "nodes": len(self._nodes),
+                "computed": sorted(self._memo),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+graph = ComputeGraph()
@@ -0,0 +1,218 @@
+import io
+import time
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from app.demand import aggregate_orders, record_orders
+
+# ==========================================================
+# STREAMING CSV INGESTION
+# ==========================================================
+# Reads an upload in chunks, coerces each chunk to the target
+# table's column types and bulk-loads it: COPY on PostgreSQL,
+# executemany on SQLite. The whole file is one transaction, so a
+# bad row anywhere rolls back everything already loaded. Tables with
+# a unique natural key (inventory once migration 3 has keyed it) are
+# upserted: a row for an existing key replaces its values.
+
+CHUNK_ROWS = 50_000
+
+UPSERT_KEYS = {"inventory": ["item", "warehouse"]}
+
+INT_TYPES = ("INT", "SERIAL")
+FLOAT_TYPES = ("FLOAT", "REAL", "DOUBLE", "NUMERIC", "DECIMAL")
+
+def normalize_columns(df):
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+    return df
+
+def table_schema(conn, table):
+    schema = {}
+    for col in inspect(conn).get_columns(table):
+        kind = str(col["type"]).upper()
+        if any(t in kind for t in INT_TYPES):
+            schema[col["name"]] = "int"
+        elif any(t in kind for t in FLOAT_TYPES):
+            schema[col["name"]] = "float"
+        else:
+            schema[col["name"]] = "text"
+    return schema
+
+def coerce_chunk(chunk, schema):
+
+    chunk = normalize_columns(chunk)
+
+    unknown = [c for c in chunk.columns if c not in schema]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+    out = pd.DataFrame(index=chunk.index)
+
+    # Columns missing from the file are left to their database default.
+    for col, kind in schema.items():
+
+        if col not in chunk:
+            continue
+
+        values = chunk[col]
+
+        if kind == "text":
+            out[col] = values.astype("string")
+            continue
+
+        numeric = pd.to_numeric(values, errors="coerce")
+        bad = numeric.isna() & values.notna() & (values.astype(str).str.strip() != "")
+        if bad.any():
+            # read_csv keeps a running index across chunks; +2 for the
+            # header line and 1-based numbering.
+            rows = (bad[bad].index[:5] + 2).tolist()
+            raise ValueError(f"Column '{col}' has non-numeric values (CSV lines {rows})")
+
+        if kind == "int":
+            if ((numeric % 1).fillna(0) != 0).any():
+                raise ValueError(f"Column '{col}' has non-integer values")
+            out[col] = numeric.astype("Int64")
+        else:
+            out[col] = numeric.astype("float64")
+
+    return out
+
+# ==========================================================
+# BULK LOADERS
+# ==========================================================
+
+def copy_chunk(conn, table, chunk):
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cols = ", ".join(chunk.columns)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH CSV", buffer)
+    finally:
+        cursor.close()
+
+def executemany_chunk(conn, table, chunk):
+    cols = ", ".join(chunk.columns)
+    marks = ", ".join(["?"] * len(chunk.columns))
+    rows = chunk.astype(object).where(chunk.notna(), None)
+    conn.exec_driver_sql(
+        f"INSERT INTO {table} ({cols}) VALUES ({marks})",
+        list(rows.itertuples(index=False, name=None))
+    )
+
+def upsert_keys(conn, table, columns):
+    # The table's natural key if it is enforced unique and the file
+    # carries it; otherwise rows are plain inserts.
+    keys = UPSERT_KEYS.get(table)
+    if not keys or not set(keys) <= set(columns):
+        return None
+    for index in inspect(conn).get_indexes(table):
+        if index["unique"] and list(index["column_names"]) == keys:
+            return keys
+    return None
+
+def upsert_chunk(conn, table, chunk, keys):
+    # Within one statement a key may only be written once, so the
+    # last row for a key in the chunk wins.
+    chunk = chunk.drop_duplicates(keys, keep="last")
+    cols = ", ".join(chunk.columns)
+    updates = [c for c in chunk.columns if c not in keys]
+    conflict = f"ON CONFLICT ({', '.join(keys)}) " + (
+        "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in updates)
+        if updates else "DO NOTHING"
+    )
+
+    if conn.dialect.name == "postgresql":
+        # COPY can't resolve conflicts; stage the chunk and merge it.
+        staging = f"{table}_upload"
+        conn.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP "
+            f"AS SELECT {cols} FROM {table} WITH NO DATA"
+        ))
+        conn.execute(text(f"DELETE FROM {staging}"))
+        copy_chunk(conn, staging, chunk)
+        conn.execute(text(
+            f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {staging} {conflict}"
+        ))
+    else:
+        marks = ", ".join(["?"] * len(chunk.columns))
+        rows = chunk.astype(object).where(chunk.notna(), None)
+        conn.exec_driver_sql(
+            f"INSERT INTO {table} ({cols}) VALUES ({marks}) {conflict}",
+            list(rows.itertuples(index=False, name=None))
+        )
+
+# ==========================================================
+# PIPELINE
+# ==========================================================
+
+def ingest_csv(engine, table, source, chunk_rows=CHUNK_ROWS, progress=None):
+
+    load = copy_chunk if engine.dialect.name == "postgresql" else executemany_chunk
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+    deltas = []
+    stock = []
+    keys = None
+
+    with engine.begin() as conn:
+
+        schema = table_schema(conn, table)
+        if not schema:
+            raise ValueError(f"Unknown table: {table}")
+
+        for raw in pd.read_csv(source, chunksize=chunk_rows, dtype=str):
+
+            chunk = coerce_chunk(raw, schema)
+            if chunks == 0:
+                keys = upsert_keys(conn, table, chunk.columns)
+            if keys:
+                upsert_chunk(conn, table, chunk, keys)
+            else:
+                load(conn, table, chunk)
+
+            if table == "orders":
+                record_orders(conn, chunk)
+                deltas.append(aggregate_orders(chunk, ("item", "date")))
+            elif table == "inventory" and {"item", "warehouse", "on_hand"} <= set(chunk):
+                stock.append(chunk[["item", "warehouse", "on_hand"]])
+
+            rows += len(chunk)
+            chunks += 1
+
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(rows, rows / elapsed if elapsed else 0.0)
+
+    elapsed = time.perf_counter() - start
+
+    # Net qty per (item, date) of the committed orders, for publishing.
+    order_deltas = pd.DataFrame(columns=["item", "date", "qty"])
+    if deltas:
+        order_deltas = pd.concat(deltas).groupby(["item", "date"], as_index=False)["qty"].sum()
+
+    # An inventory upload either set each (item, warehouse) to its
+    # last level in the file (upserted) or added units to it.
+    stock_levels = pd.DataFrame(columns=["item", "warehouse", "on_hand"])
+    stock_deltas = pd.DataFrame(columns=["item", "warehouse", "on_hand"])
+    if stock and keys:
+        stock_levels = pd.concat(stock).drop_duplicates(keys, keep="last")
+    elif stock:
+        stock_deltas = pd.concat(stock).groupby(
+            ["item", "warehouse"], as_index=False
+        )["on_hand"].sum()
+
+    return {
+        "table": table,
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+        "upserted": bool(keys),
+        "order_deltas": order_deltas,
+        "stock_levels": stock_levels,
+        "stock_deltas": stock_deltas
+    }
@@ -0,0 +1,245 @@
+import datetime
+import logging
+import threading
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+
+# ==========================================================
+# VERSIONED SCHEMA MIGRATIONS (SQLITE + POSTGRESQL)
+# ==========================================================
+# Each migration runs in its own transaction and is recorded in
+# schema_migrations with how long it took. DDL is written to be
+# idempotent so a half-applied or concurrent run is harmless. A step
+# that returns False found its tables or columns missing; it is left
+# unrecorded and runs again on the next migrate().
+
+MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations(
+version INT PRIMARY KEY,name TEXT,applied_at TEXT,duration_ms FLOAT)
+"""
+
+def column_names(conn, table):
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+def has_duplicates(conn, table, columns):
+    cols = ", ".join(columns)
+    row = conn.execute(text(
+        f"SELECT 1 FROM {table} GROUP BY {cols} HAVING COUNT(*) > 1 LIMIT 1"
+    )).first()
+    return row is not None
+
+# ==========================================================
+# MIGRATIONS
+# ==========================================================
+
+def add_supplier_country(conn):
+    if "country" not in column_names(conn, "suppliers"):
+        conn.execute(text("ALTER TABLE suppliers ADD COLUMN country TEXT"))
+
+def add_lookup_indexes(conn):
+    for sql in [
+        "CREATE INDEX IF NOT EXISTS ix_orders_item ON orders(item)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_date ON orders(date)",
+        "CREATE INDEX IF NOT EXISTS ix_supply_pool_item ON supply_pool(item)",
+        "CREATE INDEX IF NOT EXISTS ix_suppliers_supplier ON suppliers(supplier)"
+    ]:
+        conn.execute(text(sql))
+
+def add_inventory_key(conn):
+    # (item, warehouse) is the natural key of inventory. Older uploads
+    # may hold duplicate pairs, in which case we can only index it and
+    # try for the key again once they are cleaned up.
+    if has_duplicates(conn, "inventory", ["item", "warehouse"]):
+        log.warning(
+            "inventory has duplicate (item, warehouse) rows; "
+            "creating a non-unique index instead of a key"
+        )
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_inventory_item_warehouse "
+            "ON inventory(item, warehouse)"
+        ))
+        return False
+    else:
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_inventory_item_warehouse "
+            "ON inventory(item, warehouse)"
+        ))
+
+# Tables browsed page by page; they need a stable unique row key.
+ROW_KEY_TABLES = ["orders", "inventory", "suppliers", "supply_pool", "action_log"]
+
+def add_row_keys(conn):
+    # SQLite tables already carry an implicit rowid. PostgreSQL gets an
+    # explicit sequence-backed row_id so pages can seek on it.
+    if conn.dialect.name != "postgresql":
+        return
+    complete = True
+    for table in ROW_KEY_TABLES:
+        if not inspect(conn).has_table(table):
+            complete = False
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS row_id BIGSERIAL"))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_row_id ON {table}(row_id)"
+        ))
+    return complete
+
+def row_key(dialect_name):
+    return "row_id" if dialect_name == "postgresql" else "rowid"
+
+def add_action_log_index(conn):
+    # Decisions are per (action, item, warehouse); the review queue
+    # looks them up to hide what has already been decided.
+    if not inspect(conn).has_table("action_log"):
+        return False
+    if "warehouse" not in column_names(conn, "action_log"):
+        conn.execute(text("ALTER TABLE action_log ADD COLUMN warehouse TEXT"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_action_log_item_action "
+        "ON action_log(item, action, warehouse)"
+    ))
+
+def add_aggregate_indexes(conn):
+    # Covering indexes for the GROUP BY queries in app.queries: both
+    # backends can answer them from the index alone, in key order.
+    # Orders tables that predate these columns wait for them.
+    columns = column_names(conn, "orders")
+    complete = True
+    for needed, sql in [
+        ({"date", "category", "qty"},
+         "CREATE INDEX IF NOT EXISTS ix_orders_date_category ON orders(date, category, qty)"),
+        ({"item", "city", "channel", "qty"},
+         "CREATE INDEX IF NOT EXISTS ix_orders_item_city_channel "
+         "ON orders(item, city, channel, qty)")
+    ]:
+        if needed <= columns:
+            conn.execute(text(sql))
+        else:
+            complete = False
+    return complete
+
+def add_change_counters(conn):
+    # Per-table UPDATE/DELETE counters kept by triggers, so readers
+    # that cache rows (app.snapshots) can tell when stored rows changed,
+    # whichever process or client changed them. Inserts don't count.
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS table_changes(name TEXT PRIMARY KEY, changes BIGINT)"
+    ))
+    postgres = conn.dialect.name == "postgresql"
+    if postgres:
+        conn.execute(text(
+            "CREATE OR REPLACE FUNCTION count_table_change() RETURNS trigger "
+            "LANGUAGE plpgsql AS $$ BEGIN "
+            "UPDATE table_changes SET changes = changes + 1 WHERE name = TG_TABLE_NAME; "
+            "RETURN NULL; END $$"
+        ))
+
+    complete = True
+    for table in ROW_KEY_TABLES:
+        if not inspect(conn).has_table(table):
+            complete = False
+            continue
+        if conn.execute(
+            text("SELECT 1 FROM table_changes WHERE name = :name"), {"name": table}
+        ).first() is None:
+            conn.execute(
+                text("INSERT INTO table_changes VALUES (:name, 0)"), {"name": table}
+            )
+        if postgres:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS tc_{table} ON {table}"))
+            conn.execute(text(
+                f"CREATE TRIGGER tc_{table} AFTER UPDATE OR DELETE OR TRUNCATE "
+                f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION count_table_change()"
+            ))
+        else:
+            # SQLite only has row triggers.
+            for event in ("UPDATE", "DELETE"):
+                conn.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS tc_{table}_{event.lower()} "
+                    f"AFTER {event} ON {table} BEGIN "
+                    f"UPDATE table_changes SET changes = changes + 1 WHERE name = '{table}'; "
+                    "END"
+                ))
+    return complete
+
+MIGRATIONS = [
+    (1, "suppliers_country_column", add_supplier_country),
+    (2, "lookup_indexes", add_lookup_indexes),
+    (3, "inventory_item_warehouse_key", add_inventory_key),
+    (4, "row_keys", add_row_keys),
+    (5, "action_log_decision_index", add_action_log_index),
+    (6, "orders_aggregate_indexes", add_aggregate_indexes),
+    (7, "table_change_counters", add_change_counters)
+]
+
+# ==========================================================
+# RUNNER
+# ==========================================================
+
+_migrated = set()
+_lock = threading.Lock()
+
+def applied_versions(conn):
+    conn.execute(text(MIGRATIONS_TABLE_SQL))
+    rows = conn.execute(text("SELECT version FROM schema_migrations")).all()
+    return {r[0] for r in rows}
+
+def migrate(engine, migrations=MIGRATIONS):
+    # Returns the versions applied by this call.
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+
+    for version, name, step in sorted(migrations, key=lambda m: m[0]):
+
+        if version in done:
+            continue
+
+        start = time.perf_counter()
+
+        try:
+            with engine.begin() as conn:
+                if engine.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": 72211})
+                    if version in applied_versions(conn):
+                        continue
+                if step(conn) is False:
+                    continue
+                conn.execute(
+                    text("INSERT INTO schema_migrations VALUES (:v,:n,:t,:d)"),
+                    {
+                        "v": version,
+                        "n": name,
+                        "t": str(datetime.datetime.now()),
+                        "d": round((time.perf_counter() - start) * 1000, 3)
+                    }
+                )
+        except IntegrityError:
+            # Another process recorded this version first.
+            continue
+
+        applied.append(version)
+
+    return applied
+
+def migrate_once(engine):
+    # Streamlit reruns the script on every interaction; only check
+    # the schema once per engine per process.
+    key = str(engine.url)
+    with _lock:
+        if key in _migrated:
+            return []
+        applied = migrate(engine)
+        _migrated.add(key)
+        return applied
+
+def migration_history(engine):
+    import pandas as pd
+    with engine.begin() as conn:
+        applied_versions(conn)
+    return pd.read_sql("SELECT * FROM schema_migrations ORDER BY version", engine)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from app.balancing import balancing_engine
+from app.capacity import capacity_plan, warehouse_load
+from app.forecasting import (
+    HORIZON_DAYS, MIN_HISTORY_DAYS, WINDOW_DAYS, date_bounds, forecast_skus,
+    forecast_totals
+)
+from app.rebalancing import warehouse_demand
+from app.risk import fill_rate
+
+# ==========================================================
+# PLANNING ENGINES (PURE, NO STREAMLIT)
+# ==========================================================
+# Plain functions over DataFrames, shared by the UI's computation
+# graph and the batch runner in app/batch.py.
+
+def forecast_window(item_date, window=WINDOW_DAYS):
+    # Catalogue-wide fit window, or None while history is too short to
+    # forecast and planning falls back to historical totals.
+    bounds = date_bounds(item_date, window) if not item_date.empty else None
+    if bounds is None or (bounds[1] - bounds[0]).days + 1 < MIN_HISTORY_DAYS:
+        return None
+    return bounds
+
+def planning_demand(sku_daily, demand_by_item):
+    # Charge each SKU its forecast demand over the horizon; fall back to
+    # the historical total until there is enough history to fit.
+    sku_demand = forecast_totals(sku_daily)
+    if sku_demand.empty:
+        sku_demand = demand_by_item
+    return sku_demand
+
+def capacity_utilization(capacity_daily, shares, capacity):
+    # Factory utilization %: average load of the time-phased capacity
+    # plan over the forecast in `capacity_daily`.
+    _, _, summary = capacity_plan(warehouse_load(capacity_daily, shares), capacity)
+    return summary["utilization"]
+
+def frame_totals(orders, inventory):
+    # (revenue, inventory value) from loaded frames; the UI gets the
+    # same numbers from SQL with app.queries.kpi_totals.
+    revenue = (orders["qty"] * orders["unit_price"]).sum() if not orders.empty else 0
+    inv_value = (inventory["on_hand"] * inventory["unit_cost"]).sum() if not inventory.empty else 0
+    return revenue, inv_value
+
+def kpis(totals, risk, util):
+    # (revenue, inventory value, service level %, utilization %)
+    revenue, inv_value = totals
+    service = round(fill_rate(risk) * 100, 1)
+    return revenue, inv_value, service, util
+
+def trend_forecast(demand_by_date, horizon=HORIZON_DAYS):
+
+    if demand_by_date.empty:
+        return pd.DataFrame()
+
+    daily = demand_by_date.sort_values("date").reset_index(drop=True)
+    if len(daily) < 5:
+        return pd.DataFrame()
+
+    from sklearn.linear_model import LinearRegression
+
+    daily["index"] = np.arange(len(daily))
+    model = LinearRegression()
+    model.fit(daily[["index"]], daily["qty"])
+
+    future_index = np.arange(len(daily), len(daily)+horizon)
+    preds = model.predict(future_index.reshape(-1,1))
+
+    return pd.DataFrame({
+        "future_day":future_index,
+        "predicted_demand":preds
+    })
+
+def plan_partition(inventory, item_date, demand_by_item, shares, bounds):
+    """Forecast and balance one slice of the catalogue.
+
+    `bounds` is the catalogue-wide window from forecast_window(), so
+    every SKU is fitted exactly as it is in a full run. `shares` are
+    the network-wide demand_shares() of the slice's items.
+    """
+    if bounds is None:
+        sku_daily = pd.DataFrame()
+        sku_demand = demand_by_item
+    else:
+        sku_daily = forecast_skus(item_date, bounds=bounds)
+        sku_demand = forecast_totals(sku_daily)
+
+    _, actions = balancing_engine(inventory, warehouse_demand(sku_demand, shares))
+    return sku_daily, actions
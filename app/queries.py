@@ -0,0 +1,97 @@
+import pandas as pd
+from sqlalchemy import text
+
+# ==========================================================
+# AGGREGATES
+# ==========================================================
+# GROUP BY in the database so only the small result comes back.
+# Plain SQL that runs unchanged on SQLite and PostgreSQL.
+
+DEMAND_GROUPS = ("category", "channel", "city")
+
+def kpi_totals(engine):
+    # (revenue, inventory value)
+    with engine.connect() as conn:
+        revenue = conn.execute(text("SELECT SUM(qty * unit_price) FROM orders")).scalar()
+        value = conn.execute(text("SELECT SUM(on_hand * unit_cost) FROM inventory")).scalar()
+    return float(revenue or 0), float(value or 0)
+
+def distinct_values(engine, table, column):
+    # Sorted non-null values of one column, e.g. for filter options.
+    return pd.read_sql(
+        text(
+            f"SELECT DISTINCT {column} FROM {table} "
+            f"WHERE {column} IS NOT NULL ORDER BY {column}"
+        ),
+        engine
+    )[column].tolist()
+
+def revenue_by_item(engine):
+    # Order revenue per item, as a Series indexed by item.
+    revenue = pd.read_sql(
+        text("SELECT item, SUM(qty * unit_price) AS revenue FROM orders GROUP BY item"),
+        engine
+    )
+    return revenue.set_index("item")["revenue"]
+
+def stock_levels(engine):
+    # On-hand stock per (item, warehouse).
+    return pd.read_sql(
+        text(
+            "SELECT item, warehouse, SUM(on_hand) AS on_hand "
+            "FROM inventory GROUP BY item, warehouse"
+        ),
+        engine
+    )
+
+def inventory_rollup(engine):
+    # Stock and value per (warehouse, category).
+    return pd.read_sql(
+        text(
+            "SELECT warehouse, category, COUNT(*) AS skus, "
+            "SUM(on_hand) AS on_hand, SUM(on_hand * unit_cost) AS value "
+            "FROM inventory GROUP BY warehouse, category "
+            "ORDER BY warehouse, category"
+        ),
+        engine
+    )
+
+def daily_demand(engine, by=None, days=None):
+    """Order qty per date, optionally split by an order column.
+
+    `days` keeps only the last `days` dates of history. The ungrouped
+    series comes straight from the demand_by_date aggregate.
+    """
+    if by is not None and by not in DEMAND_GROUPS:
+        raise ValueError(f"Group demand by one of {', '.join(DEMAND_GROUPS)}")
+
+    table = "demand_by_date" if by is None else "orders"
+    where, params = "", {}
+
+    if days is not None:
+        with engine.connect() as conn:
+            last = conn.execute(text(f"SELECT MAX(date) FROM {table}")).scalar()
+        if last is not None:
+            # Dates are stored as ISO text, so they compare as strings.
+            start = pd.Timestamp(last) - pd.Timedelta(days=days - 1)
+            where, params = "WHERE date >= :start ", {"start": start.strftime("%Y-%m-%d")}
+
+    if by is None:
+        sql = f"SELECT date, qty, order_count FROM demand_by_date {where}ORDER BY date"
+    else:
+        sql = (
+            f"SELECT date, {by}, SUM(qty) AS qty, COUNT(*) AS order_count "
+            f"FROM orders {where}GROUP BY date, {by} ORDER BY date, {by}"
+        )
+
+    return pd.read_sql(text(sql), engine, params=params)
+
+def demand_mix(engine):
+    # Order quantity per (item, city, channel), grouped in the database.
+    return pd.read_sql(
+        text(
+            "SELECT item, city, channel, SUM(qty) AS qty FROM orders "
+            "GROUP BY item, city, channel"
+        ),
+        engine
+    )
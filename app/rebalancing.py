@@ -0,0 +1,289 @@
+import numpy as np
+import pandas as pd
+
+from app.transfers import MOVE_COLUMNS
+
+# ==========================================================
+# MULTI-WAREHOUSE REBALANCING
+# ==========================================================
+# Demand is first split across warehouses: each item's
+# planning demand follows its historical (city, channel) order mix,
+# and each (city, channel) is served by the warehouses mapped to it
+# in warehouse_regions. Demand with no mapping is split evenly over
+# the warehouses that stock the item.
+#
+# Each (item, warehouse) then has an excess above safety stock or a
+# shortfall below it. The moves that cover the most shortfall at the
+# lowest lane cost are a transportation problem. All items are
+# solved together as one sparse LP (HiGHS via scipy); without scipy
+# a cheapest-lane-first greedy pass is used instead. Moves come out
+# as (item, qty, from_wh, to_wh), ready for apply_transfers.
+
+# Known sites, shared with the network map. Lanes between them cost
+# their great-circle distance; any other lane costs DEFAULT_LANE_COST.
+WAREHOUSE_COORDS = {
+    "Chennai WH": (13.08, 80.27),
+    "Cold Storage": (13.10, 80.25),
+    "Grain Warehouse": (11.01, 76.96),
+    "Grocery WH": (9.92, 78.12)
+}
+
+DEFAULT_LANE_COST = 500.0
+
+POSITION_COLUMNS = [
+    "item", "warehouse", "on_hand", "available", "demand", "projected",
+    "safety", "excess", "need"
+]
+
+# ==========================================================
+# DEMAND ALLOCATION
+# ==========================================================
+
+def default_regions(cities, warehouses):
+    # Without a configured mapping, a city is served by the warehouses
+    # named after it ("Chennai" -> "Chennai WH").
+    rows = [
+        (city, None, wh, 1.0)
+        for city in cities for wh in warehouses
+        if isinstance(city, str) and isinstance(wh, str)
+        and wh.lower().startswith(city.lower())
+    ]
+    return pd.DataFrame(rows, columns=["city", "channel", "warehouse", "share"])
+
+def order_mix(orders):
+    # Frame equivalent of app.queries.demand_mix.
+    return orders.groupby(["item", "city", "channel"], dropna=False, as_index=False)["qty"].sum()
+
+def route_shares(mix, regions):
+    # One row per (item, city, channel, warehouse) with the fraction
+    # of the item's demand it carries. A (city, channel) mapping wins
+    # over a city-wide one (channel left empty).
+    regions = regions.copy()
+    regions["channel"] = regions["channel"].replace("", None)
+    regions["share"] = pd.to_numeric(regions["share"], errors="coerce").fillna(1.0)
+
+    exact = regions[regions["channel"].notna()]
+    city_wide = regions[regions["channel"].isna()].drop(columns="channel")
+
+    mix = mix.copy()
+    mix["mix"] = mix["qty"] / mix.groupby("item")["qty"].transform("sum")
+    mix = mix[mix["mix"] > 0]
+
+    routed = mix.merge(exact, on=["city", "channel"])
+    keys = routed[["city", "channel"]].drop_duplicates()
+    rest = mix.merge(keys, on=["city", "channel"], how="left", indicator=True)
+    rest = rest[rest["_merge"] == "left_only"].drop(columns="_merge")
+    routed = pd.concat([routed, rest.merge(city_wide, on="city")], ignore_index=True)
+
+    routed["share"] = routed["mix"] * routed["share"] / routed.groupby(
+        ["item", "city", "channel"], dropna=False
+    )["share"].transform("sum")
+
+    return routed[["item", "warehouse", "share"]]
+
+def allocate_demand(inventory, sku_demand, mix, regions):
+    """Planning demand per (item, warehouse)."""
+
+    stocked = inventory[["item", "warehouse"]].drop_duplicates()
+    totals = sku_demand[["item", "qty"]].groupby("item", as_index=False)["qty"].sum()
+
+    if regions.empty and not mix.empty:
+        regions = default_regions(mix["city"].unique(), stocked["warehouse"].unique())
+
+    routed = route_shares(mix, regions) if not mix.empty and not regions.empty \
+        else pd.DataFrame(columns=["item", "warehouse", "share"])
+    routed = routed.groupby(["item", "warehouse"], as_index=False)["share"].sum()
+
+    # Whatever the mapping doesn't cover is spread evenly over the
+    # warehouses already stocking the item.
+    unrouted = (1 - routed.groupby("item")["share"].sum()).clip(lower=0)
+    spread = stocked.assign(n=stocked.groupby("item")["warehouse"].transform("size"))
+    spread["share"] = spread["item"].map(unrouted).fillna(1.0) / spread["n"]
+
+    shares = pd.concat([routed, spread[["item", "warehouse", "share"]]]) \
+        .groupby(["item", "warehouse"], as_index=False)["share"].sum()
+    shares = shares.merge(totals, on="item")
+    shares["demand"] = shares["share"] * shares["qty"]
+
+    return shares[shares["demand"] > 0][["item", "warehouse", "demand"]]
+
+def demand_shares(inventory, mix, regions):
+    """Fraction of each item's demand served by each warehouse."""
+
+    unit = pd.DataFrame({"item": inventory["item"].dropna().unique(), "qty": 1.0})
+    return allocate_demand(inventory, unit, mix, regions) \
+        .rename(columns={"demand": "share"})
+
+def warehouse_demand(sku_demand, shares):
+    """Planning demand per (item, warehouse) as `qty`, from demand_shares()."""
+
+    totals = sku_demand[["item", "qty"]].groupby("item", as_index=False)["qty"].sum()
+    demand = shares.merge(totals, on="item")
+    demand["qty"] = demand["share"] * demand["qty"]
+    return demand[["item", "warehouse", "qty"]]
+
+def network_position(inventory, allocated):
+    # Stock, allocated demand and the excess/shortfall against safety
+    # for every (item, warehouse) that holds stock or has demand.
+    stock = inventory.assign(
+        available=inventory["on_hand"].fillna(0) + inventory["wip"].fillna(0)
+    ).groupby(["item", "warehouse"], as_index=False).agg(
+        on_hand=("on_hand", "sum"), available=("available", "sum"),
+        safety=("safety", "max")
+    )
+
+    position = stock.merge(allocated, on=["item", "warehouse"], how="outer")
+    item_safety = stock.groupby("item")["safety"].max()
+    position["safety"] = position["safety"].fillna(position["item"].map(item_safety)).fillna(0)
+    position["on_hand"] = position["on_hand"].fillna(0)
+    position["available"] = position["available"].fillna(0)
+    position["demand"] = position["demand"].fillna(0)
+    position["projected"] = position["available"] - position["demand"]
+
+    # WIP counts toward a site's own cover but only on-hand stock ships.
+    gap = position["projected"] - position["safety"]
+    position["excess"] = np.floor(
+        np.minimum(gap, position["on_hand"]).clip(lower=0)
+    ).astype("int64")
+    position["need"] = np.ceil((-gap).clip(lower=0)).astype("int64")
+
+    return position[POSITION_COLUMNS]
+
+# ==========================================================
+# TRANSFER PLAN
+# ==========================================================
+
+def haversine_km(a, b):
+    lat1, lon1, lat2, lon2 = map(np.radians, (a[0], a[1], b[0], b[1]))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(h))
+
+def lane_costs(warehouses, coords=WAREHOUSE_COORDS):
+    warehouses = list(warehouses)
+    cost = np.full((len(warehouses), len(warehouses)), DEFAULT_LANE_COST)
+    for i, a in enumerate(warehouses):
+        for j, b in enumerate(warehouses):
+            if i == j:
+                cost[i, j] = 0.0
+            elif a in coords and b in coords:
+                cost[i, j] = haversine_km(coords[a], coords[b])
+    return pd.DataFrame(cost, index=warehouses, columns=warehouses)
+
+def candidate_lanes(position, costs):
+    donors = position.loc[position["excess"] > 0, ["item", "warehouse", "excess"]]
+    takers = position.loc[position["need"] > 0, ["item", "warehouse", "need"]]
+    lanes = donors.merge(takers, on="item", suffixes=("_from", "_to"))
+    lanes = lanes[lanes["warehouse_from"] != lanes["warehouse_to"]].reset_index(drop=True)
+
+    index = {wh: i for i, wh in enumerate(costs.index)}
+    lanes["unit_cost"] = costs.to_numpy()[
+        lanes["warehouse_from"].map(index).to_numpy(dtype="int64"),
+        lanes["warehouse_to"].map(index).to_numpy(dtype="int64")
+    ] if not lanes.empty else pd.Series(dtype="float64")
+    return lanes
+
+def solve_lp(lanes):
+    # Transportation LP over every item at once. Per item, the smaller
+    # side is moved in full (equality) and the other side is capped, so
+    # the optimum moves as much as possible at the lowest total cost.
+    # Supplies and needs are integers, so the vertex solution is too.
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix, vstack
+
+    n = len(lanes)
+    donor = pd.factorize(lanes["item"] + "\x00" + lanes["warehouse_from"])[0]
+    taker = pd.factorize(lanes["item"] + "\x00" + lanes["warehouse_to"])[0]
+
+    supply = lanes.groupby(donor)["excess"].first().to_numpy()
+    demand = lanes.groupby(taker)["need"].first().to_numpy()
+
+    item_supply = lanes.drop_duplicates(["item", "warehouse_from"]).groupby("item")["excess"].sum()
+    item_demand = lanes.drop_duplicates(["item", "warehouse_to"]).groupby("item")["need"].sum()
+    short = (item_supply < item_demand).reindex(lanes["item"]).to_numpy()
+
+    donor_eq = pd.Series(short).groupby(donor).first().to_numpy()
+    taker_eq = ~pd.Series(short).groupby(taker).first().to_numpy()
+
+    cols = np.arange(n)
+    donor_rows = coo_matrix((np.ones(n), (donor, cols)), shape=(len(supply), n)).tocsr()
+    taker_rows = coo_matrix((np.ones(n), (taker, cols)), shape=(len(demand), n)).tocsr()
+
+    A_eq = vstack([donor_rows[donor_eq], taker_rows[taker_eq]])
+    b_eq = np.concatenate([supply[donor_eq], demand[taker_eq]])
+    A_ub = vstack([donor_rows[~donor_eq], taker_rows[~taker_eq]])
+    b_ub = np.concatenate([supply[~donor_eq], demand[~taker_eq]])
+
+    result = linprog(
+        lanes["unit_cost"].to_numpy(),
+        A_ub=A_ub if A_ub.shape[0] else None, b_ub=b_ub if A_ub.shape[0] else None,
+        A_eq=A_eq if A_eq.shape[0] else None, b_eq=b_eq if A_eq.shape[0] else None,
+        bounds=(0, None), method="highs"
+    )
+    if not result.success:
+        raise RuntimeError(f"Rebalancing LP failed: {result.message}")
+    return np.rint(result.x).astype("int64")
+
+def solve_greedy(lanes):
+    # Cheapest lane first; optimal when lane costs don't interact,
+    # close otherwise. Used when scipy isn't installed.
+    supply = dict(zip(zip(lanes["item"], lanes["warehouse_from"]), lanes["excess"]))
+    demand = dict(zip(zip(lanes["item"], lanes["warehouse_to"]), lanes["need"]))
+    qty = np.zeros(len(lanes), dtype="int64")
+
+    order = np.argsort(lanes["unit_cost"].to_numpy(), kind="stable")
+    items = lanes["item"].to_numpy()
+    src = lanes["warehouse_from"].to_numpy()
+    dst = lanes["warehouse_to"].to_numpy()
+
+    for k in order:
+        a, b = (items[k], src[k]), (items[k], dst[k])
+        move = min(supply[a], demand[b])
+        if move > 0:
+            qty[k] = move
+            supply[a] -= move
+            demand[b] -= move
+
+    return qty
+
+def plan_rebalancing(inventory, sku_demand, mix, regions, coords=WAREHOUSE_COORDS):
+    """Returns (position, moves, summary) for the whole network."""
+
+    if inventory.empty:
+        empty = pd.DataFrame(columns=MOVE_COLUMNS + ["unit_cost", "cost"])
+        return pd.DataFrame(columns=POSITION_COLUMNS), empty, {
+            "moves": 0, "units": 0, "cost": 0.0, "shortfall_before": 0,
+            "shortfall_after": 0, "solver": None
+        }
+
+    allocated = allocate_demand(inventory, sku_demand, mix, regions)
+    position = network_position(inventory, allocated)
+    costs = lane_costs(sorted(position["warehouse"].dropna().unique()), coords)
+    lanes = candidate_lanes(position.dropna(subset=["warehouse"]), costs)
+
+    solver = None
+    if lanes.empty:
+        qty = np.zeros(0, dtype="int64")
+    else:
+        try:
+            qty, solver = solve_lp(lanes), "highs"
+        except ImportError:
+            qty, solver = solve_greedy(lanes), "greedy"
+
+    moves = lanes.assign(qty=qty)[qty > 0].rename(
+        columns={"warehouse_from": "from_wh", "warehouse_to": "to_wh"}
+    )
+    moves = moves.assign(cost=moves["qty"] * moves["unit_cost"])[
+        MOVE_COLUMNS + ["unit_cost", "cost"]
+    ].sort_values(["cost", "item"], ascending=[False, True], ignore_index=True)
+
+    shortfall = int(position["need"].sum())
+    units = int(moves["qty"].sum())
+
+    return position, moves, {
+        "moves": len(moves),
+        "units": units,
+        "cost": round(float(moves["cost"].sum()), 2),
+        "shortfall_before": shortfall,
+        "shortfall_after": shortfall - units,
+        "solver": solver
+    }
@@ -0,0 +1,212 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.forecasting import demand_matrix
+
+# ==========================================================
+# MONTE CARLO STOCKOUT RISK
+# ==========================================================
+# Each trial draws a demand shock z and a lead-time outcome (on time
+# with the supplier's reliability, otherwise late by up to one extra
+# lead time). Daily demand per SKU is moment-matched to its order
+# history, so demand over a lead time of L days is
+# mean * L + std * sqrt(L) * z.
+#
+# Trials are shared by all SKUs (common random numbers) and kept
+# sorted by z. For one SKU and one lead-time value the stockout trials
+# are then a suffix of that sorted subset, so counts and expected
+# shortage come from a binary search and a suffix sum instead of a
+# SKUs x trials matrix. The result is exactly what evaluating every
+# trial for every SKU would give.
+
+TRIALS = 20_000
+SEED = 42
+DEFAULT_LEAD_TIME = 7
+DEFAULT_RELIABILITY = 1.0
+
+RISK_COLUMNS = [
+    "item", "stock", "daily_mean", "daily_std", "lead_time", "reliability",
+    "stockout_prob", "expected_shortage", "expected_demand", "fill_rate"
+]
+
+def sample_trials(trials=TRIALS, seed=SEED):
+    rng = np.random.default_rng(seed)
+    z = np.sort(rng.standard_normal(trials))
+    on_time = rng.random(trials)
+    lateness = rng.random(trials)
+    return z, on_time, lateness
+
+def lead_time_samples(lead, reliability, on_time, lateness):
+    return np.where(on_time <= reliability, lead, lead + np.ceil(lateness * lead))
+
+# ==========================================================
+# INPUT PREPARATION
+# ==========================================================
+
+def risk_inputs(inventory, item_date, suppliers):
+    # One row per item: stock position, daily demand moments and the
+    # supplier terms of its first inventory row.
+    if inventory.empty:
+        return pd.DataFrame(columns=RISK_COLUMNS[:6])
+
+    stock = (inventory["on_hand"].fillna(0) + inventory["wip"].fillna(0)) \
+        .groupby(inventory["item"]).sum()
+
+    frame = pd.DataFrame({"item": stock.index, "stock": stock.to_numpy(dtype="float64")})
+
+    matrix = demand_matrix(item_date) if not item_date.empty else pd.DataFrame()
+    if not matrix.empty:
+        frame["daily_mean"] = frame["item"].map(matrix.mean()).fillna(0)
+        frame["daily_std"] = frame["item"].map(matrix.std(ddof=0)).fillna(0)
+    else:
+        frame["daily_mean"] = 0.0
+        frame["daily_std"] = 0.0
+
+    lead = pd.Series(np.nan, index=frame.index)
+    reliability = pd.Series(np.nan, index=frame.index)
+
+    if not suppliers.empty and "supplier" in inventory:
+        source = inventory.drop_duplicates("item")[["item", "supplier"]]
+        terms = suppliers[["supplier", "item", "lead_time", "reliability"]]
+        exact = source.merge(terms.drop_duplicates(["supplier", "item"]),
+                             on=["supplier", "item"], how="left")
+        # Fall back to the supplier's first listed terms for other items.
+        general = source.merge(
+            terms.drop_duplicates("supplier").drop(columns="item"),
+            on="supplier", how="left"
+        )
+        matched = exact.set_index("item").combine_first(general.set_index("item"))
+        lead = frame["item"].map(matched["lead_time"])
+        reliability = frame["item"].map(matched["reliability"])
+
+    lead = pd.to_numeric(lead, errors="coerce")
+    frame["lead_time"] = lead.where(lead > 0, DEFAULT_LEAD_TIME).round()
+    reliability = pd.to_numeric(reliability, errors="coerce")
+    frame["reliability"] = reliability.fillna(DEFAULT_RELIABILITY).clip(0, 1)
+
+    return frame
+
+# ==========================================================
+# SIMULATION
+# ==========================================================
+
+def simulate_chunk(frame, trials=TRIALS, seed=SEED):
+
+    z, on_time, lateness = sample_trials(trials, seed)
+
+    stock = frame["stock"].to_numpy(dtype="float64")
+    mean = frame["daily_mean"].to_numpy(dtype="float64")
+    std = frame["daily_std"].to_numpy(dtype="float64")
+
+    stockouts = np.zeros(len(frame))
+    shortage = np.zeros(len(frame))
+    demand = np.zeros(len(frame))
+
+    groups = frame.groupby(["lead_time", "reliability"], sort=False).indices
+
+    for (lead, reliability), rows in groups.items():
+
+        lead_times = lead_time_samples(lead, reliability, on_time, lateness)
+
+        for ell in np.unique(lead_times):
+
+            zs = z[lead_times == ell]  # still sorted
+            tail = np.append(np.cumsum(zs[::-1])[::-1], 0.0)
+
+            mu = mean[rows] * ell
+            sd = std[rows] * np.sqrt(ell)
+            gap = stock[rows] - mu
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                threshold = np.where(
+                    sd > 0, gap / sd,
+                    np.where(gap < 0, -np.inf, np.inf)
+                )
+
+            first = np.searchsorted(zs, threshold, side="right")
+            hits = len(zs) - first
+
+            stockouts[rows] += hits
+            shortage[rows] += hits * (mu - stock[rows]) + sd * tail[first]
+            demand[rows] += mu * len(zs)
+
+    out = frame.copy()
+    out["stockout_prob"] = stockouts / trials
+    out["expected_shortage"] = shortage / trials
+    out["expected_demand"] = demand / trials
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill = 1 - out["expected_shortage"] / out["expected_demand"]
+    out["fill_rate"] = fill.where(out["expected_demand"] > 0, 1.0).clip(0, 1)
+
+    return out
+
+def simulate_dense(frame, trials=TRIALS, seed=SEED):
+    # Reference implementation: every trial for every SKU. Only for
+    # small catalogues and for checking simulate_chunk.
+    z, on_time, lateness = sample_trials(trials, seed)
+    lead_times = np.vstack([
+        lead_time_samples(l, r, on_time, lateness)
+        for l, r in frame[["lead_time", "reliability"]].itertuples(index=False)
+    ])
+    demand = (
+        frame["daily_mean"].to_numpy()[:, None] * lead_times
+        + frame["daily_std"].to_numpy()[:, None] * np.sqrt(lead_times) * z
+    )
+    short = np.clip(demand - frame["stock"].to_numpy()[:, None], 0, None)
+    return pd.DataFrame({
+        "item": frame["item"].to_numpy(),
+        "stockout_prob": (short > 0).mean(axis=1),
+        "expected_shortage": short.mean(axis=1)
+    })
+
+def simulate(frame, trials=TRIALS, seed=SEED, workers=1):
+    # Every worker regenerates the same seeded trials, so a process
+    # pool gives the same numbers as a single process.
+    if frame.empty:
+        return pd.DataFrame(columns=RISK_COLUMNS)
+
+    if workers <= 1 or len(frame) < 2 * workers:
+        return simulate_chunk(frame, trials, seed)[RISK_COLUMNS]
+
+    chunks = np.array_split(np.arange(len(frame)), workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(
+            simulate_chunk,
+            [frame.iloc[c] for c in chunks],
+            [trials] * workers,
+            [seed] * workers
+        )
+        return pd.concat(list(parts))[RISK_COLUMNS]
+
+def fill_rate(risk):
+    # Unit-weighted fill rate across the catalogue.
+    demand = risk["expected_demand"].sum()
+    if not demand:
+        return 1.0
+    return float(1 - risk["expected_shortage"].sum() / demand)
+
+# ==========================================================
+# RESULT CACHE
+# ==========================================================
+
+_results = {}
+_lock = threading.Lock()
+
+def stockout_risk(inventory, item_date, suppliers, version=None,
+                  trials=TRIALS, seed=SEED, workers=1):
+    key = (version, trials, seed)
+    with _lock:
+        if version is not None and key in _results:
+            return _results[key]
+
+    risk = simulate(risk_inputs(inventory, item_date, suppliers), trials, seed, workers)
+
+    with _lock:
+        _results.clear()
+        _results[key] = risk
+
+    return risk
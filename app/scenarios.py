@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from app.balancing import ACTION_DTYPE, ACTION_LABELS, EXPEDITE, classify_actions
+from app.forecasting import HORIZON_DAYS
+from app.planning import capacity_utilization
+from app.rebalancing import warehouse_demand
+
+# ==========================================================
+# COPY-ON-WRITE WHAT-IF SCENARIOS
+# ==========================================================
+# A scenario is a small overlay (multipliers and masks) over the
+# cached base tables; nothing is written back and the base frames
+# are never copied. All scenarios are stacked into S x rows arrays
+# and classified in one pass with the same thresholds as
+# balancing_engine.
+
+class Scenario:
+
+    def __init__(self, name, demand_multiplier=1.0, item_multipliers=None,
+                 category_multipliers=None, supplier_delays=None,
+                 warehouse_outages=None):
+        self.name = name
+        self.demand_multiplier = float(demand_multiplier)
+        self.item_multipliers = item_multipliers or {}
+        self.category_multipliers = category_multipliers or {}
+        # supplier -> days late; WIP from a supplier that is d days late
+        # only counts for the part of the horizon it still covers.
+        self.supplier_delays = supplier_delays or {}
+        self.warehouse_outages = set(warehouse_outages or [])
+
+BASELINE = Scenario("Baseline")
+
+def numeric_column(frame, name, default):
+    if name in frame:
+        return pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype="float64")
+    return np.full(len(frame), default, dtype="float64")
+
+def object_column(frame, name):
+    if name in frame:
+        return frame[name].to_numpy(dtype="object")
+    return np.full(len(frame), None, dtype="object")
+
+class ScenarioBase:
+    # Read-only arrays over the base tables, built once per snapshot.
+
+    def __init__(self, inventory, demand, revenue_by_item=None, capacity=None, shares=None,
+                 capacity_daily=None):
+
+        self.item = object_column(inventory, "item")
+        self.warehouse = object_column(inventory, "warehouse")
+        self.category = object_column(inventory, "category")
+        self.supplier = object_column(inventory, "supplier")
+        self.on_hand = numeric_column(inventory, "on_hand", 0.0)
+        self.wip = numeric_column(inventory, "wip", 0.0)
+        self.safety = numeric_column(inventory, "safety", np.nan)
+        self.unit_cost = numeric_column(inventory, "unit_cost", 0.0)
+
+        per_item = demand.set_index("item")["qty"] if not demand.empty else pd.Series(dtype="float64")
+        if shares is not None and not demand.empty:
+            # Each row carries its warehouse's share, as in the balance node.
+            per_site = warehouse_demand(demand, shares).set_index(["item", "warehouse"])["qty"]
+            self.demand = per_site.reindex(
+                pd.MultiIndex.from_arrays([self.item, self.warehouse])
+            ).fillna(0).to_numpy(dtype="float64")
+        else:
+            self.demand = pd.Series(self.item).map(per_item).fillna(0).to_numpy(dtype="float64")
+
+        # Item-level history for KPIs, independent of how many
+        # warehouses stock the item.
+        self.items = per_item.index.to_numpy()
+        self.item_category = pd.Series(self.items).map(
+            inventory.drop_duplicates("item").set_index("item")["category"]
+            if "category" in inventory and not inventory.empty else {}
+        ).to_numpy()
+        revenue = revenue_by_item if revenue_by_item is not None else pd.Series(dtype="float64")
+        self.item_revenue = pd.Series(self.items).map(revenue).fillna(0).to_numpy(dtype="float64")
+
+        # Utilization comes from the same capacity plan as the Control
+        # Tower: the date x item forecast over the capacity horizon,
+        # split over warehouses by `shares`.
+        self.capacity = capacity if capacity is not None else pd.DataFrame(
+            columns=["warehouse", "machine", "daily_capacity", "shift_hours", "utilization"]
+        )
+        self.capacity_daily = capacity_daily if capacity_daily is not None else pd.DataFrame()
+        self.shares = shares if shares is not None else pd.DataFrame(
+            columns=["item", "warehouse", "share"]
+        )
+        self.daily_category = pd.Series(self.capacity_daily.columns, dtype="object").map(
+            inventory.drop_duplicates("item").set_index("item")["category"]
+            if "category" in inventory and not inventory.empty else {}
+        ).to_numpy()
+
+    def multipliers(self, scenario, items, categories):
+        mult = np.full(len(items), scenario.demand_multiplier)
+        if scenario.category_multipliers:
+            mult *= pd.Series(categories).map(scenario.category_multipliers).fillna(1).to_numpy()
+        if scenario.item_multipliers:
+            mult *= pd.Series(items).map(scenario.item_multipliers).fillna(1).to_numpy()
+        return mult
+
+    def up_mask(self, scenario, warehouses):
+        if not scenario.warehouse_outages:
+            return np.ones(len(warehouses), dtype=bool)
+        return ~pd.Series(warehouses).isin(scenario.warehouse_outages).to_numpy()
+
+    def utilization(self, scenario):
+        # Demand multipliers scale each item's load. A warehouse that is
+        # out has no capacity, and its share of each item moves to the
+        # item's other warehouses pro rata.
+        daily = self.capacity_daily * self.multipliers(
+            scenario, self.capacity_daily.columns, self.daily_category
+        ) if not self.capacity_daily.empty else self.capacity_daily
+        shares, capacity = self.shares, self.capacity
+        if scenario.warehouse_outages:
+            up = ~shares["warehouse"].isin(scenario.warehouse_outages)
+            total = shares.groupby("item")["share"].transform("sum")
+            kept = shares["share"].where(up, 0).groupby(shares["item"]).transform("sum")
+            shares = shares[up].assign(share=(shares["share"] * total / kept)[up].fillna(0))
+            capacity = capacity[~capacity["warehouse"].isin(scenario.warehouse_outages)]
+        return capacity_utilization(daily, shares, capacity)
+
+    def wip_factor(self, scenario):
+        if not scenario.supplier_delays:
+            return np.ones(len(self.supplier))
+        delay = pd.Series(self.supplier).map(scenario.supplier_delays).fillna(0).to_numpy(dtype="float64")
+        return np.clip(1 - delay / HORIZON_DAYS, 0, 1)
+
+# ==========================================================
+# EVALUATION
+# ==========================================================
+
+def evaluate(base, scenarios):
+    # Returns (kpis, actions): one KPI row per scenario, and a long
+    # frame of per-row actions tagged with the scenario name.
+
+    scenarios = [BASELINE] + [s for s in scenarios if s is not BASELINE]
+    names = [s.name for s in scenarios]
+
+    row_mult = np.vstack([base.multipliers(s, base.item, base.category) for s in scenarios])
+    row_up = np.vstack([base.up_mask(s, base.warehouse) for s in scenarios])
+    wip = np.vstack([base.wip_factor(s) for s in scenarios]) * base.wip
+
+    available = (base.on_hand + wip) * row_up
+    projected = available - base.demand * row_mult
+
+    rows = len(base.item)
+    labels = classify_actions(projected.ravel(), np.tile(base.safety, len(scenarios)))
+
+    actions = pd.DataFrame({
+        "scenario": np.repeat(names, rows),
+        "item": np.tile(base.item, len(scenarios)),
+        "warehouse": np.tile(base.warehouse, len(scenarios)),
+        "projected_stock": projected.ravel(),
+        "action": labels
+    })
+
+    item_mult = np.vstack([base.multipliers(s, base.items, base.item_category) for s in scenarios])
+
+    codes = labels.codes.reshape(len(scenarios), rows)
+    counts = np.stack([(codes == i).sum(axis=1) for i in range(len(ACTION_LABELS))], axis=1)
+
+    kpis = pd.DataFrame({
+        "scenario": names,
+        "revenue": (base.item_revenue * item_mult).sum(axis=1),
+        "inventory_value": (base.on_hand * base.unit_cost * row_up).sum(axis=1),
+        "utilization": [base.utilization(s) for s in scenarios],
+        "shortage_units": np.clip(-projected, 0, None).sum(axis=1)
+    })
+    for i, label in enumerate(ACTION_LABELS):
+        kpis[label] = counts[:, i]
+
+    return kpis, actions
+
+def diff_against_baseline(kpis, actions):
+    # KPI deltas and the rows whose action changed versus Baseline.
+    baseline = kpis.iloc[0]
+    numeric = kpis.columns.drop("scenario")
+    deltas = kpis.copy()
+    deltas[numeric] = kpis[numeric] - baseline[numeric]
+
+    rows = int((actions["scenario"] == "Baseline").sum())
+    base_actions = np.tile(actions["action"].iloc[:rows].to_numpy(), len(kpis))
+    moved = (
+        (actions["scenario"] != "Baseline").to_numpy()
+        & (actions["action"].to_numpy() != base_actions)
+    )
+    changed = actions[moved].assign(
+        baseline_action=pd.Categorical(base_actions[moved], dtype=ACTION_DTYPE)
+    )
+
+    deltas["actions_changed"] = deltas["scenario"].map(changed["scenario"].value_counts()).fillna(0).astype(int)
+    deltas["new_expedites"] = deltas["scenario"].map(
+        changed[changed["action"] == EXPEDITE]["scenario"].value_counts()
+    ).fillna(0).astype(int)
+
+    return deltas, changed.reset_index(drop=True)
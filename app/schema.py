@@ -0,0 +1,65 @@
+from sqlalchemy import text
+
+# ==========================================================
+# BASE SCHEMA
+# ==========================================================
+# Tables as first created. Later changes (columns, keys, indexes)
+# are versioned in app/migrations.py.
+
+tables_sql = [
+
+"""
+CREATE TABLE IF NOT EXISTS orders(
+order_id TEXT,date TEXT,customer TEXT,city TEXT,channel TEXT,
+item TEXT,category TEXT,qty INT,unit_price FLOAT,priority TEXT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS inventory(
+item TEXT,warehouse TEXT,category TEXT,supplier TEXT,
+on_hand INT,wip INT,safety INT,reorder_point INT,unit_cost FLOAT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS suppliers(
+supplier TEXT,item TEXT,lead_time INT,moq INT,
+reliability FLOAT,cost_per_unit FLOAT,
+phone TEXT,whatsapp TEXT,email TEXT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS capacity(
+warehouse TEXT,machine TEXT,daily_capacity INT,
+shift_hours INT,utilization FLOAT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS supply_pool(
+source TEXT,item TEXT,available_qty INT,
+contact TEXT,whatsapp TEXT,email TEXT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS planning_params(
+persona TEXT,safety_stock INT,lead_time INT,moq INT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS action_log(
+action TEXT,item TEXT,decision TEXT,timestamp TEXT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS tasks(
+task TEXT,assignee TEXT,status TEXT)
+""",
+
+"""
+CREATE TABLE IF NOT EXISTS warehouse_regions(
+city TEXT,channel TEXT,warehouse TEXT,share FLOAT)
+"""
+]
+
+def create_tables(conn):
+    for sql in tables_sql:
+        conn.execute(text(sql))
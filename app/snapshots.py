@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import uuid
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from app.migrations import ROW_KEY_TABLES, row_key
+
+# pyarrow, imported by the first SnapshotStore so cold starts with
+# snapshots off skip it.
+pa = None
+
+# ==========================================================
+# COLUMNAR SNAPSHOT STORE (OPTIONAL, NEEDS PYARROW)
+# ==========================================================
+# Append-mostly tables are mirrored to Arrow IPC files under
+# SUPPLYSENSE_SNAPSHOT_DIR. A load memory-maps the segments instead
+# of pulling every row through the driver, then fetches only rows
+# past the stored high-water mark (SQLite rowid, PostgreSQL row_id)
+# and writes them as a new segment. Stored rows are trusted only while
+# the table's table_changes counter (bumped by triggers on UPDATE and
+# DELETE, from any client) matches the manifest; without the counter
+# each table is rebuilt on its first load in the process. A row count
+# that no longer adds up, a changed column set, or an explicit
+# invalidate() also trigger a full rebuild. Segments are compacted
+# into one file once there are too many.
+
+SNAPSHOT_DIR = os.getenv("SUPPLYSENSE_SNAPSHOT_DIR", "")
+SNAPSHOT_TABLES = tuple(
+    t for t in os.getenv("SUPPLYSENSE_SNAPSHOT_TABLES", "orders,action_log").split(",")
+    if t in ROW_KEY_TABLES
+)
+MAX_SEGMENTS = 8
+
+KEY_COLUMN = "snapshot_key"
+
+def load_arrow():
+    global pa
+    if pa is None:
+        import pyarrow
+        pa = pyarrow
+    return pa
+
+def read_segment(path):
+    # The mapped buffers back the Arrow table directly; nothing is
+    # parsed or copied until pandas conversion.
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+def write_segment(path, table):
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+class SnapshotStore:
+
+    def __init__(self, engine, directory, tables=SNAPSHOT_TABLES):
+        load_arrow()
+        self.engine = engine
+        self.directory = directory
+        self.tables = set(tables)
+        self.key = row_key(engine.dialect.name)
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._loaded = set()
+        self._counted = False
+        self.stats = {"rebuilds": 0, "appends": 0, "appended_rows": 0, "compactions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def covers(self, name):
+        return name in self.tables
+
+    def invalidate(self, *names):
+        # Called after writes that change or remove existing rows.
+        with self._lock:
+            self._dirty.update(n for n in names if n in self.tables)
+
+    # ------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------
+
+    def _manifest_path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _manifest(self, name):
+        try:
+            with open(self._manifest_path(name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, name, manifest):
+        path = self._manifest_path(name)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _path(self, segment):
+        return os.path.join(self.directory, segment)
+
+    def _drop_segments(self, name, keep):
+        prefix = f"{name}."
+        for file in os.listdir(self.directory):
+            if file.startswith(prefix) and file.endswith(".arrow") and file not in keep:
+                try:
+                    os.remove(os.path.join(self.directory, file))
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------
+
+    def _changes(self, conn, name):
+        # UPDATE/DELETE count from migration 7, or None before it ran.
+        if not self._counted:
+            if not inspect(conn).has_table("table_changes"):
+                return None
+            self._counted = True
+        return conn.execute(
+            text("SELECT changes FROM table_changes WHERE name = :name"),
+            {"name": name}
+        ).scalar()
+
+    def _fetch(self, conn, name, after):
+        frame = pd.read_sql(
+            text(
+                f"SELECT {self.key} AS {KEY_COLUMN}, * FROM {name} "
+                f"WHERE {self.key} > :after ORDER BY {self.key}"
+            ),
+            conn, params={"after": after}
+        )
+        high_water = int(frame[KEY_COLUMN].max()) if not frame.empty else after
+        return frame.drop(columns=KEY_COLUMN), high_water
+
+    def _rebuild(self, conn, name, changes):
+        frame, high_water = self._fetch(conn, name, -1)
+        segment = f"{name}.{uuid.uuid4().hex[:12]}.arrow"
+        write_segment(
+            self._path(segment),
+            pa.Table.from_pandas(frame, preserve_index=False)
+        )
+        manifest = {
+            "segments": [segment],
+            "rows": len(frame),
+            "high_water": high_water,
+            "columns": list(frame.columns),
+            "changes": changes
+        }
+        self._save_manifest(name, manifest)
+        self._drop_segments(name, manifest["segments"])
+        self.stats["rebuilds"] += 1
+        return manifest
+
+    def _append(self, conn, name, manifest, schema):
+        frame, high_water = self._fetch(conn, name, manifest["high_water"])
+        if frame.empty:
+            return manifest
+        if list(frame.columns) != manifest["columns"]:
+            return None
+        try:
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+
+        segment = f"{name}.{uuid.uuid4().hex[:12]}.arrow"
+        write_segment(self._path(segment), table)
+        manifest = dict(
+            manifest,
+            segments=manifest["segments"] + [segment],
+            rows=manifest["rows"] + len(frame),
+            high_water=high_water
+        )
+        self._save_manifest(name, manifest)
+        self.stats["appends"] += 1
+        self.stats["appended_rows"] += len(frame)
+        return manifest
+
+    def _compact(self, name, manifest, table):
+        segment = f"{name}.{uuid.uuid4().hex[:12]}.arrow"
+        write_segment(self._path(segment), table.combine_chunks())
+        manifest = dict(manifest, segments=[segment])
+        self._save_manifest(name, manifest)
+        self._drop_segments(name, manifest["segments"])
+        self.stats["compactions"] += 1
+        return manifest
+
+    def load(self, name):
+        """Current contents of `name` as a DataFrame, synced incrementally."""
+
+        with self._lock:
+            dirty = name in self._dirty
+            self._dirty.discard(name)
+
+            with self.engine.connect() as conn:
+                # Read before the rows: a change that lands in between
+                # leaves the manifest one count behind, so the next
+                # load rebuilds rather than keeping stale rows.
+                changes = self._changes(conn, name)
+                rows, high_water_db = conn.execute(
+                    text(f"SELECT COUNT(*), MAX({self.key}) FROM {name}")
+                ).one()
+                high_water_db = int(high_water_db) if high_water_db is not None else -1
+
+                manifest = None if dirty else self._manifest(name)
+                if changes is None:
+                    trusted = name in self._loaded
+                else:
+                    trusted = manifest is not None and manifest.get("changes") == changes
+                if not trusted:
+                    manifest = None
+
+                if manifest is not None:
+                    try:
+                        segments = [
+                            read_segment(self._path(s))
+                            for s in manifest["segments"]
+                        ]
+                    except (OSError, pa.ArrowInvalid):
+                        manifest = None
+
+                if manifest is not None:
+                    new_rows = conn.execute(
+                        text(f"SELECT COUNT(*) FROM {name} WHERE {self.key} > :after"),
+                        {"after": manifest["high_water"]}
+                    ).scalar()
+                    # Every stored row must still be there; anything
+                    # else means rows were deleted or the table replaced.
+                    if manifest["rows"] + new_rows != rows or high_water_db < manifest["high_water"]:
+                        manifest = None
+
+                if manifest is not None and new_rows:
+                    known = len(manifest["segments"])
+                    manifest = self._append(conn, name, manifest, segments[0].schema)
+                    if manifest is not None:
+                        segments += [
+                            read_segment(self._path(s))
+                            for s in manifest["segments"][known:]
+                        ]
+
+                if manifest is None:
+                    manifest = self._rebuild(conn, name, changes)
+                    segments = [read_segment(self._path(manifest["segments"][0]))]
+
+            self._loaded.add(name)
+            table = pa.concat_tables(segments) if len(segments) > 1 else segments[0]
+            if len(manifest["segments"]) > MAX_SEGMENTS:
+                self._compact(name, manifest, table)
+
+        return table.to_pandas()
+
+_store = None
+_store_lock = threading.Lock()
+_no_arrow = False
+
+def get_snapshot_store(engine):
+    """The process-wide store, or None when snapshots are off."""
+    global _store, _no_arrow
+    if not SNAPSHOT_DIR or _no_arrow:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = SnapshotStore(engine, SNAPSHOT_DIR)
+            except ImportError:
+                _no_arrow = True
+        return _store
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+
+# ==========================================================
+# COLD START PROFILE
+# python -m app.startup [--check] [--max-login-seconds N]
+# ==========================================================
+# Each module is imported in a fresh interpreter so its cost
+# includes everything it drags in. --check renders the login
+# screen headlessly and fails if it got slower than the budget or
+# pulled in a module that should only load behind it.
+
+MODULES = [
+    "streamlit",
+    "pandas",
+    "numpy",
+    "sqlalchemy",
+    "plotly.express",
+    "sklearn.linear_model",
+    "openai",
+    "twilio.rest",
+    "kafka",
+    "app.database",
+    "app.balancing",
+    "app.forecasting",
+    "app.allocation",
+    "app.risk",
+    "app.scenarios",
+    "app.alerts",
+    "app.event_bus"
+]
+
+# Only needed once a page or action asks for them.
+DEFERRED_MODULES = ("sklearn", "plotly", "openai", "twilio", "kafka")
+
+MAX_LOGIN_SECONDS = 3.0
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+try:
+    __import__({module!r})
+except ImportError:
+    print("missing")
+else:
+    print(time.perf_counter() - start)
+"""
+
+LOGIN_PROBE = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+AppTest.from_file({script!r}, default_timeout=120).run()
+print(time.perf_counter() - start)
+print(",".join(sorted(m for m in sys.modules if "." not in m)))
+"""
+
+def run_probe(source):
+    result = subprocess.run(
+        [sys.executable, "-c", source],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()
+
+def import_cost(module):
+    """Seconds to import `module` cold, or None if it is not installed."""
+    line = run_probe(IMPORT_PROBE.format(module=module))[-1]
+    return None if line == "missing" else float(line)
+
+def login_profile():
+    """Seconds to the login screen and the deferred modules it loaded."""
+    lines = run_probe(LOGIN_PROBE.format(script=APP_SCRIPT))
+    loaded = set(lines[-1].split(","))
+    return float(lines[-2]), sorted(loaded.intersection(DEFERRED_MODULES))
+
+def main(argv):
+
+    if "--check" in argv:
+        budget = MAX_LOGIN_SECONDS
+        if "--max-login-seconds" in argv:
+            budget = float(argv[argv.index("--max-login-seconds") + 1])
+
+        seconds, loaded = login_profile()
+        print(f"login screen: {seconds:.2f}s (budget {budget:.2f}s)")
+        if loaded:
+            print("loaded before login: " + ", ".join(loaded))
+        return 1 if seconds > budget or loaded else 0
+
+    for module in MODULES:
+        seconds = import_cost(module)
+        cost = "not installed" if seconds is None else f"{seconds * 1000:8.0f} ms"
+        print(f"{module:<24} {cost}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,190 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from app.ingest import table_schema
+from app.migrations import row_key
+
+# ==========================================================
+# PAGINATED, SERVER-SIDE TABLE VIEWS
+# ==========================================================
+# Sorting, filters and search run in the database and pages are
+# fetched by seeking past the last row shown (keyset pagination),
+# so each page costs O(page size) regardless of table size.
+
+PAGE_SIZE = 50
+CURSOR = "_cursor"
+
+_counts = {}
+_counts_lock = threading.Lock()
+
+def table_columns(engine, table):
+    # Column name -> "int", "float" or "text", in table order.
+    return table_schema(engine, table)
+
+def filter_value(col, value, kind):
+    # Filters arrive as text; PostgreSQL won't compare an integer
+    # column with a text parameter, so bind the column's own type.
+    if kind == "text":
+        return str(value)
+    try:
+        return int(str(value).strip()) if kind == "int" else float(value)
+    except (TypeError, ValueError):
+        number = "a whole number" if kind == "int" else "a number"
+        raise ValueError(f"{col} must be {number}, got {value!r}") from None
+
+def where_clause(columns, filters, search):
+
+    clauses = []
+    params = {}
+
+    for i, (col, value) in enumerate((filters or {}).items()):
+        if col not in columns:
+            raise ValueError(f"Unknown column: {col}")
+        clauses.append(f"{col} = :f{i}")
+        params[f"f{i}"] = filter_value(col, value, columns[col])
+
+    if search:
+        clauses.append("(" + " OR ".join(
+            f"LOWER(CAST({col} AS TEXT)) LIKE :search" for col in columns
+        ) + ")")
+        params["search"] = f"%{search.lower()}%"
+
+    return clauses, params
+
+def fetch_page(engine, table, sort=None, descending=False, filters=None,
+               search=None, after=None, limit=PAGE_SIZE):
+    # `after` is the (sort value, row key) pair of the last row of the
+    # previous page. Returns (rows, cursor for the next page or None).
+
+    columns = table_columns(engine, table)
+    if sort is not None and sort not in columns:
+        raise ValueError(f"Unknown column: {sort}")
+
+    key = row_key(engine.dialect.name)
+    clauses, params = where_clause(columns, filters, search)
+    op = "<" if descending else ">"
+    direction = "DESC" if descending else "ASC"
+
+    if sort is None:
+        order = f"{key} {direction}"
+        if after is not None:
+            clauses.append(f"{key} {op} :after_key")
+            params["after_key"] = after[1]
+    else:
+        # NULL sort values always come last, on both backends.
+        order = f"({sort} IS NULL), {sort} {direction}, {key} {direction}"
+        if after is not None:
+            params["after_key"] = after[1]
+            if after[0] is None:
+                clauses.append(f"({sort} IS NULL AND {key} {op} :after_key)")
+            else:
+                params["after_value"] = after[0]
+                clauses.append(
+                    f"({sort} {op} :after_value"
+                    f" OR ({sort} = :after_value AND {key} {op} :after_key)"
+                    f" OR {sort} IS NULL)"
+                )
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    params["limit"] = limit + 1
+
+    rows = pd.read_sql(
+        text(f"SELECT {key} AS {CURSOR}, * FROM {table} {where} ORDER BY {order} LIMIT :limit"),
+        engine,
+        params=params
+    )
+
+    cursor = None
+    if len(rows) > limit:
+        rows = rows.iloc[:limit]
+        last = rows.iloc[-1]
+        value = None if sort is None or pd.isna(last[sort]) else last[sort]
+        if hasattr(value, "item"):
+            value = value.item()
+        cursor = (value, int(last[CURSOR]))
+
+    return rows.drop(columns=CURSOR), cursor
+
+def count_rows(engine, table, filters=None, search=None, version=None):
+    # Counted once per (table version, filters, search).
+    key = (table, version, tuple(sorted((filters or {}).items())), search)
+
+    with _counts_lock:
+        if version is not None and key in _counts:
+            return _counts[key]
+
+    columns = table_columns(engine, table)
+    clauses, params = where_clause(columns, filters, search)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    with engine.connect() as conn:
+        total = conn.execute(text(f"SELECT COUNT(*) FROM {table} {where}"), params).scalar()
+
+    with _counts_lock:
+        if len(_counts) > 256:
+            _counts.clear()
+        _counts[key] = int(total or 0)
+
+    return int(total or 0)
+
+# ==========================================================
+# STREAMLIT COMPONENT
+# ==========================================================
+
+def table_view(engine, table, version=None, page_size=PAGE_SIZE, key=None):
+    # `key` tells apart several views of the same table in one run.
+
+    state_key = f"table_view_{key or table}"
+
+    try:
+        columns = list(table_columns(engine, table))
+    except Exception:
+        st.info(f"No {table} table yet")
+        return
+
+    c1, c2, c3, c4 = st.columns([2,2,1,3])
+    sort = c1.selectbox("Sort by", ["(insert order)"] + columns, key=f"{state_key}_sort")
+    sort = None if sort == "(insert order)" else sort
+    descending = c3.checkbox("Desc", key=f"{state_key}_desc")
+    filter_col = c2.selectbox("Filter column", ["(none)"] + columns, key=f"{state_key}_fcol")
+    search = c4.text_input("Search", key=f"{state_key}_search").strip() or None
+
+    filters = {}
+    if filter_col != "(none)":
+        value = st.text_input(f"{filter_col} equals", key=f"{state_key}_fval")
+        if value:
+            filters[filter_col] = value
+
+    # A change to sort/filter/search resets paging.
+    query = (sort, descending, tuple(filters.items()), search, version)
+    if st.session_state.get(f"{state_key}_query") != query:
+        st.session_state[f"{state_key}_query"] = query
+        st.session_state[f"{state_key}_cursors"] = [None]
+
+    cursors = st.session_state[f"{state_key}_cursors"]
+
+    try:
+        rows, next_cursor = fetch_page(
+            engine, table, sort, descending, filters, search, cursors[-1], page_size
+        )
+        total = count_rows(engine, table, filters, search, version)
+    except ValueError as e:
+        st.warning(str(e))
+        return
+
+    st.dataframe(rows)
+
+    p1, p2, p3 = st.columns([1,1,4])
+    pages = max(1, -(-total // page_size))
+    p3.caption(f"Page {len(cursors)} of {pages} · {total:,} rows")
+
+    if p1.button("◀ Prev", key=f"{state_key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+
+    if p2.button("Next ▶", key=f"{state_key}_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
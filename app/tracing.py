@@ -0,0 +1,240 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================================
+# LIGHTWEIGHT TRACING
+# ==========================================================
+# Timing spans feed fixed-bucket histograms, process-wide and per
+# Streamlit session. Disabled (the default) a span is a shared
+# nullcontext and a section mark is one attribute check, so the
+# instrumentation can stay in place. Enable with
+# SUPPLYSENSE_TRACING=1 or from System Settings.
+#
+# Histograms export in the Prometheus text format to a file
+# (SUPPLYSENSE_METRICS_FILE, rewritten after each rerun) or over
+# HTTP (SUPPLYSENSE_METRICS_PORT serves /metrics).
+
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+METRIC = "supplysense_span_seconds"
+
+_NOOP = nullcontext()
+
+class Histogram:
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket holding the q-th
+        # observation; the overflow bucket is capped at the max seen.
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "total_s": round(self.sum, 3)
+        }
+
+class SessionTrace:
+    # Kept in st.session_state; `last_rerun` is the ordered span list
+    # of the most recent complete rerun.
+
+    def __init__(self):
+        self.histograms = {}
+        self.current = []
+        self.last_rerun = []
+
+class _Span:
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class Tracer:
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._session = contextvars.ContextVar("supplysense_trace", default=None)
+        self._section = contextvars.ContextVar("supplysense_section", default=None)
+
+    def span(self, name):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(seconds)
+
+        session = self._session.get()
+        if session is not None:
+            hist = session.histograms.get(name)
+            if hist is None:
+                hist = session.histograms[name] = Histogram()
+            hist.observe(seconds)
+            session.current.append((name, seconds))
+
+    # ------------------------------------------------------
+    # Reruns and page sections
+    # ------------------------------------------------------
+
+    def start_rerun(self, session):
+        """Bind this script thread to `session` for the rerun."""
+        self._session.set(session)
+        self._section.set(None)
+        if self.enabled:
+            session.current = []
+            self._section.set(("rerun", time.perf_counter()))
+
+    def section(self, name):
+        # Closes the previous section and opens `name`, so a page can
+        # be split into timed sections without re-indenting it.
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._close_section(now)
+        self._section.set((f"section.{name}", now))
+
+    def end_rerun(self):
+        if not self.enabled:
+            return
+        self._close_section(time.perf_counter())
+        session = self._session.get()
+        if session is not None:
+            session.last_rerun = session.current
+            session.current = []
+
+    def _close_section(self, now):
+        open_section = self._section.get()
+        if open_section is not None:
+            name, start = open_section
+            if name != "rerun":
+                self.observe(name, now - start)
+        self._section.set(None)
+
+    # ------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------
+
+    def summary(self, session=None):
+        if session is not None:
+            histograms = dict(session.histograms)
+        else:
+            with self._lock:
+                histograms = dict(self.histograms)
+        return {name: hist.summary() for name, hist in sorted(histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def prometheus_text(self):
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+
+        lines = [
+            f"# HELP {METRIC} Time spent in traced SupplySense spans.",
+            f"# TYPE {METRIC} histogram"
+        ]
+        for name, hist in histograms:
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(BUCKETS, hist.counts):
+                cumulative += n
+                lines.append(f'{METRIC}_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC}_bucket{{span="{label}",le="+Inf"}} {hist.count}')
+            lines.append(f'{METRIC}_sum{{span="{label}"}} {hist.sum:.6f}')
+            lines.append(f'{METRIC}_count{{span="{label}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+tracer = Tracer(enabled=os.getenv("SUPPLYSENSE_TRACING", "0") == "1")
+
+# ==========================================================
+# /metrics ENDPOINT (ONE PER PROCESS)
+# ==========================================================
+
+_server = None
+_server_lock = threading.Lock()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = tracer.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Start the /metrics endpoint once; later calls return the same server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(
+                target=_server.serve_forever, name="supplysense-metrics", daemon=True
+            ).start()
+        return _server
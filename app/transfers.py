@@ -0,0 +1,166 @@
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+# ==========================================================
+# ATOMIC BATCHED WAREHOUSE TRANSFERS
+# ==========================================================
+# A batch of (item, qty, from_wh, to_wh) moves is applied in one
+# transaction. The inventory rows involved are locked first (row
+# locks on PostgreSQL, the database write lock on SQLite), moves are
+# checked in order against the running stock, and only the net change
+# per (item, warehouse) is written back.
+
+MOVE_COLUMNS = ["item", "qty", "from_wh", "to_wh"]
+
+# Copied from the source row when a destination has no row yet.
+CARRY_COLUMNS = ["category", "supplier", "safety", "reorder_point", "unit_cost"]
+
+def normalize_moves(moves):
+    if not isinstance(moves, pd.DataFrame):
+        moves = pd.DataFrame(list(moves), columns=MOVE_COLUMNS)
+    moves = moves[MOVE_COLUMNS].reset_index(drop=True)
+    moves["qty"] = pd.to_numeric(moves["qty"], errors="coerce").fillna(0).astype("int64")
+    return moves
+
+def lock_rows(conn, keys):
+    # Returns the current inventory rows for `keys`, locked until commit.
+    postgres = conn.dialect.name == "postgresql"
+
+    if postgres:
+        conn.execute(text(
+            "CREATE TEMP TABLE transfer_keys(item TEXT, warehouse TEXT) ON COMMIT DROP"
+        ))
+    else:
+        # Take the write lock before reading so no other session can
+        # change stock between the check and the update.
+        conn.execute(text("UPDATE inventory SET on_hand = on_hand WHERE 1 = 0"))
+        conn.execute(text("CREATE TEMP TABLE IF NOT EXISTS transfer_keys(item TEXT, warehouse TEXT)"))
+        conn.execute(text("DELETE FROM transfer_keys"))
+
+    conn.execute(
+        text("INSERT INTO transfer_keys VALUES (:item, :warehouse)"),
+        keys.to_dict("records")
+    )
+
+    cols = ", ".join(f"i.{c}" for c in ["item", "warehouse", "on_hand"] + CARRY_COLUMNS)
+    rows = conn.execute(text(
+        f"SELECT {cols} "
+        "FROM inventory i JOIN transfer_keys k "
+        "ON i.item = k.item AND i.warehouse = k.warehouse"
+        + (" FOR UPDATE OF i" if postgres else "")
+    )).mappings().all()
+
+    return pd.DataFrame(rows, columns=["item", "warehouse", "on_hand"] + CARRY_COLUMNS)
+
+def check_moves(moves, current):
+    # Sequential check in batch order; earlier moves into a warehouse
+    # can fund later moves out of it.
+    counts = current.groupby(["item", "warehouse"]).size()
+    duplicated = set(counts[counts > 1].index)
+    stock = {
+        (r.item, r.warehouse): 0 if pd.isna(r.on_hand) else int(r.on_hand)
+        for r in current.drop_duplicates(["item", "warehouse"]).itertuples(index=False)
+    }
+
+    reasons = []
+
+    for item, qty, src, dst in moves[MOVE_COLUMNS].itertuples(index=False, name=None):
+
+        source = (item, src)
+
+        if qty <= 0:
+            reasons.append("Quantity must be positive")
+        elif src == dst:
+            reasons.append("Source and destination are the same")
+        elif source in duplicated or (item, dst) in duplicated:
+            reasons.append("Duplicate inventory rows for this item and warehouse")
+        elif source not in stock:
+            reasons.append("Item not stocked in source warehouse")
+        elif stock[source] < qty:
+            reasons.append(f"Insufficient stock ({stock[source]} available)")
+        else:
+            stock[source] -= qty
+            stock[(item, dst)] = stock.get((item, dst), 0) + qty
+            reasons.append(None)
+
+    return pd.Series(reasons, index=moves.index, dtype="object")
+
+def apply_transfers(engine, moves, assignee="Warehouse"):
+
+    start = time.perf_counter()
+    moves = normalize_moves(moves)
+
+    keys = pd.concat([
+        moves[["item", "from_wh"]].set_axis(["item", "warehouse"], axis=1),
+        moves[["item", "to_wh"]].set_axis(["item", "warehouse"], axis=1)
+    ]).drop_duplicates()
+
+    with engine.begin() as conn:
+
+        current = lock_rows(conn, keys) if not moves.empty else pd.DataFrame(
+            columns=["item", "warehouse", "on_hand"] + CARRY_COLUMNS
+        )
+        moves["rejected"] = check_moves(moves, current)
+        accepted = moves[moves["rejected"].isna()]
+
+        if not accepted.empty:
+
+            delta = pd.concat([
+                pd.DataFrame({"item": accepted["item"], "warehouse": accepted["from_wh"], "delta": -accepted["qty"]}),
+                pd.DataFrame({"item": accepted["item"], "warehouse": accepted["to_wh"], "delta": accepted["qty"]})
+            ]).groupby(["item", "warehouse"], as_index=False)["delta"].sum()
+
+            existing = current.drop_duplicates(["item", "warehouse"])
+            delta = delta.merge(existing, on=["item", "warehouse"], how="left", indicator=True)
+
+            updates = delta[(delta["_merge"] == "both") & (delta["delta"] != 0)]
+            if not updates.empty:
+                conn.execute(
+                    text("UPDATE inventory SET on_hand = COALESCE(on_hand, 0) + :delta "
+                         "WHERE item = :item AND warehouse = :warehouse"),
+                    [
+                        {"delta": int(d), "item": i, "warehouse": w}
+                        for i, w, d in updates[["item", "warehouse", "delta"]].itertuples(index=False)
+                    ]
+                )
+
+            inserts = delta[delta["_merge"] == "left_only"][["item", "warehouse", "delta"]]
+            if not inserts.empty:
+                # New destination rows inherit planning fields from the
+                # first accepted source of the same item.
+                template = accepted.drop_duplicates("item")[["item", "from_wh"]].merge(
+                    existing, left_on=["item", "from_wh"], right_on=["item", "warehouse"]
+                )[["item"] + CARRY_COLUMNS]
+                inserts = inserts.merge(template, on="item", how="left")
+                conn.execute(
+                    text(
+                        "INSERT INTO inventory(item, warehouse, category, supplier, "
+                        "on_hand, wip, safety, reorder_point, unit_cost) VALUES "
+                        "(:item, :warehouse, :category, :supplier, :delta, 0, "
+                        ":safety, :reorder_point, :unit_cost)"
+                    ),
+                    inserts.astype(object).where(inserts.notna(), None).to_dict("records")
+                )
+
+            conn.execute(
+                text("INSERT INTO tasks VALUES (:task, :assignee, :status)"),
+                [
+                    {
+                        "task": f"Transferred {q} {i} from {s} to {d}",
+                        "assignee": assignee,
+                        "status": "Completed"
+                    }
+                    for i, q, s, d in accepted[MOVE_COLUMNS].itertuples(index=False)
+                ]
+            )
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        "accepted": accepted[MOVE_COLUMNS].reset_index(drop=True),
+        "rejected": moves[moves["rejected"].notna()].rename(columns={"rejected": "reason"}).reset_index(drop=True),
+        "seconds": round(elapsed, 4),
+        "moves_per_sec": round(len(moves) / elapsed, 1) if elapsed else 0.0
+    }
@@ -0,0 +1,101 @@
+# ==========================================================
+# FULFILMENT ALLOCATOR BENCHMARK
+# python -m benchmarks.bench_allocation [basket_lines]
+# ==========================================================
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.allocation import SupplyIndex
+
+ITEMS = 20_000
+
+def make_frames(seed=11):
+
+    rng = np.random.default_rng(seed)
+    items = np.char.add("SKU", np.arange(ITEMS).astype(str))
+    inv_rows = ITEMS * 3
+    pool_rows = ITEMS * 5
+
+    inventory = pd.DataFrame({
+        "item": items[rng.integers(0, ITEMS, inv_rows)],
+        "warehouse": "WH" + pd.Series(rng.integers(0, 8, inv_rows)).astype(str),
+        "on_hand": rng.integers(0, 200, inv_rows)
+    })
+
+    supply_pool = pd.DataFrame({
+        "source": "SUP" + pd.Series(rng.integers(0, 300, pool_rows)).astype(str),
+        "item": items[rng.integers(0, ITEMS, pool_rows)],
+        "available_qty": rng.integers(0, 500, pool_rows),
+        "contact": "Sales", "whatsapp": "+91", "email": "x@y.z"
+    })
+
+    suppliers = pd.DataFrame({
+        "supplier": supply_pool["source"],
+        "item": supply_pool["item"],
+        "cost_per_unit": rng.uniform(1, 50, pool_rows),
+        "reliability": rng.uniform(0.5, 1, pool_rows),
+        "lead_time": rng.integers(1, 20, pool_rows)
+    })
+
+    return inventory, supply_pool, suppliers, items
+
+def per_click(inventory, supply_pool, item_req, qty_req):
+    # The original Control Tower path, one item per click.
+    plan = []
+    remaining = qty_req
+
+    own_stock_df = inventory[inventory["item"] == item_req]
+    if not own_stock_df.empty:
+        allocate = min(int(own_stock_df["on_hand"].sum()), remaining)
+        if allocate > 0:
+            plan.append(("🏭 Own Warehouse", allocate, "Internal Stock"))
+            remaining -= allocate
+
+    pool = supply_pool[supply_pool["item"] == item_req]
+    for _, row in pool.iterrows():
+        if remaining <= 0:
+            break
+        allocate = min(int(row["available_qty"]), remaining)
+        if allocate > 0:
+            plan.append((row["source"], allocate, row["contact"]))
+            remaining -= allocate
+
+    return plan, remaining
+
+def main(lines):
+
+    inventory, supply_pool, suppliers, items = make_frames()
+    rng = np.random.default_rng(5)
+    basket = pd.DataFrame({
+        "item": items[rng.choice(ITEMS, lines, replace=False)],
+        "qty": rng.integers(1, 1500, lines)
+    })
+
+    start = time.perf_counter()
+    for item, qty in basket.itertuples(index=False):
+        per_click(inventory, supply_pool, item, qty)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SupplyIndex(inventory, supply_pool, suppliers, rank_by="pool")
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plans, result = index.allocate(basket)
+    batched = time.perf_counter() - start
+
+    # Same shortages as the per-click path when ranked in pool order.
+    expected = [per_click(inventory, supply_pool, i, q)[1] for i, q in basket.head(50).itertuples(index=False)]
+    assert result["shortage"].head(50).tolist() == expected
+
+    print(f"{lines} basket lines over {ITEMS} items")
+    print(f"  per-click loop : {legacy:.3f}s")
+    print(f"  index build    : {build:.3f}s (once per table version)")
+    print(f"  batch allocate : {batched:.4f}s ({legacy / batched:,.0f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
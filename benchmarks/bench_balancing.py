@@ -0,0 +1,92 @@
+# ==========================================================
+# BALANCING ENGINE BENCHMARK
+# python -m benchmarks.bench_balancing [rows ...]
+# ==========================================================
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.balancing import balancing_engine
+from app.demand import aggregate_orders
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000, 250_000]
+
+# The legacy iterrows() path is only timed up to this size.
+LEGACY_LIMIT = 50_000
+
+def make_frames(rows, seed=42):
+
+    rng = np.random.default_rng(seed)
+    items = rows // 4 or 1
+
+    inventory = pd.DataFrame({
+        "item": "SKU" + pd.Series(rng.integers(0, items, rows)).astype(str),
+        "warehouse": "WH" + pd.Series(rng.integers(0, 4, rows)).astype(str),
+        "category": "General",
+        "supplier": "SUP" + pd.Series(rng.integers(0, 50, rows)).astype(str),
+        "on_hand": rng.integers(0, 2000, rows),
+        "wip": rng.integers(0, 300, rows),
+        "safety": rng.integers(10, 300, rows),
+        "reorder_point": rng.integers(10, 300, rows),
+        "unit_cost": rng.uniform(1, 100, rows)
+    })
+
+    order_rows = rows * 2
+    orders = pd.DataFrame({
+        "item": "SKU" + pd.Series(rng.integers(0, items, order_rows)).astype(str),
+        "qty": rng.integers(1, 400, order_rows)
+    })
+
+    return inventory, orders
+
+def legacy_actions(df):
+
+    actions = []
+
+    for _, r in df.iterrows():
+
+        if r["projected_stock"] < 0:
+            actions.append(("🚨 Expedite Supplier", r["item"]))
+        elif r["projected_stock"] < r["safety"]:
+            actions.append(("⚠️ Increase Production", r["item"]))
+        elif r["projected_stock"] > r["safety"] * 5:
+            actions.append(("🛑 Reduce Batch Size", r["item"]))
+        elif r["projected_stock"] > r["safety"] * 3:
+            actions.append(("📦 Run Promotion", r["item"]))
+        else:
+            actions.append(("✅ Balanced", r["item"]))
+
+    return actions
+
+def main(sizes):
+
+    print(f"{'rows':>10} {'vectorized_s':>14} {'legacy_s':>10} {'speedup':>9}")
+
+    for rows in sizes:
+
+        inventory, orders = make_frames(rows)
+
+        demand = aggregate_orders(orders, "item")
+
+        start = time.perf_counter()
+        df, actions = balancing_engine(inventory, demand)
+        vectorized = time.perf_counter() - start
+
+        if rows <= LEGACY_LIMIT:
+            start = time.perf_counter()
+            expected = legacy_actions(df)
+            legacy = time.perf_counter() - start
+
+            got = list(zip(actions["action"].astype(str), actions["item"]))
+            assert got == expected, "vectorized actions differ from legacy"
+
+            print(f"{rows:>10} {vectorized:>14.4f} {legacy:>10.4f} "
+                  f"{legacy / vectorized:>8.1f}x")
+        else:
+            print(f"{rows:>10} {vectorized:>14.4f} {'-':>10} {'-':>9}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
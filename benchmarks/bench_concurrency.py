@@ -0,0 +1,78 @@
+# ==========================================================
+# CONCURRENT SESSION BENCHMARK (SQLITE)
+# python -m benchmarks.bench_concurrency [sessions] [seconds]
+# ==========================================================
+# Each thread plays one Streamlit session: mostly reads of a hot
+# table with an occasional write, as Control Tower reruns do.
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.database import make_engine, pool_stats
+
+WRITE_EVERY = 5
+
+def build_database(engine, rows=20_000):
+    rng = np.random.default_rng(4)
+    pd.DataFrame({
+        "item": np.char.add("SKU", np.arange(rows).astype(str)),
+        "warehouse": "WH1",
+        "on_hand": rng.integers(0, 500, rows)
+    }).to_sql("inventory", engine, index=False, if_exists="replace")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS tasks(task TEXT,assignee TEXT,status TEXT)"))
+
+def session(engine, seconds, counts, errors):
+    deadline = time.perf_counter() + seconds
+    ops = 0
+    while time.perf_counter() < deadline:
+        try:
+            if ops % WRITE_EVERY == 0:
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO tasks VALUES ('bench','x','done')"))
+            else:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT SUM(on_hand) FROM inventory")).scalar()
+            ops += 1
+        except Exception:
+            errors.append(1)
+    counts.append(ops)
+
+def run(tuned, sessions, seconds):
+
+    path = os.path.join(tempfile.mkdtemp(), "concurrency.db")
+    engine = make_engine(f"sqlite:///{path}", tuned=tuned)
+    build_database(engine)
+
+    counts, errors = [], []
+    threads = [
+        threading.Thread(target=session, args=(engine, seconds, counts, errors))
+        for _ in range(sessions)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool_stats(engine)
+    engine.dispose()
+    return sum(counts) / seconds, len(errors), stats
+
+def main(sessions, seconds):
+    print(f"{sessions} sessions for {seconds}s, 1 write per {WRITE_EVERY} ops")
+    for tuned in (False, True):
+        rate, errors, stats = run(tuned, sessions, seconds)
+        label = "WAL + tuned pragmas" if tuned else "default journal    "
+        print(f"  {label}: {rate:,.0f} ops/s, {errors} errors, "
+              f"pool checked out at end: {stats.get('checkedout', '-')}")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [8, 5][len(args):]))
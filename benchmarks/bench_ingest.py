@@ -0,0 +1,71 @@
+# ==========================================================
+# CSV INGESTION BENCHMARK
+# python -m benchmarks.bench_ingest [rows]
+# ==========================================================
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.demand import create_demand_tables
+from app.ingest import ingest_csv
+
+ORDERS_SQL = """
+CREATE TABLE orders(
+order_id TEXT,date TEXT,customer TEXT,city TEXT,channel TEXT,
+item TEXT,category TEXT,qty INT,unit_price FLOAT,priority TEXT)
+"""
+
+def write_orders_csv(path, rows, seed=3):
+
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2023-01-01", periods=365).strftime("%Y-%m-%d")
+
+    pd.DataFrame({
+        "Order ID": np.arange(rows).astype(str),
+        "Date": dates[rng.integers(0, 365, rows)],
+        "Customer": "Retail",
+        "City": "Chennai",
+        "Channel": "Retail",
+        "Item": np.char.add("SKU", rng.integers(0, 5000, rows).astype(str)),
+        "Category": "General",
+        "Qty": rng.integers(1, 50, rows),
+        "Unit Price": rng.uniform(5, 500, rows).round(2),
+        "Priority": "Normal"
+    }).to_csv(path, index=False)
+
+def fresh_engine(directory, name):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    with engine.begin() as conn:
+        conn.execute(text(ORDERS_SQL))
+        create_demand_tables(conn)
+    return engine
+
+def main(rows):
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "orders.csv")
+    write_orders_csv(path, rows)
+
+    engine = fresh_engine(directory, "legacy.db")
+    start = time.perf_counter()
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.lower().str.replace(" ", "_")
+    df.to_sql("orders", engine, if_exists="append", index=False)
+    legacy = time.perf_counter() - start
+
+    engine = fresh_engine(directory, "chunked.db")
+    report = ingest_csv(engine, "orders", path)
+
+    print(f"{rows} order rows")
+    print(f"  read_csv + to_sql : {legacy:.2f}s ({rows / legacy:,.0f} rows/s, no demand aggregates)")
+    print(f"  ingest_csv        : {report['seconds']:.2f}s "
+          f"({report['rows_per_sec']:,.0f} rows/s, {report['chunks']} chunks)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
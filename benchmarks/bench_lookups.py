@@ -0,0 +1,125 @@
+# ==========================================================
+# INDEXED LOOKUP BENCHMARK (BEFORE / AFTER MIGRATIONS)
+# python -m benchmarks.bench_lookups [rows]
+# ==========================================================
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.migrations import migrate
+
+LOOKUPS = 200
+
+# Point lookups served by the app.migrations indexes.
+
+def own_stock(engine, item):
+    with engine.connect() as conn:
+        qty = conn.execute(
+            text("SELECT SUM(on_hand) FROM inventory WHERE item = :item"),
+            {"item": item}
+        ).scalar()
+    return int(qty or 0)
+
+def supply_sources(engine, item):
+    return pd.read_sql(
+        text("SELECT * FROM supply_pool WHERE item = :item"),
+        engine,
+        params={"item": item}
+    )
+
+def supplier_contact(engine, supplier):
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT * FROM suppliers WHERE supplier = :supplier LIMIT 1"),
+            {"supplier": supplier}
+        ).mappings().first()
+    return dict(row) if row else None
+
+def build_database(engine, rows, seed=7):
+
+    rng = np.random.default_rng(seed)
+    items = np.char.add("SKU", rng.integers(0, rows // 10 or 1, rows).astype(str))
+
+    pd.DataFrame({
+        "item": np.char.add("SKU", np.arange(rows).astype(str)),
+        "warehouse": "WH" + pd.Series(rng.integers(0, 8, rows)).astype(str),
+        "category": "General",
+        "supplier": "SUP" + pd.Series(rng.integers(0, 500, rows)).astype(str),
+        "on_hand": rng.integers(0, 1000, rows),
+        "wip": 0, "safety": 50, "reorder_point": 50, "unit_cost": 1.0
+    }).to_sql("inventory", engine, index=False)
+
+    pd.DataFrame({
+        "source": "SRC" + pd.Series(rng.integers(0, 100, rows)).astype(str),
+        "item": items,
+        "available_qty": rng.integers(0, 500, rows),
+        "contact": "", "whatsapp": "", "email": ""
+    }).to_sql("supply_pool", engine, index=False)
+
+    pd.DataFrame({
+        "supplier": np.char.add("SUP", np.arange(rows).astype(str)),
+        "item": items, "lead_time": 5, "moq": 100, "reliability": 0.9,
+        "cost_per_unit": 1.0, "phone": "", "whatsapp": "+91", "email": ""
+    }).to_sql("suppliers", engine, index=False)
+
+    pd.DataFrame({
+        "order_id": "O", "date": "2024-01-01", "item": items, "qty": 1
+    }).to_sql("orders", engine, index=False)
+
+def time_lookups(engine, rows):
+
+    rng = np.random.default_rng(1)
+    keys = rng.integers(0, rows, LOOKUPS)
+    timings = {}
+
+    start = time.perf_counter()
+    for k in keys:
+        own_stock(engine, f"SKU{k}")
+    timings["own_stock"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for k in keys:
+        supply_sources(engine, f"SKU{k // 10}")
+    timings["supply_sources"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for k in keys:
+        supplier_contact(engine, f"SUP{k}")
+    timings["supplier_contact"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for k in keys:
+            conn.execute(
+                text("UPDATE inventory SET on_hand = on_hand + 0 "
+                     "WHERE item=:item AND warehouse=:warehouse"),
+                {"item": f"SKU{k}", "warehouse": "WH0"}
+            )
+    timings["transfer_update"] = time.perf_counter() - start
+
+    return timings
+
+def main(rows):
+
+    path = os.path.join(tempfile.mkdtemp(), "lookups.db")
+    engine = create_engine(f"sqlite:///{path}")
+    build_database(engine, rows)
+
+    before = time_lookups(engine, rows)
+    migrate(engine)
+    after = time_lookups(engine, rows)
+
+    print(f"{rows} rows, {LOOKUPS} lookups each")
+    print(f"{'lookup':>18} {'before_ms':>11} {'after_ms':>10} {'speedup':>9}")
+    for name in before:
+        b, a = before[name] * 1000, after[name] * 1000
+        print(f"{name:>18} {b:>11.1f} {a:>10.1f} {b / a:>8.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,50 @@
+# ==========================================================
+# STOCKOUT RISK SIMULATION BENCHMARK
+# python -m benchmarks.bench_risk [skus] [trials] [workers]
+# ==========================================================
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.risk import simulate, simulate_dense
+
+def make_inputs(skus, seed=13):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "item": np.char.add("SKU", np.arange(skus).astype(str)),
+        "stock": rng.integers(0, 600, skus).astype("float64"),
+        "daily_mean": rng.uniform(0, 30, skus),
+        "daily_std": rng.uniform(0, 15, skus),
+        "lead_time": rng.integers(1, 30, skus).astype("float64"),
+        "reliability": rng.choice([0.7, 0.8, 0.9, 0.95, 1.0], skus)
+    })
+
+def main(skus, trials, workers):
+
+    frame = make_inputs(skus)
+
+    # Same answer as evaluating every trial for every SKU.
+    check = frame.head(200)
+    dense = simulate_dense(check, trials)
+    fast = simulate(check, trials)
+    assert np.allclose(dense["stockout_prob"], fast["stockout_prob"])
+    assert np.allclose(dense["expected_shortage"], fast["expected_shortage"])
+
+    start = time.perf_counter()
+    simulate(frame, trials)
+    single = time.perf_counter() - start
+
+    print(f"{skus} SKUs x {trials} trials")
+    print(f"  1 process  : {single:.3f}s")
+
+    if workers > 1:
+        start = time.perf_counter()
+        simulate(frame, trials, workers=workers)
+        print(f"  {workers} processes: {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*(args + [10_000, 20_000, 1][len(args):]))
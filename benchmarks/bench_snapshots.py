@@ -0,0 +1,89 @@
+# ==========================================================
+# SNAPSHOT LOAD BENCHMARK
+# python -m benchmarks.bench_snapshots [orders]
+# ==========================================================
+# Loads `orders` three ways, each in a fresh interpreter so peak RSS
+# is comparable: read_sql, a first snapshot build, and a warm
+# memory-mapped snapshot load. Then appends 1% more orders and times
+# the incremental sync.
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.demand import create_demand_tables
+from app.migrations import migrate
+from app.schema import create_tables
+from benchmarks.synthetic import CHUNK_ROWS, Scale, order_chunks
+
+def build_database(path, orders):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        create_tables(conn)
+        create_demand_tables(conn)
+    for chunk in order_chunks(Scale(orders)):
+        chunk.to_sql("orders", engine, if_exists="append", index=False)
+    # The change counters let a new process trust the snapshot.
+    migrate(engine)
+    return engine
+
+def child(mode, path, directory):
+    # Runs in the measuring subprocess; prints seconds and peak RSS.
+    os.environ["SUPPLYSENSE_SNAPSHOT_DIR"] = directory
+    from app.database import make_engine
+    from app.snapshots import SnapshotStore
+
+    engine = make_engine(f"sqlite:///{path}")
+    start = time.perf_counter()
+    if mode == "read_sql":
+        df = pd.read_sql("SELECT * FROM orders", engine)
+    else:
+        df = SnapshotStore(engine, directory, ["orders"]).load("orders")
+    seconds = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{seconds:.4f} {peak_mb:.1f} {len(df)}")
+
+def measure(mode, path, directory):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_snapshots", "--child", mode, path, directory],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), float(out[1]), int(out[2])
+
+def main(orders):
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "orders.db")
+    snapshots = os.path.join(workdir, "snapshots")
+    engine = build_database(path, orders)
+
+    print(f"{orders:,} order rows")
+    for label, mode in [
+        ("read_sql", "read_sql"),
+        ("snapshot build (first load)", "snapshot"),
+        ("snapshot load (memory-mapped)", "snapshot")
+    ]:
+        seconds, peak, rows = measure(mode, path, snapshots)
+        print(f"  {label:<32}: {seconds:7.3f}s  peak RSS {peak:8.1f} MB  ({rows:,} rows)")
+
+    extra = max(1, orders // 100)
+    chunk = next(order_chunks(Scale(extra), seed=99, chunk_rows=min(extra, CHUNK_ROWS)))
+    chunk.to_sql("orders", engine, if_exists="append", index=False)
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM orders")).scalar()
+
+    seconds, peak, rows = measure("snapshot", path, snapshots)
+    print(f"  {'snapshot load after +1% rows':<32}: {seconds:7.3f}s  peak RSS {peak:8.1f} MB  "
+          f"({rows:,} of {total:,} rows)")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
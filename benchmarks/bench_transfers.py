@@ -0,0 +1,65 @@
+# ==========================================================
+# WAREHOUSE TRANSFER THROUGHPUT BENCHMARK
+# python -m benchmarks.bench_transfers [moves]
+# ==========================================================
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.migrations import migrate
+from app.transfers import apply_transfers
+
+ITEMS = 20_000
+WAREHOUSES = 8
+
+def build_database(engine, seed=21):
+
+    rng = np.random.default_rng(seed)
+    items = np.repeat(np.char.add("SKU", np.arange(ITEMS).astype(str)), WAREHOUSES)
+    warehouses = np.tile(np.char.add("WH", np.arange(WAREHOUSES).astype(str)), ITEMS)
+
+    pd.DataFrame({
+        "item": items, "warehouse": warehouses, "category": "General",
+        "supplier": "SUP1", "on_hand": rng.integers(0, 500, len(items)),
+        "wip": 0, "safety": 50, "reorder_point": 50, "unit_cost": 1.0
+    }).to_sql("inventory", engine, index=False)
+
+    with engine.begin() as conn:
+        for sql in [
+            "CREATE TABLE tasks(task TEXT,assignee TEXT,status TEXT)",
+            "CREATE TABLE orders(item TEXT,date TEXT)",
+            "CREATE TABLE suppliers(supplier TEXT)",
+            "CREATE TABLE supply_pool(item TEXT)",
+            "CREATE TABLE action_log(action TEXT,item TEXT,decision TEXT,timestamp TEXT)"
+        ]:
+            conn.execute(text(sql))
+
+    migrate(engine)
+
+def main(count):
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'transfers.db')}")
+    build_database(engine)
+
+    rng = np.random.default_rng(8)
+    src = rng.integers(0, WAREHOUSES, count)
+    moves = pd.DataFrame({
+        "item": np.char.add("SKU", rng.integers(0, ITEMS, count).astype(str)),
+        "qty": rng.integers(1, 100, count),
+        "from_wh": np.char.add("WH", src.astype(str)),
+        "to_wh": np.char.add("WH", ((src + rng.integers(1, WAREHOUSES, count)) % WAREHOUSES).astype(str))
+    })
+
+    report = apply_transfers(engine, moves)
+
+    print(f"{count} moves: {len(report['accepted'])} applied, "
+          f"{len(report['rejected'])} rejected in {report['seconds']}s "
+          f"({report['moves_per_sec']:,.0f} moves/s)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,325 @@
+# ==========================================================
+# END-TO-END BENCHMARK SUITE
+# python -m benchmarks.suite [--orders 1000,100000] [--out results.json]
+#                            [--postgres URL] [--compare baseline.json]
+# ==========================================================
+# Loads a synthetic dataset (benchmarks/synthetic.py) into SQLite,
+# and into PostgreSQL when a URL is given or SUPPLYSENSE_BENCH_POSTGRES
+# is set, then times the work a Control Tower rerun does: table
+# loads, the SKU forecast, balance and network rebalancing, a
+# 90-day capacity plan, the trend forecast, KPIs, the fulfilment
+# simulator and CSV upload. Results are written as JSON; --compare
+# prints the change against an earlier file and exits non-zero when
+# a case got slower than the threshold.
+#
+# PostgreSQL runs inside a `supplysense_bench` schema that is
+# dropped and recreated, so nothing in `public` is touched.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.allocation import SupplyIndex
+from app.balancing import balancing_engine
+from app.cache import TableCache
+from app.capacity import CAPACITY_HORIZON_DAYS, capacity_plan, warehouse_load
+from app.database import make_engine
+from app.demand import create_demand_tables
+from app.forecasting import forecast_skus
+from app.ingest import ingest_csv
+from app.migrations import migrate
+from app.planning import (
+    capacity_utilization, forecast_window, frame_totals, kpis, planning_demand,
+    trend_forecast
+)
+from app.queries import daily_demand, demand_mix, inventory_rollup, kpi_totals
+from app.rebalancing import demand_shares, plan_rebalancing, warehouse_demand
+from app.risk import stockout_risk
+from app.schema import create_tables
+from benchmarks.synthetic import Scale, reference_tables, write_orders_csv
+
+PG_SCHEMA = "supplysense_bench"
+REGRESSION_THRESHOLD = 1.2
+# Differences below this are timer noise, whatever the ratio.
+NOISE_SECONDS = 0.005
+FULFILMENT_REQUESTS = 1000
+CAPACITY_BENCH_DAYS = 90
+
+# ==========================================================
+# BACKENDS
+# ==========================================================
+
+def sqlite_engine(directory, orders):
+    return make_engine(f"sqlite:///{os.path.join(directory, f'bench_{orders}.db')}")
+
+def postgres_engine(url):
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={PG_SCHEMA}"})
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {PG_SCHEMA}"))
+    return engine
+
+def postgres_available(url):
+    if not url:
+        return False
+    try:
+        with create_engine(url).connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"PostgreSQL skipped: {e.__class__.__name__}: {e}")
+        return False
+
+# ==========================================================
+# CASES
+# ==========================================================
+
+def timed(func, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+def load_dataset(engine, scale, seed, directory):
+    # Reference tables go in with to_sql; orders through the same
+    # ingest path as the Upload page, which is what gets timed.
+    with engine.begin() as conn:
+        create_tables(conn)
+        create_demand_tables(conn)
+    migrate(engine)
+
+    for name, frame in reference_tables(scale, seed).items():
+        frame.to_sql(name, engine, if_exists="append", index=False, chunksize=50_000)
+
+    path = write_orders_csv(os.path.join(directory, f"orders_{scale.orders}.csv"), scale, seed)
+    start = time.perf_counter()
+    report = ingest_csv(engine, "orders", path)
+    return time.perf_counter() - start, report["rows"]
+
+def run_cases(engine, scale, seed, directory, repeat):
+
+    results = {}
+
+    upload, rows = load_dataset(engine, scale, seed, directory)
+    results["csv_upload"] = ([upload], rows)
+
+    cache = TableCache()
+    loader = lambda name: pd.read_sql(f"SELECT * FROM {name}", engine)
+
+    for name in ("orders", "inventory", "suppliers", "supply_pool", "demand_by_item_date"):
+        def cold(name=name):
+            cache.clear()
+            return cache.get(name, loader)
+        seconds, frame = timed(cold, repeat)
+        results[f"get_table.cold.{name}"] = (seconds, len(frame))
+
+    tables = {
+        name: cache.get(name, loader) for name in (
+            "orders", "inventory", "suppliers", "capacity", "supply_pool",
+            "demand_by_item", "demand_by_date", "demand_by_item_date"
+        )
+    }
+    seconds, _ = timed(lambda: cache.get("orders", loader), repeat)
+    results["get_table.warm.orders"] = (seconds, len(tables["orders"]))
+
+    item_date = tables["demand_by_item_date"]
+
+    def sku_forecast():
+        if forecast_window(item_date) is None:
+            return pd.DataFrame()
+        return forecast_skus(item_date)
+
+    seconds, sku_daily = timed(sku_forecast, repeat)
+    results["sku_forecast"] = (seconds, sku_daily.shape[1])
+
+    sku_demand = planning_demand(sku_daily, tables["demand_by_item"])
+    mix = demand_mix(engine)
+    regions = pd.DataFrame(columns=["city", "channel", "warehouse", "share"])
+    shares = demand_shares(tables["inventory"], mix, regions)
+
+    seconds, (_, actions) = timed(
+        lambda: balancing_engine(tables["inventory"], warehouse_demand(sku_demand, shares)),
+        repeat
+    )
+    results["balancing_engine"] = (seconds, len(actions))
+
+    seconds, (_, moves, _) = timed(
+        lambda: plan_rebalancing(tables["inventory"], sku_demand, mix, regions), repeat
+    )
+    results["network_rebalancing"] = (seconds, len(moves))
+
+    if forecast_window(item_date) is not None:
+        capacity_daily = forecast_skus(item_date, horizon=CAPACITY_BENCH_DAYS)
+        seconds, (util_matrix, _, _) = timed(
+            lambda: capacity_plan(warehouse_load(capacity_daily, shares), tables["capacity"]),
+            repeat
+        )
+        results["capacity_plan"] = (seconds, util_matrix.size)
+
+    try:
+        seconds, forecast = timed(lambda: trend_forecast(tables["demand_by_date"]), repeat)
+        results["advanced_forecast"] = (seconds, len(forecast))
+    except ImportError as e:
+        results["advanced_forecast"] = (None, f"skipped: {e}")
+
+    util_daily = forecast_skus(item_date, horizon=CAPACITY_HORIZON_DAYS) \
+        if forecast_window(item_date) is not None else pd.DataFrame()
+
+    def calc_kpis():
+        risk = stockout_risk(tables["inventory"], item_date, tables["suppliers"])
+        return kpis(
+            kpi_totals(engine), risk,
+            capacity_utilization(util_daily, shares, tables["capacity"])
+        )
+
+    seconds, _ = timed(calc_kpis, repeat)
+    results["calc_kpis"] = (seconds, len(tables["inventory"]))
+
+    # Aggregates pushed down to SQL, against loading the frames cold.
+    def frame_kpis():
+        cache.clear()
+        return frame_totals(cache.get("orders", loader), cache.get("inventory", loader))
+
+    seconds, _ = timed(frame_kpis, repeat)
+    results["kpi_totals.frames"] = (seconds, len(tables["orders"]))
+    seconds, _ = timed(lambda: kpi_totals(engine), repeat)
+    results["kpi_totals.sql"] = (seconds, len(tables["orders"]))
+    seconds, rollup = timed(lambda: inventory_rollup(engine), repeat)
+    results["inventory_rollup.sql"] = (seconds, len(rollup))
+    seconds, daily = timed(lambda: daily_demand(engine, by="category"), repeat)
+    results["daily_demand.sql"] = (seconds, len(daily))
+
+    rng = np.random.default_rng(seed)
+    requests = pd.DataFrame({
+        "item": tables["inventory"]["item"].sample(
+            FULFILMENT_REQUESTS, replace=True, random_state=seed
+        ).to_numpy(),
+        "qty": rng.integers(1, 500, FULFILMENT_REQUESTS)
+    })
+
+    def fulfilment():
+        index = SupplyIndex(tables["inventory"], tables["supply_pool"], tables["suppliers"])
+        return index.allocate(requests)
+
+    seconds, _ = timed(fulfilment, repeat)
+    results["fulfilment_simulator"] = (seconds, FULFILMENT_REQUESTS)
+
+    return results
+
+# ==========================================================
+# REPORTING
+# ==========================================================
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def result_rows(backend, scale, results):
+    for case, (seconds, rows) in results.items():
+        row = {"backend": backend, "orders": scale.orders, "case": case, "rows": rows}
+        if seconds is not None:
+            row.update({
+                "seconds": [round(s, 6) for s in seconds],
+                "min": round(min(seconds), 6),
+                "median": round(statistics.median(seconds), 6)
+            })
+        yield row
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    # Matches cases on (backend, orders, case) and compares the best
+    # of each run, which is the least noisy number.
+    before = {(r["backend"], r["orders"], r["case"]): r for r in baseline["results"]}
+    regressions = 0
+    for row in results:
+        old = before.get((row["backend"], row["orders"], row["case"]))
+        if old is None or "min" not in row or "min" not in old or not old["min"]:
+            continue
+        ratio = row["min"] / old["min"]
+        slower = ratio > threshold and row["min"] - old["min"] > NOISE_SECONDS
+        flag = "  REGRESSION" if slower else ""
+        regressions += bool(flag)
+        print(f"{row['backend']:<10} {row['orders']:>10,} {row['case']:<34} "
+              f"{old['min']:.4f}s -> {row['min']:.4f}s ({ratio:.2f}x){flag}")
+    return regressions
+
+def main(argv):
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--orders", default="1000,100000",
+                        help="comma-separated order counts, 1000 to 10000000")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--postgres", default=os.getenv("SUPPLYSENSE_BENCH_POSTGRES"))
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    scales = [Scale(int(n)) for n in args.orders.split(",")]
+    backends = ["sqlite"] + (["postgresql"] if postgres_available(args.postgres) else [])
+
+    directory = tempfile.mkdtemp(prefix="supplysense_bench_")
+    rows = []
+
+    for backend in backends:
+        for scale in scales:
+            engine = (
+                sqlite_engine(directory, scale.orders) if backend == "sqlite"
+                else postgres_engine(args.postgres)
+            )
+            print(f"{backend}: {scale.orders:,} orders, {scale.items:,} items")
+            results = run_cases(engine, scale, args.seed, directory, args.repeat)
+            engine.dispose()
+            for row in result_rows(backend, scale, results):
+                rows.append(row)
+                took = f"{row['min']:.4f}s" if "min" in row else row["rows"]
+                print(f"  {row['case']:<34} {took}")
+
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "scales": [s.as_dict() for s in scales]
+        },
+        "results": rows
+    }
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(rows, json.load(f), args.threshold)
+        if regressions:
+            print(f"{regressions} case(s) slower than {args.threshold}x")
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
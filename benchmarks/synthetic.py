@@ -0,0 +1,173 @@
+# ==========================================================
+# DETERMINISTIC SYNTHETIC DATASET
+# python -m benchmarks.synthetic [orders] [directory] [seed]
+# ==========================================================
+# Builds orders, inventory, suppliers, capacity and supply_pool at a
+# chosen scale (1k to 10M orders). Everything is derived from the
+# seed. Orders come in fixed-size chunks that each get their own
+# seeded generator, so a 10M-row history can be streamed to disk or
+# the database without being held at once, and any chunk can be
+# regenerated on its own.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 250_000
+HISTORY_DAYS = 365
+END_DATE = "2024-12-31"
+
+CITIES = ["Chennai", "Coimbatore", "Madurai", "Salem", "Tiruchirappalli", "Vellore"]
+CHANNELS = ["Retail", "Online", "Wholesale"]
+CATEGORIES = ["Grocery", "Dairy", "Frozen", "Grains", "Beverages", "Household"]
+PRIORITIES = ["Normal", "Normal", "Normal", "High", "Urgent"]
+
+class Scale:
+
+    def __init__(self, orders):
+        self.orders = int(orders)
+        self.items = int(np.clip(self.orders // 20, 100, 200_000))
+        self.warehouses = int(np.clip(self.orders // 250_000, 4, 40))
+        self.suppliers = max(10, self.items // 50)
+        self.machines = 3
+        self.pool_sources = max(5, self.items // 500)
+
+    def as_dict(self):
+        return dict(vars(self))
+
+def rng_for(seed, *stream):
+    return np.random.default_rng([seed, *stream])
+
+def labels(prefix, n):
+    return np.char.add(prefix, np.arange(n).astype(str)).astype(object)
+
+def item_catalogue(scale, seed):
+    # Popularity is Zipf-like so a few SKUs dominate demand, as in
+    # real order books.
+    rng = rng_for(seed, 0)
+    weights = 1 / np.arange(1, scale.items + 1) ** 0.8
+    return pd.DataFrame({
+        "item": labels("SKU", scale.items),
+        "category": np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), scale.items)],
+        "supplier": labels("SUP", scale.suppliers)[rng.integers(0, scale.suppliers, scale.items)],
+        "unit_price": rng.uniform(5, 500, scale.items).round(2),
+        "weight": weights / weights.sum()
+    })
+
+def order_chunks(scale, seed=7, chunk_rows=CHUNK_ROWS):
+    catalogue = item_catalogue(scale, seed)
+    dates = pd.date_range(end=END_DATE, periods=HISTORY_DAYS).strftime("%Y-%m-%d").to_numpy(dtype=object)
+    cum = np.cumsum(catalogue["weight"].to_numpy())
+
+    for chunk, start in enumerate(range(0, scale.orders, chunk_rows)):
+        n = min(chunk_rows, scale.orders - start)
+        rng = rng_for(seed, 1, chunk)
+        idx = np.minimum(np.searchsorted(cum, rng.random(n)), scale.items - 1)
+        yield pd.DataFrame({
+            "order_id": np.char.add("ORD", np.arange(start, start + n).astype(str)).astype(object),
+            "date": dates[rng.integers(0, HISTORY_DAYS, n)],
+            "customer": labels("CUST", 5000)[rng.integers(0, 5000, n)],
+            "city": np.array(CITIES, dtype=object)[rng.integers(0, len(CITIES), n)],
+            "channel": np.array(CHANNELS, dtype=object)[rng.integers(0, len(CHANNELS), n)],
+            "item": catalogue["item"].to_numpy()[idx],
+            "category": catalogue["category"].to_numpy()[idx],
+            "qty": rng.integers(1, 50, n),
+            "unit_price": catalogue["unit_price"].to_numpy()[idx],
+            "priority": np.array(PRIORITIES, dtype=object)[rng.integers(0, len(PRIORITIES), n)]
+        })
+
+def inventory_frame(scale, seed=7):
+    # Each SKU is stocked in up to three warehouses; (item, warehouse)
+    # stays unique, matching the inventory key migration.
+    catalogue = item_catalogue(scale, seed)
+    rng = rng_for(seed, 2)
+    warehouses = labels("WH", scale.warehouses)
+    per_item = rng.integers(1, min(3, scale.warehouses) + 1, scale.items)
+    item_idx = np.repeat(np.arange(scale.items), per_item)
+    offset = np.arange(len(item_idx)) - np.repeat(np.cumsum(per_item) - per_item, per_item)
+    wh_idx = (rng.integers(0, scale.warehouses, scale.items)[item_idx] + offset) % scale.warehouses
+    # Expected daily demand scales stock so actions span every class.
+    daily = (catalogue["weight"].to_numpy() * scale.orders * 25 / HISTORY_DAYS)[item_idx]
+    n = len(item_idx)
+    return pd.DataFrame({
+        "item": catalogue["item"].to_numpy()[item_idx],
+        "warehouse": warehouses[wh_idx],
+        "category": catalogue["category"].to_numpy()[item_idx],
+        "supplier": catalogue["supplier"].to_numpy()[item_idx],
+        "on_hand": (daily * rng.uniform(0, 60, n)).astype("int64"),
+        "wip": (daily * rng.uniform(0, 3, n)).astype("int64"),
+        "safety": np.maximum(10, (daily * 3).astype("int64")),
+        "reorder_point": np.maximum(20, (daily * 5).astype("int64")),
+        "unit_cost": (catalogue["unit_price"].to_numpy()[item_idx] * 0.6).round(2)
+    })
+
+def suppliers_frame(scale, seed=7):
+    rng = rng_for(seed, 3)
+    n = scale.suppliers
+    phone = np.char.add("+9190000", np.arange(n).astype(str)).astype(object)
+    return pd.DataFrame({
+        "supplier": labels("SUP", n),
+        "item": labels("SKU", scale.items)[rng.integers(0, scale.items, n)],
+        "lead_time": rng.integers(2, 21, n),
+        "moq": rng.integers(1, 11, n) * 50,
+        "reliability": rng.uniform(0.6, 1.0, n).round(3),
+        "cost_per_unit": rng.uniform(3, 300, n).round(2),
+        "phone": phone,
+        "whatsapp": phone,
+        "email": np.char.add(labels("sup", n).astype(str), "@example.com").astype(object)
+    })
+
+def capacity_frame(scale, seed=7):
+    rng = rng_for(seed, 4)
+    n = scale.warehouses * scale.machines
+    return pd.DataFrame({
+        "warehouse": np.repeat(labels("WH", scale.warehouses), scale.machines),
+        "machine": np.tile(labels("M", scale.machines), scale.warehouses),
+        "daily_capacity": rng.integers(200, 2000, n),
+        "shift_hours": rng.choice([8, 16, 24], n),
+        "utilization": rng.uniform(0.5, 0.95, n).round(2)
+    })
+
+def supply_pool_frame(scale, seed=7):
+    rng = rng_for(seed, 5)
+    n = scale.items * 2
+    source = rng.integers(0, scale.pool_sources, n)
+    contact = np.char.add("+9180000", source.astype(str)).astype(object)
+    return pd.DataFrame({
+        "source": labels("POOL", scale.pool_sources)[source],
+        "item": labels("SKU", scale.items)[rng.integers(0, scale.items, n)],
+        "available_qty": rng.integers(0, 500, n),
+        "contact": contact,
+        "whatsapp": contact,
+        "email": np.char.add(labels("pool", scale.pool_sources).astype(str), "@example.com").astype(object)[source]
+    })
+
+def reference_tables(scale, seed=7):
+    return {
+        "inventory": inventory_frame(scale, seed),
+        "suppliers": suppliers_frame(scale, seed),
+        "capacity": capacity_frame(scale, seed),
+        "supply_pool": supply_pool_frame(scale, seed)
+    }
+
+def write_orders_csv(path, scale, seed=7):
+    for i, chunk in enumerate(order_chunks(scale, seed)):
+        chunk.to_csv(path, index=False, header=i == 0, mode="w" if i == 0 else "a")
+    return path
+
+def write_dataset(directory, scale, seed=7):
+    os.makedirs(directory, exist_ok=True)
+    paths = {"orders": write_orders_csv(os.path.join(directory, "orders.csv"), scale, seed)}
+    for name, frame in reference_tables(scale, seed).items():
+        paths[name] = os.path.join(directory, f"{name}.csv")
+        frame.to_csv(paths[name], index=False)
+    return paths
+
+if __name__ == "__main__":
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    directory = sys.argv[2] if len(sys.argv) > 2 else "synthetic"
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 7
+    for name, path in write_dataset(directory, Scale(orders), seed).items():
+        print(f"{name:<12} {path}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import the `app` package from the checkout wherever pytest is run.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import datetime
+
+import pandas as pd
+
+from app.action_queue import pending_actions
+from app.balancing import EXPEDITE
+
+def actions():
+    return pd.DataFrame({
+        "action": [EXPEDITE, EXPEDITE],
+        "item": ["A", "B"],
+        "warehouse": ["W1", "W1"],
+        "projected_stock": [0, 0],
+        "safety": [50, 50]
+    })
+
+def decided(age_days):
+    stamp = datetime.datetime.now() - datetime.timedelta(days=age_days)
+    return pd.DataFrame({
+        "item": ["A"], "action": [EXPEDITE], "warehouse": ["W1"],
+        "decided_at": [str(stamp)]
+    })
+
+def test_recent_decision_hides_action():
+    queue = pending_actions(actions(), decided(1), days=7)
+    assert list(queue["item"]) == ["B"]
+
+def test_old_decision_lapses():
+    queue = pending_actions(actions(), decided(30), days=7)
+    assert sorted(queue["item"]) == ["A", "B"]
@@ -0,0 +1,91 @@
+import time
+
+from app.alerts import AlertDispatcher, FakeTransport
+
+class TimedTransport(FakeTransport):
+
+    def __init__(self, failures=0):
+        super().__init__(failures)
+        self.times = []
+
+    def send(self, to, body):
+        self.times.append(time.monotonic())
+        super().send(to, body)
+
+def dispatcher(transport, **kwargs):
+    options = dict(batch_seconds=0.05, max_per_second=0, backoff_seconds=0.001)
+    options.update(kwargs)
+    return AlertDispatcher(transport, **options)
+
+def test_repeat_alert_is_deduped():
+    transport = FakeTransport()
+    alerts = dispatcher(transport)
+
+    assert alerts.submit("S1", "+1", "restock A")
+    assert not alerts.submit("S1", "+1", "restock A")
+    alerts.flush(timeout=5)
+
+    assert transport.sent == [("+1", "restock A")]
+    assert alerts.stats["deduped"] == 1
+
+def test_expired_dedup_entries_are_pruned():
+    alerts = dispatcher(FakeTransport(), dedup_seconds=0.01)
+
+    for i in range(3):
+        alerts.submit("S1", "+1", f"restock {i}")
+    time.sleep(0.02)
+    alerts.submit("S2", "+2", "restock B")
+    alerts.flush(timeout=5)
+
+    assert list(alerts._seen) == [("S2", "restock B")]
+
+def test_missing_number_is_skipped():
+    alerts = dispatcher(FakeTransport())
+
+    assert not alerts.submit("S1", float("nan"), "restock A")
+    assert not alerts.submit("S1", None, "restock A")
+    assert not alerts.submit("S1", "  ", "restock A")
+    assert alerts.stats["queued"] == 0
+
+def test_alerts_within_window_are_batched_per_supplier():
+    transport = FakeTransport()
+    alerts = dispatcher(transport, batch_seconds=0.2)
+
+    alerts.submit("S1", "+1", "restock A")
+    alerts.submit("S1", "+1", "restock B")
+    alerts.submit("S2", "+2", "restock C")
+    alerts.flush(timeout=5)
+
+    assert sorted(transport.sent) == [("+1", "restock A\nrestock B"), ("+2", "restock C")]
+
+def test_sends_are_rate_limited():
+    transport = TimedTransport()
+    alerts = dispatcher(transport, max_per_second=20)
+
+    for i in range(3):
+        alerts.submit(f"S{i}", f"+{i}", "restock A")
+    alerts.flush(timeout=5)
+
+    gaps = [b - a for a, b in zip(transport.times, transport.times[1:])]
+    assert len(gaps) == 2 and min(gaps) >= 0.05 * 0.9
+
+def test_failed_send_is_retried_with_backoff():
+    transport = TimedTransport(failures=2)
+    alerts = dispatcher(transport, backoff_seconds=0.02)
+
+    alerts.submit("S1", "+1", "restock A")
+    alerts.flush(timeout=5)
+
+    assert transport.sent == [("+1", "restock A")]
+    assert alerts.stats["retries"] == 2
+    gaps = [b - a for a, b in zip(transport.times, transport.times[1:])]
+    assert gaps[0] >= 0.02 and gaps[1] >= 0.04
+
+def test_undeliverable_alert_can_be_queued_again():
+    alerts = dispatcher(FakeTransport(failures=10), max_attempts=2)
+
+    alerts.submit("S1", "+1", "restock A")
+    alerts.flush(timeout=5)
+
+    assert alerts.stats["failed"] == 1
+    assert alerts.submit("S1", "+1", "restock A")
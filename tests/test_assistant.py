@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from app.assistant import AnswerCache, Assistant, StubModel
+
+SUMMARY = "Warehouses:\n- Chennai WH: 120 | 3 | 0\n- Grocery WH: 40 | 0 | 2"
+
+def answer(assistant, question, summary=SUMMARY):
+    return "".join(assistant.ask(question, summary))
+
+def test_repeat_question_is_served_from_cache():
+    model = StubModel()
+    assistant = Assistant(model)
+
+    first = answer(assistant, "What about Chennai?")
+    second = answer(assistant, "  what about   chennai ")
+
+    assert first == second == "- Chennai WH: 120 | 3 | 0"
+    assert model.calls == 1
+    assert assistant.cache.stats()["hits"] == 1
+
+def test_new_snapshot_gets_a_fresh_answer():
+    model = StubModel()
+    assistant = Assistant(model)
+
+    answer(assistant, "What about Chennai?")
+    updated = answer(assistant, "What about Chennai?", SUMMARY.replace("120", "80"))
+
+    assert updated == "- Chennai WH: 80 | 3 | 0"
+    assert model.calls == 2
+
+def test_answer_expires_after_ttl():
+    model = StubModel()
+    assistant = Assistant(model, AnswerCache(ttl=0.05))
+
+    answer(assistant, "What about Chennai?")
+    time.sleep(0.06)
+    answer(assistant, "What about Chennai?")
+
+    assert model.calls == 2
+
+class FailingModel(StubModel):
+
+    def stream(self, system, prompt):
+        yield from super().stream(system, prompt)
+        if self.calls == 1:
+            raise ConnectionError("stream dropped")
+
+def test_failed_stream_is_not_cached():
+    model = FailingModel()
+    assistant = Assistant(model)
+
+    with pytest.raises(ConnectionError):
+        answer(assistant, "What about Chennai?")
+    assert assistant.cache.stats()["entries"] == 0
+
+    assert answer(assistant, "What about Chennai?") == "- Chennai WH: 120 | 3 | 0"
+    assert model.calls == 2
+
+def test_abandoned_stream_is_not_cached():
+    model = StubModel()
+    assistant = Assistant(model)
+
+    stream = assistant.ask("What about Chennai?", SUMMARY)
+    next(stream)
+    stream.close()
+
+    assert assistant.cache.stats()["entries"] == 0
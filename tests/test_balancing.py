@@ -0,0 +1,39 @@
+import pandas as pd
+
+from app.balancing import EXPEDITE, balancing_engine
+from app.rebalancing import demand_shares, plan_rebalancing, warehouse_demand
+
+NO_REGIONS = pd.DataFrame(columns=["city", "channel", "warehouse", "share"])
+NO_MIX = pd.DataFrame(columns=["item", "city", "channel", "qty"])
+
+def inventory():
+    return pd.DataFrame({
+        "item": ["A", "A", "A", "A", "B"],
+        "warehouse": ["W1", "W2", "W3", "W4", "W1"],
+        "on_hand": [100, 100, 100, 0, 5],
+        "wip": [0, 0, 0, 0, 0],
+        "safety": [10, 10, 10, 10, 10]
+    })
+
+def test_each_site_is_charged_its_share():
+    inv = inventory()
+    demand = pd.DataFrame({"item": ["A", "B"], "qty": [200.0, 1.0]})
+    shares = demand_shares(inv, NO_MIX, NO_REGIONS)
+
+    df, actions = balancing_engine(inv, warehouse_demand(demand, shares))
+
+    # Charged once across the network, not once per site.
+    assert df["forecast_demand"].sum() == 201
+    assert actions.loc[actions["action"] == EXPEDITE, "warehouse"].tolist() == ["W4"]
+
+def test_expedited_sites_are_never_donors():
+    inv = inventory()
+    demand = pd.DataFrame({"item": ["A", "B"], "qty": [200.0, 1.0]})
+    shares = demand_shares(inv, NO_MIX, NO_REGIONS)
+
+    _, actions = balancing_engine(inv, warehouse_demand(demand, shares))
+    _, moves, _ = plan_rebalancing(inv, demand, NO_MIX, NO_REGIONS)
+
+    expedite = actions[actions["action"] == EXPEDITE]
+    assert set(moves["to_wh"]) == set(expedite["warehouse"])
+    assert not set(moves["from_wh"]) & set(expedite["warehouse"])
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from app import event_bus
+from app.event_bus import EventBus, InMemoryBroker, get_state
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = EventBus(InMemoryBroker())
+    monkeypatch.setattr(event_bus, "_bus", bus)
+    monkeypatch.setattr(event_bus, "_state", None)
+    return bus
+
+STOCK = pd.DataFrame({"item": ["A", "A"], "warehouse": ["W1", "W2"], "on_hand": [10, 5]})
+
+def seed(consumer):
+    consumer.seed(inventory=STOCK)
+
+def live(version, max_age=300):
+    state = get_state(seed, version=version, max_age=max_age)
+    state.poll(event_bus.get_bus().backend)
+    return state
+
+def test_events_move_the_seeded_state(bus):
+    live(1)
+    bus.publish("stock", {"item": "A", "warehouse": "W1", "on_hand": 3})
+    bus.publish("transfer", {"item": "A", "qty": 2, "from_wh": "W1", "to_wh": "W2"})
+
+    assert live(1).warehouse_stock().to_dict() == {"W1": 11.0, "W2": 7.0}
+
+def test_events_before_a_reseed_are_not_applied_twice(bus):
+    live(1)
+    bus.publish("stock", {"item": "A", "warehouse": "W1", "on_hand": 3})
+
+    # A moved table version means the tables now hold that write.
+    assert live(2).warehouse_stock().to_dict() == {"W1": 10.0, "W2": 5.0}
+
+def test_state_is_reseeded_once_too_old(bus):
+    live(1)
+    bus.publish("stock", {"item": "A", "warehouse": "W9", "on_hand": 4})
+    assert "W9" in live(1).warehouse_stock()
+
+    event_bus._state.seeded_at -= 301
+    assert "W9" not in live(1).warehouse_stock()
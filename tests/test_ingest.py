@@ -0,0 +1,35 @@
+import io
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from app.ingest import ingest_csv
+from app.migrations import migrate
+from app.schema import create_tables
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    with engine.begin() as conn:
+        create_tables(conn)
+    migrate(engine)
+    return engine
+
+def upload(engine, csv):
+    return ingest_csv(engine, "inventory", io.StringIO(csv))
+
+def test_inventory_reupload_replaces_existing_pairs(tmp_path):
+    engine = make_engine(tmp_path)
+    upload(engine, "item,warehouse,on_hand,safety\nA,W1,10,5\nB,W1,3,5\n")
+
+    report = upload(engine, "item,warehouse,on_hand\nA,W1,40\nA,W2,7\nA,W2,8\n")
+
+    stock = pd.read_sql(
+        "SELECT item, warehouse, on_hand, safety FROM inventory ORDER BY item, warehouse", engine
+    )
+    # A column left out of the re-upload keeps its stored value.
+    assert stock[["item", "warehouse", "on_hand"]].values.tolist() == [
+        ["A", "W1", 40], ["A", "W2", 8], ["B", "W1", 3]
+    ]
+    assert stock["safety"].tolist()[::2] == [5, 5]
+    assert report["upserted"]
+    assert report["stock_levels"].values.tolist() == [["A", "W1", 40], ["A", "W2", 8]]
@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import migrate, migration_history
+from app.schema import create_tables
+
+def test_steps_wait_for_missing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE suppliers(supplier TEXT, item TEXT)"))
+        conn.execute(text("CREATE TABLE supply_pool(item TEXT)"))
+        conn.execute(text("CREATE TABLE orders(order_id TEXT, date TEXT, item TEXT, qty INT)"))
+        conn.execute(text("CREATE TABLE inventory(item TEXT, warehouse TEXT, on_hand INT)"))
+
+    applied = migrate(engine)
+    assert 5 not in applied and 6 not in applied
+
+    with engine.begin() as conn:
+        create_tables(conn)
+        conn.execute(text("ALTER TABLE orders ADD COLUMN category TEXT"))
+        conn.execute(text("ALTER TABLE orders ADD COLUMN city TEXT"))
+        conn.execute(text("ALTER TABLE orders ADD COLUMN channel TEXT"))
+
+    assert {5, 6, 7} <= set(migrate(engine))
+    assert set(migration_history(engine)["version"]) == {1, 2, 3, 4, 5, 6, 7}
+    indexes = {i["name"] for i in inspect(engine).get_indexes("orders")}
+    assert {"ix_orders_date_category", "ix_orders_item_city_channel"} <= indexes
+
+def test_inventory_key_retried_after_duplicates_clear(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    with engine.begin() as conn:
+        create_tables(conn)
+        conn.execute(text(
+            "INSERT INTO inventory(item, warehouse, on_hand) VALUES ('A', 'W1', 1), ('A', 'W1', 2)"
+        ))
+
+    assert 3 not in migrate(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM inventory WHERE on_hand = 2"))
+
+    assert migrate(engine) == [3]
+    unique = [i for i in inspect(engine).get_indexes("inventory") if i["unique"]]
+    assert [i["column_names"] for i in unique] == [["item", "warehouse"]]
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from app.allocation import SupplyIndex
+from app.balancing import balancing_engine
+from app.batch import run_plan, verify_plan
+from app.demand import aggregate_orders
+from app.forecasting import ForecastCache, forecast_skus
+from app.rebalancing import (
+    WAREHOUSE_COORDS, candidate_lanes, lane_costs, solve_greedy, solve_lp
+)
+from app.risk import simulate, simulate_dense
+from benchmarks import bench_allocation, bench_balancing, bench_risk
+from benchmarks.suite import load_dataset
+from benchmarks.synthetic import Scale
+
+# The fast paths against the slow ones they replaced, on the same
+# data the benchmarks time them on, only smaller.
+
+def test_balancing_matches_legacy_loop():
+    inventory, orders = bench_balancing.make_frames(2_000)
+
+    df, actions = balancing_engine(inventory, aggregate_orders(orders, "item"))
+
+    got = list(zip(actions["action"].astype(str), actions["item"]))
+    assert got == bench_balancing.legacy_actions(df)
+
+def test_allocation_matches_per_click_loop():
+    inventory, supply_pool, suppliers, items = bench_allocation.make_frames()
+    rng = np.random.default_rng(5)
+    basket = pd.DataFrame({
+        "item": items[rng.choice(len(items), 50, replace=False)],
+        "qty": rng.integers(1, 1500, 50)
+    })
+
+    _, result = SupplyIndex(inventory, supply_pool, suppliers, rank_by="pool").allocate(basket)
+
+    expected = [
+        bench_allocation.per_click(inventory, supply_pool, i, q)[1]
+        for i, q in basket.itertuples(index=False)
+    ]
+    assert result["shortage"].tolist() == expected
+
+def item_date(qty_a=3):
+    dates = pd.date_range("2024-01-01", periods=30).strftime("%Y-%m-%d")
+    rows = [
+        {"item": item, "date": d, "qty": qty + (i % 7) + (qty_a if item == "A" and i == 20 else 0)}
+        for item, qty in (("A", 5), ("B", 9), ("C", 2)) for i, d in enumerate(dates)
+    ]
+    return pd.DataFrame(rows)
+
+def by_item(frame):
+    return frame.groupby("item", as_index=False).agg(
+        qty=("qty", "sum"), order_count=("qty", "size")
+    )
+
+def test_partial_refit_matches_full_fit():
+    cache = ForecastCache()
+    cache.forecast(item_date(), by_item(item_date()))
+
+    changed = item_date(qty_a=40)
+    got = cache.forecast(changed, by_item(changed))
+
+    assert cache.last_refit_items == 1
+    want = forecast_skus(changed)
+    pd.testing.assert_frame_equal(got[want.columns], want, check_freq=False)
+
+def test_fast_risk_matches_dense_simulation():
+    frame = bench_risk.make_inputs(200)
+
+    dense = simulate_dense(frame, 2_000)
+    fast = simulate(frame, 2_000)
+
+    assert np.allclose(dense["stockout_prob"], fast["stockout_prob"])
+    assert np.allclose(dense["expected_shortage"], fast["expected_shortage"])
+
+@pytest.mark.parametrize("by", ["warehouse", "category"])
+def test_batch_plan_matches_ui_actions(tmp_path, by):
+    engine = create_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    load_dataset(engine, Scale(2_000), 7, str(tmp_path))
+    loader = lambda name: pd.read_sql(f"SELECT * FROM {name}", engine)
+
+    _, actions, _ = run_plan(loader, by)
+
+    assert not actions.empty
+    assert verify_plan(loader, actions)
+
+def test_lp_and_greedy_rebalancing_agree():
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(3)
+    warehouses = list(WAREHOUSE_COORDS) + ["Salem WH"]
+    position = pd.DataFrame({
+        "item": np.repeat([f"SKU{i}" for i in range(40)], len(warehouses)),
+        "warehouse": warehouses * 40,
+        "excess": rng.integers(0, 50, 200) * rng.integers(0, 2, 200)
+    })
+    position["need"] = np.where(position["excess"] > 0, 0, rng.integers(0, 50, 200))
+    lanes = candidate_lanes(position, lane_costs(warehouses))
+
+    lp, greedy = solve_lp(lanes), solve_greedy(lanes)
+
+    # Both move everything that can move; the LP never costs more.
+    assert lp.sum() == greedy.sum()
+    cost = lanes["unit_cost"].to_numpy()
+    assert lp @ cost <= greedy @ cost + 1e-6
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from app.planning import capacity_utilization
+from app.scenarios import Scenario, ScenarioBase, evaluate
+
+def base():
+    inventory = pd.DataFrame({
+        "item": ["A", "A", "B"], "warehouse": ["W1", "W2", "W1"],
+        "category": ["X", "X", "Y"], "supplier": ["S", "S", "S"],
+        "on_hand": [10, 10, 10], "wip": [0, 0, 0], "safety": [5, 5, 5], "unit_cost": [1, 1, 1]
+    })
+    demand = pd.DataFrame({"item": ["A", "B"], "qty": [20.0, 4.0]})
+    shares = pd.DataFrame({"item": ["A", "A", "B"], "warehouse": ["W1", "W2", "W1"], "share": [0.5, 0.5, 1.0]})
+    capacity = pd.DataFrame({
+        "warehouse": ["W1", "W2"], "machine": ["M1", "M2"],
+        "daily_capacity": [10, 10], "shift_hours": [8, 8], "utilization": [1.0, 1.0]
+    })
+    daily = pd.DataFrame({"A": [4.0, 6.0], "B": [2.0, 2.0]}, index=pd.date_range("2024-01-01", periods=2))
+    return ScenarioBase(inventory, demand, None, capacity, shares, daily), daily, shares, capacity
+
+def test_baseline_utilization_matches_capacity_plan():
+    scenario_base, daily, shares, capacity = base()
+    kpis, _ = evaluate(scenario_base, [Scenario("Double", 2.0)])
+
+    expected = capacity_utilization(daily, shares, capacity)
+    assert kpis["utilization"].tolist() == pytest.approx([expected, expected * 2])
+
+def test_outage_moves_load_to_other_warehouses():
+    scenario_base, daily, _, _ = base()
+    kpis, _ = evaluate(scenario_base, [Scenario("W2 out", warehouse_outages=["W2"])])
+
+    # All of A and B now land on W1's 10 units/day.
+    assert kpis["utilization"].iloc[1] == pytest.approx(daily.to_numpy().sum() / 20 * 100)
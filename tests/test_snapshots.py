@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.migrations import migrate
+from app.schema import create_tables
+from app.snapshots import SnapshotStore
+
+pytest.importorskip("pyarrow")
+
+def make_engine(tmp_path, migrated=True):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snap.db'}")
+    with engine.begin() as conn:
+        create_tables(conn)
+        conn.execute(
+            text("INSERT INTO orders(order_id, date, item, qty) VALUES (:o, '2024-01-01', 'A', 1)"),
+            [{"o": f"O{i}"} for i in range(5)]
+        )
+    if migrated:
+        migrate(engine)
+    return engine
+
+def other_client(tmp_path, sql):
+    # A separate engine stands in for another replica or a DBA.
+    with create_engine(f"sqlite:///{tmp_path / 'snap.db'}").begin() as conn:
+        conn.execute(text(sql))
+
+def test_update_from_another_client_rebuilds_after_restart(tmp_path):
+    engine = make_engine(tmp_path)
+    assert SnapshotStore(engine, tmp_path / "snaps", ["orders"]).load("orders")["qty"].tolist() == [1] * 5
+
+    other_client(tmp_path, "UPDATE orders SET qty = 999")
+
+    store = SnapshotStore(engine, tmp_path / "snaps", ["orders"])
+    assert store.load("orders")["qty"].tolist() == [999] * 5
+    assert store.stats["rebuilds"] == 1
+
+def test_appends_stay_incremental(tmp_path):
+    engine = make_engine(tmp_path)
+    SnapshotStore(engine, tmp_path / "snaps", ["orders"]).load("orders")
+
+    other_client(tmp_path, "INSERT INTO orders(order_id, item, qty) VALUES ('O9', 'B', 2)")
+
+    store = SnapshotStore(engine, tmp_path / "snaps", ["orders"])
+    assert len(store.load("orders")) == 6
+    assert store.stats == dict(store.stats, rebuilds=0, appends=1)
+
+def test_reused_rowid_is_not_served_stale(tmp_path):
+    engine = make_engine(tmp_path)
+    store = SnapshotStore(engine, tmp_path / "snaps", ["orders"])
+    store.load("orders")
+
+    # SQLite hands the deleted max rowid to the next insert.
+    other_client(tmp_path, "DELETE FROM orders WHERE order_id = 'O4'")
+    other_client(tmp_path, "INSERT INTO orders(order_id, item, qty) VALUES ('O5', 'B', 7)")
+
+    assert store.load("orders")["order_id"].tolist() == ["O0", "O1", "O2", "O3", "O5"]
+
+def test_without_counters_first_load_rebuilds(tmp_path):
+    engine = make_engine(tmp_path, migrated=False)
+    SnapshotStore(engine, tmp_path / "snaps", ["orders"]).load("orders")
+
+    store = SnapshotStore(engine, tmp_path / "snaps", ["orders"])
+    store.load("orders")
+    store.load("orders")
+    assert store.stats["rebuilds"] == 1
@@ -0,0 +1,7 @@
+from app.startup import MAX_LOGIN_SECONDS, login_profile
+
+def test_login_screen_within_budget():
+    # Renders the login screen in a fresh interpreter, as a cold start.
+    seconds, loaded = login_profile()
+    assert loaded == [], f"loaded before login: {', '.join(loaded)}"
+    assert seconds <= MAX_LOGIN_SECONDS, f"login screen took {seconds:.2f}s"
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.schema import create_tables
+from app.table_view import count_rows, fetch_page, table_columns, where_clause
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'table_view.db'}")
+    with engine.begin() as conn:
+        create_tables(conn)
+        conn.execute(
+            text("INSERT INTO inventory(item, warehouse, on_hand) VALUES (:item, :warehouse, :on_hand)"),
+            [{"item": "a", "warehouse": "W1", "on_hand": 5}, {"item": "b", "warehouse": "W1", "on_hand": 7}]
+        )
+    return engine
+
+def test_filters_are_bound_with_the_column_type(tmp_path):
+    columns = table_columns(make_engine(tmp_path), "inventory")
+
+    _, params = where_clause(columns, {"on_hand": " 5 ", "item": "a"}, None)
+
+    assert params == {"f0": 5, "f1": "a"}
+
+def test_bad_number_filter_is_a_validation_error(tmp_path):
+    engine = make_engine(tmp_path)
+
+    with pytest.raises(ValueError, match="on_hand must be a whole number"):
+        fetch_page(engine, "inventory", filters={"on_hand": "five"})
+
+    rows, _ = fetch_page(engine, "inventory", filters={"on_hand": "7"})
+    assert rows["item"].tolist() == ["b"]
+    assert count_rows(engine, "inventory", filters={"on_hand": "7"}) == 1
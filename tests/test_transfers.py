@@ -0,0 +1,30 @@
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.schema import create_tables
+from app.transfers import apply_transfers
+
+def make_engine(tmp_path, rows):
+    engine = create_engine(f"sqlite:///{tmp_path / 'transfers.db'}")
+    with engine.begin() as conn:
+        create_tables(conn)
+        conn.execute(
+            text("INSERT INTO inventory(item, warehouse, on_hand) VALUES (:item, :warehouse, :on_hand)"),
+            rows
+        )
+    return engine
+
+def stock(engine):
+    return dict(pd.read_sql("SELECT warehouse, on_hand FROM inventory", engine).itertuples(index=False))
+
+def test_null_on_hand_counts_as_empty(tmp_path):
+    engine = make_engine(tmp_path, [
+        {"item": "a", "warehouse": "W1", "on_hand": 10},
+        {"item": "a", "warehouse": "W2", "on_hand": None}
+    ])
+
+    result = apply_transfers(engine, [("a", 4, "W1", "W2"), ("a", 20, "W2", "W1")])
+
+    assert len(result["accepted"]) == 1
+    assert result["rejected"]["reason"].tolist() == ["Insufficient stock (4 available)"]
+    assert stock(engine) == {"W1": 6, "W2": 4}